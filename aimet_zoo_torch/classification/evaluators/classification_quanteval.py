@@ -18,20 +18,21 @@
 # General Imports
 import argparse
 import os
-import urllib.request
+from aimet_zoo_torch.common.range_download import download_file
 
 # Torch related imports
 
 import torchvision
 from torchvision import transforms as T
 import torch
-from torch.utils.data import DataLoader
 
 
 # AIMET torch related imports
 from aimet_torch.quantsim import QuantizationSimModel
 from aimet_zoo_torch.common.utils.image_net_data_loader import ImageNetDataLoader
 from aimet_zoo_torch.common.utils.utils import get_device
+from aimet_zoo_torch.common.loader_pool import get_loader_pool
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
 
 
 QUANTSIM_CONFIG_URL = "https://raw.githubusercontent.com/quic/aimet/release-aimet-1.22.1/TrainingExtensions/common/src/python/aimet_common/quantsim_config/default_config_per_channel.json"
@@ -46,61 +47,44 @@ def download_weights(prefix):
     """
     # Download config file
     if not os.path.exists("./default_config_per_channel.json"):
-        urllib.request.urlretrieve(
+        download_file(
             QUANTSIM_CONFIG_URL, "default_config_per_channel.json"
         )
 
     # Download optimized model
     if not os.path.exists(f"./{prefix}.pth"):
-        urllib.request.urlretrieve(
+        download_file(
             f"{OPTIMIZED_CHECKPOINT_URL}/{prefix}.pth", f"{prefix}.pth"
         )
     if not os.path.exists(f"./{prefix}.encodings"):
-        urllib.request.urlretrieve(
+        download_file(
             f"{OPTIMIZED_CHECKPOINT_URL}/{prefix}.encodings",
             f"{prefix}.encodings")
 
 
 def get_imagenet_dataloader(image_dir, BATCH_SIZE=128):
     """
-    Helper function to get imagenet dataloader from dataset directory
+    Helper function to get imagenet dataloader from dataset directory.
+    The dataset and its workers are kept in the loader pool, so repeated evaluations do not re-scan or re-fork
     """
-
-    def generate_dataloader(data, transform, batch_size=32):
-        """Generating dataloader
-        """
-        if data is None:
-            return None
-
-        if transform is None:
-            dataset = torchvision.datasets.ImageFolder(
-                data, transform=T.ToTensor())
-        else:
-            dataset = torchvision.datasets.ImageFolder(
-                data, transform=transform)
-
-        dataloader = DataLoader(
-            dataset, batch_size=batch_size, shuffle=False, num_workers=4
+    if image_dir is None:
+        return None
+
+    def make_dataset():
+        # Define transformation
+        preprocess_transform_pretrain = T.Compose(
+            [
+                T.Resize(256),  # Resize images to 256 x 256
+                T.CenterCrop(224),  # Center crop image
+                T.ToTensor(),  # Converting cropped images to tensors
+                T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+            ]
         )
+        return torchvision.datasets.ImageFolder(image_dir, transform=preprocess_transform_pretrain)
 
-        return dataloader
-
-    # Define transformation
-    preprocess_transform_pretrain = T.Compose(
-        [
-            T.Resize(256),  # Resize images to 256 x 256
-            T.CenterCrop(224),  # Center crop image
-            T.ToTensor(),  # Converting cropped images to tensors
-            T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-        ]
-    )
-
-    dataloader = generate_dataloader(
-        image_dir,
-        transform=preprocess_transform_pretrain,
-        batch_size=BATCH_SIZE,
-    )
-    return dataloader
+    return get_loader_pool().loader(
+        (image_dir, 'resize256_crop224'), make_dataset,
+        batch_size=BATCH_SIZE, shuffle=False, num_workers=4)
 
 
 def eval_func(model, DATA_DIR, BATCH_SIZE=128):
@@ -113,21 +97,17 @@ def eval_func(model, DATA_DIR, BATCH_SIZE=128):
 
     model.eval()
 
-    correct = 0
-    total_samples = 0
+    accumulator = ClassificationAccumulator(topk=(1,))
     on_cuda = next(model.parameters()).is_cuda
     with torch.no_grad():
         for data, label in dataloader_eval:
             if on_cuda:
                 data, label = data.cuda(), label.cuda()
-            output = model(data)
-            _, prediction = torch.max(output, 1)
-            correct += (prediction == label).sum()
-            total_samples += len(output)
+            accumulator.update(model(data), label)
 
     del dataloader_eval
 
-    return float(100 * correct / total_samples)
+    return accumulator.compute()['top1']
 
 
 def forward_pass(model, dataloader):
@@ -272,6 +252,8 @@ def main():
         forward_pass_callback_args=encoding_dataloader.data_loader)
 
     quant_acc = eval_func(sim.model.cuda(), args.evaluation_dataset)
+    # shut down the persistent workers of the pooled loaders
+    get_loader_pool().clear()
 
     # Print accuracy stats
     print("Evaluation Summary:")
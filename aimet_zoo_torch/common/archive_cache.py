@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Cache of extracted tar archives, keyed by the digest of the archive content
+"""
+import json
+import logging
+import os
+import shutil
+import tarfile
+import threading
+import time
+from pathlib import Path
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR, CHUNK_SIZE, memoized_sha256sum, link_or_copy
+
+
+logger = logging.getLogger('ArchiveCache')
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _safe_member_path(root: Path, name: str) -> Path:
+    """Resolves an archive member name below root, rejecting absolute paths and '..' components"""
+    path = (root / name).resolve()
+    if path != root and root not in path.parents:
+        raise ValueError(f'Archive member {name} escapes the extraction directory')
+    return path
+
+
+def stream_extract(archive_path: str, dst_dir: str, read_only: bool = False) -> list:
+    """
+    Extracts a (possibly compressed) tar archive in a single streaming pass, copying members in chunks
+    :param archive_path: path to the archive
+    :param dst_dir: directory to extract into
+    :param read_only: drop the write permission bits of the extracted files
+    :return: list of (relative path, size) of the extracted files
+    """
+    root = Path(dst_dir).resolve()
+    files = []
+    with tarfile.open(archive_path, 'r|*') as archive:
+        for member in archive:
+            path = _safe_member_path(root, member.name)
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+            elif member.isfile():
+                os.makedirs(path.parent, exist_ok=True)
+                with archive.extractfile(member) as f_in, open(path, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out, CHUNK_SIZE)
+                os.chmod(path, member.mode & 0o555 | 0o444 if read_only else member.mode & 0o777 | 0o600)
+                files.append((str(path.relative_to(root)), member.size))
+            else:
+                logger.warning("Skipping unsupported archive member %s", member.name)
+    return files
+
+
+class ArchiveCache:
+    """
+    Keeps one extracted copy of every archive under extracted/<digest>/ together with a manifest of its files.
+    Destinations are populated by hard-linking from that copy, so a warm run neither decompresses nor copies.
+    The cached files are read-only: every destination shares their inodes, and a write through one of them would
+    silently change the content served to all later runs.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        root = Path(cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.extracted_dir = root / 'extracted'
+        self.digests_dir = root / 'digests'
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.
+        self._lock = threading.Lock()
+
+    def _digest(self, archive_path: str) -> str:
+        """SHA-256 of the archive, memoized so unchanged archives are not re-read"""
+        return memoized_sha256sum(archive_path, self.digests_dir)
+
+    def _populate(self, digest: str, archive_path: str) -> dict:
+        """Extracts the archive into a temporary directory and renames it into place atomically"""
+        final_dir = self.extracted_dir / digest
+        tmp_dir = self.extracted_dir / f'{digest}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(tmp_dir)
+        start = time.perf_counter()
+        files = stream_extract(archive_path, str(tmp_dir), read_only=True)
+        manifest = {'archive': os.path.basename(archive_path), 'files': files,
+                    'extract_seconds': time.perf_counter() - start}
+        with open(tmp_dir / MANIFEST_NAME, 'w') as f_out:
+            json.dump(manifest, f_out)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            # another process finished the same archive first, keep its copy
+            shutil.rmtree(tmp_dir)
+        return manifest
+
+    def extract(self, archive_path: str, dst_dir: str) -> list:
+        """
+        Makes the content of archive_path available in dst_dir, extracting it only if no process did so before
+        :param archive_path: path to the tar archive
+        :param dst_dir: directory to populate
+        :return: relative paths of the files of the archive
+        """
+        digest = self._digest(archive_path)
+        try:
+            with open(self.extracted_dir / digest / MANIFEST_NAME) as f_in:
+                manifest = json.load(f_in)
+            hit = True
+        except (OSError, ValueError):
+            manifest = self._populate(digest, archive_path)
+            hit = False
+
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.seconds_saved += manifest['extract_seconds']
+            else:
+                self.misses += 1
+
+        source_dir = self.extracted_dir / digest
+        for rel_path, size in manifest['files']:
+            dst = os.path.join(dst_dir, rel_path)
+            if os.path.exists(dst) and os.path.getsize(dst) == size and os.path.samefile(dst, source_dir / rel_path):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            link_or_copy(str(source_dir / rel_path), dst)
+        return [rel_path for rel_path, _ in manifest['files']]
+
+    @property
+    def stats(self) -> dict:
+        """Hit and miss counts and the extraction seconds avoided by hits"""
+        return {'hits': self.hits, 'misses': self.misses, 'seconds_saved': self.seconds_saved}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def extract_archive(archive_path: str, dst_dir: str) -> list:
+    """
+    Extracts archive_path into dst_dir through the process-wide archive cache
+    :param archive_path: path to the tar archive
+    :param dst_dir: directory to populate
+    :return: relative paths of the files of the archive
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ArchiveCache()
+    files = _default_cache.extract(archive_path, dst_dir)
+    logger.info("Archive cache stats: %s", _default_cache.stats)
+    return files
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Persistent, content-addressed cache for model zoo artifacts (weights, encodings and configs)
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from shutil import copy2
+
+
+logger = logging.getLogger('ArtifactCache')
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'aimet_zoo')
+CHUNK_SIZE = 1 << 20
+
+
+def sha256sum(path: str) -> str:
+    """
+    Computes the SHA-256 digest of a file, reading it in chunks
+    :param path: path of the file to hash
+    :return: hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f_in:
+        for chunk in iter(lambda: f_in.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def memoized_sha256sum(path: str, memo_dir: str) -> str:
+    """
+    SHA-256 of a file, memoized under memo_dir on its path, size, inode, mtime and ctime so unchanged files are not
+    re-read. The ctime changes on every write and cannot be set back, unlike the mtime (cp -p, os.utime)
+    :param path: path of the file to hash
+    :param memo_dir: directory holding the memoized digests
+    :return: hex digest of the file content
+    """
+    stat = os.stat(path)
+    memo_key = f'{os.path.abspath(path)}#{stat.st_size}#{stat.st_ino}#{stat.st_mtime_ns}#{stat.st_ctime_ns}'
+    memo_path = Path(memo_dir) / (hashlib.sha256(memo_key.encode()).hexdigest() + '.json')
+    try:
+        with open(memo_path) as f_in:
+            return json.load(f_in)['sha256']
+    except (OSError, ValueError, KeyError):
+        pass
+    digest = sha256sum(path)
+    os.makedirs(memo_dir, exist_ok=True)
+    tmp_path = f'{memo_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f_out:
+        json.dump({'sha256': digest}, f_out)
+    os.replace(tmp_path, memo_path)
+    return digest
+
+
+def link_or_copy(src: str, dst: str):
+    """
+    Hard-links src to dst, replacing dst if it exists. Falls back to a copy when src and dst are on
+    different filesystems or the filesystem does not support hard links.
+    :param src: existing file
+    :param dst: destination path
+    """
+    if os.path.lexists(dst):
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy2(src, dst)
+
+
+class ArtifactCache:
+    """
+    Stores every artifact once under objects/<digest> and resolves source URLs to objects through an
+    index keyed by the URL plus, when known, the expected SHA-256 of the artifact.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.lock_wait_seconds = 0.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(src: str, sha256: str = None) -> str:
+        """Builds the index key for a source. Local paths also key on size and mtime so edits are picked up"""
+        key = src
+        if not src.startswith('http') and os.path.exists(src):
+            stat = os.stat(src)
+            key += f'#{stat.st_size}#{stat.st_mtime_ns}'
+        if sha256:
+            key += f'#{sha256}'
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _index_path(self, key: str) -> Path:
+        return self.cache_dir / 'index' / (key + '.json')
+
+    def _object_path(self, digest: str) -> Path:
+        return self.cache_dir / 'objects' / digest[:2] / digest
+
+    def _record(self, hit: bool, num_bytes: int = 0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_saved += num_bytes
+            else:
+                self.misses += 1
+
+    @contextmanager
+    def locked(self, src: str, sha256: str = None):
+        """
+        Holds an exclusive advisory lock on the artifact for src, shared by all processes using this cache.
+        The first process to take it downloads the artifact, the others wait and then find it in the cache.
+        :param src: source URL or path of the artifact
+        :param sha256: expected SHA-256 of the artifact, if known
+        """
+        lock_path = self.cache_dir / 'locks' / (self._key(src, sha256) + '.lock')
+        os.makedirs(lock_path.parent, exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            start = time.perf_counter()
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            waited = time.perf_counter() - start
+            with self._lock:
+                self.lock_wait_seconds += waited
+            if waited > 1:
+                logger.info("Waited %.1fs for another process fetching %s", waited, src)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def fetch(self, src: str, dst: str, sha256: str = None) -> bool:
+        """
+        Materializes a cached copy of src at dst. The content was verified against its digest when it was stored,
+        a hit only checks the size of the cached object
+        :param src: source URL or path the artifact was fetched from
+        :param dst: destination path
+        :param sha256: expected SHA-256 of the artifact, if known
+        :return: True on a cache hit, False if the artifact has to be downloaded
+        """
+        index_path = self._index_path(self._key(src, sha256))
+        try:
+            with open(index_path) as f_in:
+                entry = json.load(f_in)
+            digest = entry['sha256']
+        except (OSError, ValueError, KeyError):
+            self._record(hit=False)
+            return False
+
+        # objects are named by the digest verified when they were stored, a hit only checks the size so fetching a
+        # multi-GB checkpoint does not re-read it
+        object_path = self._object_path(digest)
+        if not object_path.exists() or (sha256 and digest != sha256) or \
+                os.path.getsize(object_path) != entry.get('size'):
+            logger.warning("Discarding corrupted cache entry for %s", src)
+            for path in (index_path, object_path):
+                if path.exists():
+                    os.remove(path)
+            self._record(hit=False)
+            return False
+
+        link_or_copy(str(object_path), dst)
+        self._record(hit=True, num_bytes=os.path.getsize(object_path))
+        logger.info("Cache hit for %s", src)
+        return True
+
+    def store(self, src: str, path: str, sha256: str = None) -> str:
+        """
+        Adds a freshly downloaded artifact to the cache and replaces it by a link to the cached object
+        :param src: source URL or path the artifact was fetched from
+        :param path: path of the downloaded artifact
+        :param sha256: expected SHA-256 of the artifact, if known
+        :return: SHA-256 of the artifact
+        """
+        digest = sha256sum(path)
+        if sha256 and digest != sha256:
+            os.remove(path)
+            raise ValueError(f'Checksum mismatch for {src}: expected {sha256}, got {digest}')
+
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            os.makedirs(object_path.parent, exist_ok=True)
+            tmp_path = f'{object_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            link_or_copy(path, tmp_path)
+            os.replace(tmp_path, object_path)
+
+        index_path = self._index_path(self._key(src, sha256))
+        os.makedirs(index_path.parent, exist_ok=True)
+        tmp_path = f'{index_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f_out:
+            json.dump({'src': src, 'sha256': digest, 'size': os.path.getsize(object_path)}, f_out)
+        os.replace(tmp_path, index_path)
+
+        link_or_copy(str(object_path), path)
+        return digest
+
+    @property
+    def stats(self) -> dict:
+        """Hit and miss counts, bytes served from the cache and seconds spent waiting on other processes"""
+        return {'hits': self.hits, 'misses': self.misses, 'bytes_saved': self.bytes_saved,
+                'lock_wait_seconds': self.lock_wait_seconds}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Returns the process-wide artifact cache shared by all Downloader instances"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ArtifactCache()
+    return _default_cache
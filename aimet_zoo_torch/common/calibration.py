@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Calibration data for compute_encodings: a seeded, class-stratified subset of an image dataset and a forward-only
+runner that stops after exactly the requested number of samples
+"""
+import json
+import logging
+import math
+import os
+import time
+
+import torch
+from torch.utils.data import DataLoader, Subset
+
+from aimet_zoo_torch.common.utils.image_net_data_loader import ImageFolder, ImageNetDataLoader, is_sharded, \
+    SHARD_INDEX_NAME
+
+
+logger = logging.getLogger('Calibration')
+
+# torch.inference_mode is available from torch 1.9
+_inference_mode = getattr(torch, 'inference_mode', torch.no_grad)
+
+
+def stratified_indices(targets: list, num_samples: int) -> list:
+    """
+    Picks num_samples indices visiting the classes round-robin, so every class contributes the same number of samples
+    give or take one
+    :param targets: label of every sample
+    :param num_samples: number of indices to pick
+    :return: indices, in round-robin order over the classes
+    """
+    by_class = {}
+    for index, target in enumerate(targets):
+        by_class.setdefault(target, []).append(index)
+    queues = [by_class[target] for target in sorted(by_class)]
+    indices = []
+    rank = 0
+    while len(indices) < num_samples and any(rank < len(queue) for queue in queues):
+        for queue in queues:
+            if rank < len(queue):
+                indices.append(queue[rank])
+                if len(indices) == num_samples:
+                    break
+        rank += 1
+    return indices
+
+
+def calibration_loader(images_dir: str, image_size: int, num_samples: int, batch_size: int = 64, seed: int = 0,
+                       num_workers: int = 8) -> DataLoader:
+    """
+    Validation-transformed loader over num_samples images spread evenly across the classes of an ImageNet-style
+    dataset. Only ceil(num_samples / num_classes) images per class are listed, picked at random with seed.
+    :param images_dir: image folder, or shards written by build_shards
+    :param image_size: side of the center crop
+    :param num_samples: number of calibration samples
+    :param batch_size: number of samples per batch
+    :param seed: seed of the per-class selection
+    :param num_workers: data loader workers
+    :return: data loader yielding (images, labels) batches in a fixed order
+    """
+    if is_sharded(images_dir):
+        with open(os.path.join(images_dir, SHARD_INDEX_NAME)) as f_in:
+            num_classes = len(json.load(f_in)['classes'])
+    else:
+        num_classes = len(ImageFolder._find_classes(images_dir)[0])  # pylint: disable=protected-access
+    per_class = max(1, math.ceil(num_samples / num_classes))
+    data_set = ImageNetDataLoader(images_dir, image_size, batch_size, num_workers=num_workers,
+                                  num_samples_per_class=per_class, use_cache=False, seed=seed).data_loader.dataset
+    subset = Subset(data_set, stratified_indices(data_set.targets, num_samples))
+    return DataLoader(subset, batch_size=batch_size, shuffle=False, num_workers=num_workers, pin_memory=True)
+
+
+class CalibrationRunner:
+    """
+    forward_pass_callback for compute_encodings running the model on exactly num_samples samples under
+    inference_mode, discarding the outputs. Wall time and sample count of the last run are kept in stats.
+    """
+
+    def __init__(self, data_loader, num_samples: int = -1, device=None):
+        """
+        :param data_loader: iterable of (inputs, labels) batches, or of inputs
+        :param num_samples: number of samples to run, the last batch is trimmed to it. -1 for the whole loader
+        :param device: device to move the inputs to, defaults to the device of the model parameters
+        """
+        self.data_loader = data_loader
+        self.num_samples = num_samples
+        self.device = device
+        self.stats = {}
+
+    def __call__(self, model, _=None):
+        """
+        :param model: model to calibrate, e.g. sim.model
+        :param _: forward_pass_callback_args, unused
+        """
+        device = self.device or next(model.parameters()).device
+        samples = 0
+        start = time.perf_counter()
+        model.eval()
+        with _inference_mode():
+            for batch in self.data_loader:
+                inputs = batch[0] if isinstance(batch, (list, tuple)) else batch
+                if self.num_samples > 0:
+                    inputs = inputs[:self.num_samples - samples]
+                model(inputs.to(device))
+                samples += len(inputs)
+                if 0 < self.num_samples <= samples:
+                    break
+        self.stats = {'wall_seconds': time.perf_counter() - start, 'samples': samples}
+        logger.info("Calibrated on %d samples in %.1fs", samples, self.stats['wall_seconds'])
+
+
+def _activation_encodings(sim) -> dict:
+    encodings = {}
+    for name, wrapper in sim.quant_wrappers():
+        for kind in ('input_quantizers', 'output_quantizers'):
+            for position, quantizer in enumerate(getattr(wrapper, kind, [])):
+                encoding = quantizer.encoding if quantizer.enabled else None
+                if encoding is not None:
+                    encoding = encoding[0] if isinstance(encoding, list) else encoding
+                    encodings[(name, kind, position)] = (encoding.min, encoding.max)
+    return encodings
+
+
+def encodings_parity(sim_reference, sim_candidate) -> dict:
+    """
+    Compares the activation encodings of two sims of the same model calibrated differently, e.g. through eval_func
+    and through CalibrationRunner
+    :param sim_reference: reference QuantizationSimModel
+    :param sim_candidate: QuantizationSimModel to compare
+    :return: number of compared quantizers, largest absolute min/max difference and the quantizer it occurs at
+    """
+    reference = _activation_encodings(sim_reference)
+    candidate = _activation_encodings(sim_candidate)
+    max_diff, worst = 0., None
+    for key in reference.keys() & candidate.keys():
+        diff = max(abs(a - b) for a, b in zip(reference[key], candidate[key]))
+        if diff > max_diff:
+            max_diff, worst = diff, key
+    results = {'compared': len(reference.keys() & candidate.keys()), 'max_abs_diff': max_diff, 'worst': worst}
+    logger.info("Compared %d activation encodings, max |diff| %.6f at %s",
+                results['compared'], max_diff, worst)
+    return results
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Data-parallel evaluation on CPU: every torch.distributed (gloo) rank evaluates a shard of the dataset and the metric
+accumulators are summed across ranks. Launch the evaluators with torchrun, e.g.
+torchrun --nproc_per_node 8 ffnet_quanteval.py --use-cuda False ...
+"""
+import logging
+import os
+import socket
+import time
+
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import DataLoader, Subset
+
+from aimet_zoo_torch.common.utils.sampler import DistributedSampler
+
+
+logger = logging.getLogger('DistributedEval')
+
+
+def init_from_env() -> bool:
+    """
+    Joins the gloo process group described by the torchrun environment (WORLD_SIZE, RANK, MASTER_ADDR, ...), and
+    splits the cores of the node between its ranks
+    :return: True if running with more than one rank
+    """
+    world_size = int(os.environ.get('WORLD_SIZE', '1'))
+    if world_size > 1 and not dist.is_initialized():
+        dist.init_process_group('gloo')
+        local_world_size = int(os.environ.get('LOCAL_WORLD_SIZE', world_size))
+        torch.set_num_threads(max(1, os.cpu_count() // local_world_size))
+        logger.info("Rank %d of %d, %d threads", dist.get_rank(), world_size, torch.get_num_threads())
+    return is_distributed()
+
+
+def is_distributed() -> bool:
+    """True inside a process group of more than one rank"""
+    return dist.is_available() and dist.is_initialized() and dist.get_world_size() > 1
+
+
+def is_main_process() -> bool:
+    """True on rank 0, or when not distributed"""
+    return not is_distributed() or dist.get_rank() == 0
+
+
+def shard_indices(num_samples: int, rank: int, world_size: int) -> list:
+    """
+    Consecutive shard of rank, from DistributedSampler without padding, plus one of the num_samples % world_size
+    leftover samples for the first ranks, so every sample is evaluated exactly once
+    """
+    sampler = DistributedSampler(range(num_samples), pad=False, consecutive_sample=True, permutation=False,
+                                 num_replicas=world_size, rank=rank)
+    indices = list(sampler)
+    if sampler.total_size + rank < num_samples:
+        indices.append(sampler.total_size + rank)
+    return indices
+
+
+def shard_loader(data_loader: DataLoader) -> DataLoader:
+    """
+    Copy of data_loader restricted to the shard of the current rank, the data loader itself when not distributed
+    :param data_loader: torch DataLoader over the whole evaluation set, or a loader with a subset(indices) hook such
+        as PreprocessedDataLoader
+    :return: the data loader of this rank
+    """
+    if not is_distributed():
+        return data_loader
+    indices = shard_indices(len(data_loader.dataset), dist.get_rank(), dist.get_world_size())
+    if hasattr(data_loader, 'subset'):
+        return data_loader.subset(indices)
+    return DataLoader(Subset(data_loader.dataset, indices), batch_size=data_loader.batch_size,
+                      num_workers=data_loader.num_workers, collate_fn=data_loader.collate_fn,
+                      pin_memory=data_loader.pin_memory, drop_last=data_loader.drop_last,
+                      worker_init_fn=data_loader.worker_init_fn)
+
+
+def all_reduce_sum(value):
+    """
+    Sums an accumulator across ranks
+    :param value: numpy array (e.g. a confusion matrix), tensor, int or float (e.g. a loss sum), list or tuple of
+        those, or an object with an all_reduce() method such as ClassificationAccumulator
+    :return: the sum over all ranks, value itself when not distributed
+    """
+    if not is_distributed():
+        return value
+    if hasattr(value, 'all_reduce'):
+        value.all_reduce()
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(all_reduce_sum(item) for item in value)
+    if isinstance(value, np.ndarray):
+        tensor = torch.from_numpy(np.ascontiguousarray(value))
+        dist.all_reduce(tensor)
+        return tensor.numpy()
+    if isinstance(value, torch.Tensor):
+        dist.all_reduce(value)
+        return value
+    tensor = torch.tensor(value, dtype=torch.float64 if isinstance(value, float) else torch.int64)
+    dist.all_reduce(tensor)
+    return tensor.item()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _benchmark_worker(rank: int, world_size: int, port: int, fn, args: tuple, results):
+    os.environ.update({'MASTER_ADDR': '127.0.0.1', 'MASTER_PORT': str(port), 'WORLD_SIZE': str(world_size),
+                       'RANK': str(rank), 'LOCAL_WORLD_SIZE': str(world_size)})
+    if world_size > 1:
+        init_from_env()
+    else:
+        torch.set_num_threads(os.cpu_count())
+    if is_distributed():
+        dist.barrier()
+    start = time.perf_counter()
+    fn(*args)
+    if is_distributed():
+        dist.barrier()
+    if rank == 0:
+        results[world_size] = time.perf_counter() - start
+    if is_distributed():
+        dist.destroy_process_group()
+
+
+def scaling_benchmark(fn, args: tuple = (), ranks: tuple = (1, 2, 4, 8)) -> dict:
+    """
+    Times a sharded evaluation at several world sizes, each in freshly spawned gloo ranks on this node
+    :param fn: picklable (module-level) function running the evaluation, using shard_loader and all_reduce_sum
+    :param args: arguments of fn
+    :param ranks: world sizes to time
+    :return: wall seconds and speedup over the first world size, keyed by world size
+    """
+    with mp.Manager() as manager:
+        results = manager.dict()
+        for world_size in ranks:
+            mp.spawn(_benchmark_worker, args=(world_size, _free_port(), fn, args, results), nprocs=world_size)
+        seconds = dict(results)
+    baseline = seconds[ranks[0]]
+    report = {world_size: {'seconds': seconds[world_size], 'speedup': baseline / seconds[world_size]}
+              for world_size in ranks}
+    for world_size, entry in report.items():
+        logger.info("%d ranks: %.1fs, %.2fx", world_size, entry['seconds'], entry['speedup'])
+    return report
@@ -8,11 +8,18 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 
-from urllib.request import urlretrieve
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
+import time
 from shutil import copy2
 import gdown
+from aimet_zoo_torch.common.artifact_cache import get_artifact_cache
+from aimet_zoo_torch.common.range_download import RateLimiter, download_file, make_limiter
+
+
+ARTIFACT_NAMES = ('pre_opt_weights', 'post_opt_weights', 'adaround_encodings', 'aimet_encodings', 'aimet_config')
 
 
 class Downloader():
@@ -26,7 +33,9 @@ class Downloader():
                  url_aimet_encodings: str = None,
                  url_aimet_config: str = None,
                  model_dir: str = '',
-                 model_config: str = ''):
+                 model_config: str = '',
+                 sha256_checksums: dict = None,
+                 max_bytes_per_sec: float = None):
 
         """
         :param url_pre_opt_weights:       url hosting pre optimization weights as a state dict
@@ -36,6 +45,8 @@ class Downloader():
         :param url_aimet_config:          url with aimet config to be used by the Quantization Simulation
         :param model_dir:                 path to model's directory within AIMET Model Zoo
         :param model_config:              configuration name for pre-trained model, used to specify the directory for saving weights and encodings
+        :param sha256_checksums:          optional expected SHA-256 per artifact, keyed by artifact name (e.g. 'post_opt_weights')
+        :param max_bytes_per_sec:         bandwidth cap shared by the concurrent downloads of the artifacts, defaults to $AIMET_ZOO_MAX_BYTES_PER_SEC
         """
 
         self.url_pre_opt_weights = url_pre_opt_weights
@@ -49,39 +60,159 @@ class Downloader():
         self.path_adaround_encodings = str(self._download_storage_path) + "/adaround_encodings" if self.url_adaround_encodings else None
         self.path_aimet_encodings = str(self._download_storage_path) + "/aimet_encodings" if self.url_aimet_encodings else None
         self.path_aimet_config = str(self._download_storage_path) + "/aimet_config" if self.url_aimet_config else None
+        self.sha256_checksums = sha256_checksums or {}
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self.download_stats = {}
 
     def _download_from_url(self, 
                            src: str, 
-                           dst: str):
-        """Receives a source URL or path and a storage destination path, evaluates the source, fetches the file, and stores at the destination"""
-        if not os.path.exists(self._download_storage_path):
-            os.makedirs(self._download_storage_path)
+                           dst: str,
+                           sha256: str = None,
+                           limiter: RateLimiter = None):
+        """Receives a source URL or path and a storage destination path, evaluates the source, fetches the file, and stores at the destination.
+        Artifacts already present in the artifact cache are linked into place instead of being fetched again.
+        limiter caps the bandwidth of this download together with the others sharing it, by default it is capped on its own"""
+        os.makedirs(self._download_storage_path, exist_ok=True)
         if src is None:
             return 'Skipping download, URL not provided on model definition'
-        if src.startswith('https://drive.google.com'):
-            gdown.download(url=src, output=dst, quiet=True, verify=False)
-        elif src.startswith('http'):
-            urlretrieve(src, dst)
-        else:
-            assert os.path.exists(src), 'URL passed is not an http, assumed it to be a system path, but such path does not exist'
-            copy2(src, dst)
+        # looked up on every call rather than stored, as the cache holds a lock and zoo models are deep-copied by AIMET
+        artifact_cache = get_artifact_cache()
+        # concurrent evaluators of the same model card serialize here, only the first one transfers the artifact
+        with artifact_cache.locked(src, sha256):
+            if artifact_cache.fetch(src, dst, sha256):
+                return 'Skipping download, artifact found in cache'
+            # dst may be a hard link to a cached object, never write through it
+            if os.path.lexists(dst):
+                os.remove(dst)
+            # a stable name guarded by the lock, so an interrupted transfer resumes from its partial chunks on the next run
+            tmp_dst = f'{dst}.download'
+            if src.startswith('https://drive.google.com'):
+                gdown.download(url=src, output=tmp_dst, quiet=True, verify=False)
+            elif src.startswith('http'):
+                download_file(src, tmp_dst, max_bytes_per_sec=self.max_bytes_per_sec, limiter=limiter)
+            else:
+                assert os.path.exists(src), 'URL passed is not an http, assumed it to be a system path, but such path does not exist'
+                copy2(src, tmp_dst)
+            os.replace(tmp_dst, dst)
+            artifact_cache.store(src, dst, sha256)
 
     def _download_pre_opt_weights(self):
         """downloads pre optimization weights"""
-        self._download_from_url(src=self.url_pre_opt_weights, dst=self.path_pre_opt_weights)
+        self._download_from_url(src=self.url_pre_opt_weights, dst=self.path_pre_opt_weights, sha256=self.sha256_checksums.get('pre_opt_weights'))
 
     def _download_post_opt_weights(self):
         """downloads post optimization weights"""
-        self._download_from_url(src=self.url_post_opt_weights, dst=self.path_post_opt_weights)
+        self._download_from_url(src=self.url_post_opt_weights, dst=self.path_post_opt_weights, sha256=self.sha256_checksums.get('post_opt_weights'))
 
     def _download_adaround_encodings(self):
         """downloads adaround encodings"""
-        self._download_from_url(src=self.url_adaround_encodings, dst=self.path_adaround_encodings)
+        self._download_from_url(src=self.url_adaround_encodings, dst=self.path_adaround_encodings, sha256=self.sha256_checksums.get('adaround_encodings'))
 
     def _download_aimet_encodings(self):
         """downloads aimet encodings"""
-        self._download_from_url(src=self.url_aimet_encodings, dst=self.path_aimet_encodings)
+        self._download_from_url(src=self.url_aimet_encodings, dst=self.path_aimet_encodings, sha256=self.sha256_checksums.get('aimet_encodings'))
 
     def _download_aimet_config(self):
         """downloads aimet configuration"""
-        self._download_from_url(src=self.url_aimet_config, dst=self.path_aimet_config)
\ No newline at end of file
+        self._download_from_url(src=self.url_aimet_config, dst=self.path_aimet_config, sha256=self.sha256_checksums.get('aimet_config'))
+
+    def _artifact_jobs(self) -> list:
+        """(artifact name, source URL, destination path) for every artifact provided on the model definition"""
+        return [(name, getattr(self, 'url_' + name), getattr(self, 'path_' + name))
+                for name in ARTIFACT_NAMES if getattr(self, 'url_' + name)]
+
+    def _timed_download(self, name: str, src: str, dst: str, limiter: RateLimiter = None):
+        """downloads a single artifact and returns its name with the seconds it took"""
+        start = time.perf_counter()
+        self._download_from_url(src=src, dst=dst, sha256=self.sha256_checksums.get(name), limiter=limiter)
+        return name, time.perf_counter() - start
+
+    def _download_artifacts(self, max_workers: int = len(ARTIFACT_NAMES)):
+        """downloads all artifacts concurrently on a bounded thread pool and records per-artifact seconds in download_stats"""
+        start = time.perf_counter()
+        # one limiter for all artifacts, so the cap bounds the concurrent downloads together. It is not kept on the
+        # instance, as it holds a lock and zoo models are deep-copied
+        limiter = make_limiter(self.max_bytes_per_sec)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._timed_download, *job, limiter) for job in self._artifact_jobs()]
+            for future in futures:
+                name, seconds = future.result()
+                self.download_stats[name] = seconds
+        self.download_stats['total'] = time.perf_counter() - start
+        return self.download_stats
+
+    def _cached_quantsim(self, build_sim, quantized: bool, kwargs: dict):
+        """returns the prepared sim from the quantsim snapshot cache, only calling build_sim (which loads the weights
+        into self.model and computes the encodings) when no snapshot matches the model card, artifacts and kwargs.
+        A restored snapshot still loads the weights into the model, so get_quantsim leaves it in the same state either way"""
+        # imported here, the snapshot cache needs torch while downloading and prefetching do not
+        from aimet_zoo_torch.common.quantsim_cache import cached_quantsim, get_quantsim_cache  # pylint: disable=import-outside-toplevel
+
+        def key_fn():
+            self._download_artifacts()
+            return get_quantsim_cache().key(
+                model_card=self.cfg,
+                artifact_paths={name: getattr(self, 'path_' + name) for name in ARTIFACT_NAMES},
+                quant_kwargs={name: value for name, value in kwargs.items() if name != 'dummy_input'},
+                input_shape=tuple(kwargs['dummy_input'].shape),
+                device=str(kwargs['dummy_input'].device),
+                model=type(self).__name__,
+                quantized=quantized)
+
+        def restore(sim):
+            self.from_pretrained(quantized=quantized)
+            # build_sim moves the model to the device of the sim it is copied into
+            model = getattr(self, 'model', self)
+            parameter = next(sim.model.parameters(), None)
+            if parameter is not None:
+                model.to(parameter.device)
+        return cached_quantsim(build_sim, key_fn, restore)
+
+    @property
+    def cache_stats(self) -> dict:
+        """Hit/miss counts, bytes saved and lock-wait seconds of the artifact cache shared by all downloaders in this process"""
+        return get_artifact_cache().stats
+
+
+def prefetch(model_cards: list, max_workers: int = 8, max_bytes_per_sec: float = None) -> dict:
+    """
+    Warms the artifact cache for a list of model cards, fetching all their artifacts concurrently.
+    Artifacts shared between model cards (e.g. a common aimet config) are transferred only once.
+    :param model_cards: paths to model card JSON files, located as <model_dir>/model_cards/<model_config>.json
+    :param max_workers: maximum number of concurrent downloads
+    :param max_bytes_per_sec: bandwidth cap of the whole prefetch, shared by its concurrent downloads, defaults to
+        $AIMET_ZOO_MAX_BYTES_PER_SEC
+    :return: seconds spent per artifact, keyed by model config and artifact name
+    """
+    downloaders = {}
+    for model_card in model_cards:
+        model_card = Path(model_card)
+        with open(model_card) as f_in:
+            cfg = json.load(f_in)
+        downloaders[model_card.stem] = Downloader(url_pre_opt_weights=cfg['artifacts']['url_pre_opt_weights'],
+                                                  url_post_opt_weights=cfg['artifacts']['url_post_opt_weights'],
+                                                  url_adaround_encodings=cfg['artifacts']['url_adaround_encodings'],
+                                                  url_aimet_encodings=cfg['artifacts']['url_aimet_encodings'],
+                                                  url_aimet_config=cfg['artifacts']['url_aimet_config'],
+                                                  sha256_checksums=cfg['artifacts'].get('sha256_checksums'),
+                                                  model_dir=str(model_card.parent.parent),
+                                                  model_config=model_card.stem,
+                                                  max_bytes_per_sec=max_bytes_per_sec)
+
+    # first transfer every distinct source once, then link the remaining duplicates from the cache
+    seen, first, duplicates = set(), [], []
+    for model_config, downloader in downloaders.items():
+        for job in downloader._artifact_jobs():
+            (duplicates if job[1] in seen else first).append((model_config, job))
+            seen.add(job[1])
+
+    stats = {model_config: {} for model_config in downloaders}
+    limiter = make_limiter(max_bytes_per_sec)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for jobs in (first, duplicates):
+            futures = [(model_config, executor.submit(downloaders[model_config]._timed_download, *job, limiter))
+                       for model_config, job in jobs]
+            for model_config, future in futures:
+                name, seconds = future.result()
+                stats[model_config][name] = seconds
+    return stats
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Early-stopping regression check: streams paired reference/candidate (e.g. fp32/int8) predictions in a seeded random
+order and stops once the confidence interval on their accuracy delta is tight enough
+"""
+import logging
+import math
+from statistics import NormalDist
+
+import torch
+from torch.utils.data import DataLoader, RandomSampler
+
+from aimet_zoo_torch.common.fan_out_eval import FanOutEvaluator
+
+
+logger = logging.getLogger('EarlyStop')
+
+
+def permuted_loader(data_loader: DataLoader, seed: int = 0) -> DataLoader:
+    """
+    Copy of a data loader visiting its dataset in a random order fixed by seed, so a prefix of the pass is an unbiased
+    sample of the dataset and the same prefix is seen on every run
+    :param data_loader: torch DataLoader, or a loader with a subset(indices) hook such as PreprocessedDataLoader
+    :param seed: seed of the permutation
+    :return: the permuted data loader
+    """
+    generator = torch.Generator()
+    generator.manual_seed(seed)
+    if hasattr(data_loader, 'subset'):
+        # the permutation RandomSampler draws from the same generator
+        return data_loader.subset(torch.randperm(len(data_loader.dataset), generator=generator).tolist())
+    return DataLoader(data_loader.dataset, batch_size=data_loader.batch_size,
+                      sampler=RandomSampler(data_loader.dataset, generator=generator),
+                      num_workers=data_loader.num_workers, collate_fn=data_loader.collate_fn,
+                      pin_memory=data_loader.pin_memory, worker_init_fn=data_loader.worker_init_fn)
+
+
+class PairedEarlyStop:
+    """
+    stop callback for FanOutEvaluator.evaluate. Pairs the per-sample scores of a reference and a candidate model on
+    the same samples and keeps the sums of their differences on device. Every check_every batches it computes the
+    normal confidence interval of the mean difference and stops once its half-width is below tolerance.
+    """
+
+    def __init__(self, reference: str, candidate: str, tolerance: float, confidence: float = 0.95,
+                 min_samples: int = 1000, check_every: int = 10, per_sample=None):
+        """
+        :param reference: name of the reference model, e.g. 'fp32'
+        :param candidate: name of the candidate model, e.g. 'int8'
+        :param tolerance: stop when the half-width of the interval on the delta is below this, in percent
+        :param confidence: confidence level of the interval
+        :param min_samples: never stop before this many samples, so the normal approximation holds
+        :param check_every: batches between interval checks, each check synchronizes with the device
+        :param per_sample: per_sample(accumulator) returns the per-sample scores (e.g. 0/1 hits) of the latest
+            batch, defaults to accumulator.last_hits of ClassificationAccumulator
+        """
+        self.reference = reference
+        self.candidate = candidate
+        self.tolerance = tolerance
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.min_samples = min_samples
+        self.check_every = check_every
+        self.per_sample = per_sample or (lambda accumulator: accumulator.last_hits)
+        self._sums = None
+        self._batches = 0
+        self.samples = 0
+        self.interval = None
+
+    def __call__(self, accumulators: dict) -> bool:
+        delta = (self.per_sample(accumulators[self.candidate]).double()
+                 - self.per_sample(accumulators[self.reference]).double())
+        sums = torch.stack([delta.sum(), (delta * delta).sum()])
+        self._sums = sums if self._sums is None else self._sums + sums
+        self.samples += len(delta)
+        self._batches += 1
+        if self.samples < self.min_samples or self._batches % self.check_every:
+            return False
+        return self.update_interval() < self.tolerance
+
+    def update_interval(self) -> float:
+        """Recomputes the interval in percent from the running sums, returns its half-width"""
+        total, total_sq = self._sums.tolist()
+        mean = total / self.samples
+        variance = max(total_sq / self.samples - mean * mean, 0.) * self.samples / max(self.samples - 1, 1)
+        half_width = 100. * self.z * math.sqrt(variance / self.samples)
+        self.interval = (100. * mean - half_width, 100. * mean + half_width)
+        return half_width
+
+
+def evaluate_until_confident(data_loader: DataLoader, models: dict, step, make_accumulator, reference: str,
+                             candidate: str, tolerance: float, seed: int = 0, **stop_kwargs):
+    """
+    Evaluates models on a seeded permutation of the data loader until the interval on the candidate - reference
+    accuracy delta is tighter than tolerance, or the data is exhausted
+    :param data_loader: torch DataLoader of the evaluation set
+    :param models: models keyed by name, including reference and candidate
+    :param step: step(model, batch, accumulator) as for FanOutEvaluator.evaluate
+    :param make_accumulator: callable creating an empty accumulator, e.g. ClassificationAccumulator
+    :param reference: name of the reference model
+    :param candidate: name of the candidate model
+    :param tolerance: requested half-width of the interval on the delta, in percent
+    :param seed: seed of the permutation
+    :param stop_kwargs: other PairedEarlyStop arguments, e.g. confidence or min_samples
+    :return: accumulators keyed by model name, and stats with the samples consumed, the interval and the time saved
+        compared with an estimated full pass
+    """
+    stop = PairedEarlyStop(reference, candidate, tolerance, **stop_kwargs)
+    evaluator = FanOutEvaluator(permuted_loader(data_loader, seed), desc='early-stop evaluate')
+    accumulators = evaluator.evaluate(models, step, make_accumulator, stop)
+    stop.update_interval()
+    total_samples = len(data_loader.dataset)
+    wall_seconds = evaluator.stats['wall_seconds']
+    full_seconds = wall_seconds * total_samples / max(stop.samples, 1)
+    stats = {'samples': stop.samples, 'total_samples': total_samples, 'interval': stop.interval,
+             'wall_seconds': wall_seconds, 'estimated_full_seconds': full_seconds,
+             'seconds_saved': full_seconds - wall_seconds}
+    logger.info("Delta %s - %s in [%.3f, %.3f]%% after %d of %d samples, %.1fs of an estimated %.1fs full pass",
+                candidate, reference, stop.interval[0], stop.interval[1], stop.samples, total_samples,
+                wall_seconds, full_seconds)
+    return accumulators, stats
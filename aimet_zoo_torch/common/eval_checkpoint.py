@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Periodic checkpoints of an evaluation loop (metric accumulators plus the batch cursor), so a preempted run resumes
+where it stopped and produces the same result as an uninterrupted one
+"""
+import hashlib
+import inspect
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+import torch
+from torch.utils.data import BatchSampler, DataLoader, SequentialSampler, Subset
+
+
+logger = logging.getLogger('EvalCheckpoint')
+
+_LOAD_KWARGS = {'weights_only': False} if 'weights_only' in inspect.signature(torch.load).parameters else {}
+
+
+ENCODING_FIELDS = ('bw', 'min', 'max', 'delta', 'offset')
+
+
+def _encoding_state(encoding):
+    """Fields of a quantizer encoding (per-tensor, or a list of per-channel encodings), None if not computed"""
+    if encoding is None:
+        return None
+    if isinstance(encoding, (list, tuple)):
+        return [_encoding_state(channel) for channel in encoding]
+    return [getattr(encoding, field, None) for field in ENCODING_FIELDS]
+
+
+def quantizer_states(model: torch.nn.Module) -> list:
+    """
+    State of the quantizers of a QuantizationSimModel's model that lives outside its state_dict: whether each
+    quantizer is enabled, its bitwidth and its computed encodings
+    :param model: sim.model, or any model (which has no quantizers)
+    :return: JSON-serializable list, one entry per quantizer
+    """
+    states = []
+    for module_name, module in model.named_modules():
+        quantizers = sorted((getattr(module, 'param_quantizers', None) or {}).items())
+        for kind in ('input_quantizers', 'output_quantizers'):
+            quantizers += [(f'{kind}.{index}', quantizer)
+                           for index, quantizer in enumerate(getattr(module, kind, None) or [])]
+        for quantizer_name, quantizer in quantizers:
+            states.append([module_name, quantizer_name, getattr(quantizer, 'enabled', None),
+                           getattr(quantizer, 'bitwidth', None), _encoding_state(getattr(quantizer, 'encoding', None))])
+    return states
+
+
+def model_fingerprint(model: torch.nn.Module) -> str:
+    """
+    Digest of the parameters, buffers and quantizer encodings of a model, so a checkpoint is never resumed with
+    different weights or encodings
+    :param model: model being evaluated, e.g. sim.model
+    :return: hex digest
+    """
+    digest = hashlib.sha256()
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy().tobytes())
+    digest.update(json.dumps(quantizer_states(model), default=str).encode())
+    return digest.hexdigest()
+
+
+def skip_batches(data_loader, num_batches: int):
+    """
+    Iterable over the batches of data_loader after the first num_batches. A sequential torch DataLoader is restarted
+    at the first sample of the batch without loading the skipped samples, other iterables are advanced past them.
+    :param data_loader: data loader to resume
+    :param num_batches: number of batches already evaluated
+    :return: iterable of the remaining batches, identical to those of an uninterrupted pass
+    """
+    if not num_batches:
+        return data_loader
+    if isinstance(data_loader, DataLoader) and type(data_loader.batch_sampler) is BatchSampler \
+            and isinstance(data_loader.batch_sampler.sampler, SequentialSampler):
+        start = num_batches * data_loader.batch_size
+        return DataLoader(Subset(data_loader.dataset, range(start, len(data_loader.dataset))),
+                          batch_size=data_loader.batch_size, num_workers=data_loader.num_workers,
+                          collate_fn=data_loader.collate_fn, pin_memory=data_loader.pin_memory,
+                          drop_last=data_loader.drop_last, worker_init_fn=data_loader.worker_init_fn)
+    return itertools.islice(data_loader, num_batches, None)
+
+
+class EvalCheckpoint:
+    """
+    Pickles the evaluation state under path every interval_seconds. The key describes the run (models, dataset,
+    arguments), a checkpoint written for another key is ignored.
+    """
+
+    def __init__(self, path: str, key: dict, interval_seconds: float = 300.):
+        """
+        :param path: checkpoint file
+        :param key: JSON-serializable description of the run, e.g. model fingerprints and evaluation arguments
+        :param interval_seconds: minimum time between two checkpoints
+        """
+        self.path = path
+        self.key = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        self.interval_seconds = interval_seconds
+        self.saves = 0
+        self.save_seconds = 0.
+        self.resumed_batches = 0
+        self._last_save = time.perf_counter()
+
+    def load(self):
+        """
+        :return: (cursor, state) of the last checkpoint of this run, or None
+        """
+        try:
+            checkpoint = torch.load(self.path, **_LOAD_KWARGS)
+        except FileNotFoundError:
+            return None
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Ignoring unreadable evaluation checkpoint %s (%s)", self.path, error)
+            return None
+        if checkpoint.get('key') != self.key:
+            logger.info("Ignoring evaluation checkpoint %s of another run", self.path)
+            return None
+        self.resumed_batches = checkpoint['cursor']
+        logger.info("Resuming evaluation after %d batches", checkpoint['cursor'])
+        return checkpoint['cursor'], checkpoint['state']
+
+    def maybe_save(self, cursor: int, state):
+        """
+        Saves the state if interval_seconds passed since the last checkpoint
+        :param cursor: number of batches evaluated so far
+        :param state: picklable evaluation state, e.g. the metric accumulators
+        """
+        if time.perf_counter() - self._last_save >= self.interval_seconds:
+            self.save(cursor, state)
+
+    def save(self, cursor: int, state):
+        """
+        Writes the state atomically, so a run killed mid-write keeps its previous checkpoint
+        :param cursor: number of batches evaluated so far
+        :param state: picklable evaluation state
+        """
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        torch.save({'key': self.key, 'cursor': cursor, 'state': state}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.perf_counter()
+        self.saves += 1
+        self.save_seconds += self._last_save - start
+
+    def clear(self):
+        """Removes the checkpoint once the evaluation completed, logging the time spent checkpointing"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        logger.info("Evaluation complete, %d checkpoints written in %.2fs", self.saves, self.save_seconds)
+
+    @property
+    def stats(self) -> dict:
+        """Number of checkpoints written, seconds spent writing them and the batch cursor resumed from"""
+        return {'saves': self.saves, 'save_seconds': self.save_seconds, 'resumed_batches': self.resumed_batches}
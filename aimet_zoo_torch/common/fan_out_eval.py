@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Single-pass evaluation of several models (e.g. fp32 and quantized, original and optimized) over one data loader
+"""
+import logging
+import os
+import time
+
+import torch
+from tqdm import tqdm
+
+from aimet_zoo_torch.common.eval_checkpoint import skip_batches
+
+
+logger = logging.getLogger('FanOutEval')
+
+
+def io_bytes_read() -> int:
+    """
+    Bytes read so far by this process and its live children (e.g. data loader workers), from /proc/<pid>/io
+    :return: number of bytes, or None where /proc is not available
+    """
+    pids = [str(os.getpid())]
+    try:
+        for tid in os.listdir('/proc/self/task'):
+            with open(f'/proc/self/task/{tid}/children') as f_in:
+                pids += f_in.read().split()
+    except OSError:
+        pass
+    total = None
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/io') as f_in:
+                fields = dict(line.split(': ') for line in f_in.read().splitlines())
+        except (OSError, ValueError):
+            continue
+        total = (total or 0) + int(fields['rchar'])
+    return total
+
+
+class FanOutEvaluator:
+    """
+    Loads every batch of a data loader once and feeds it to N models, each updating its own accumulator, so image
+    decoding and augmentation are paid once per evaluation instead of once per model
+    """
+
+    def __init__(self, data_loader, num_samples: int = -1, batch_len=None, desc: str = 'evaluate', total: int = None):
+        """
+        :param data_loader: iterable of batches
+        :param num_samples: stop after this many samples, -1 for the whole data loader
+        :param batch_len: callable returning the number of samples in a batch, defaults to len(batch[0])
+        :param desc: progress bar description
+        :param total: number of batches shown by the progress bar, defaults to len(data_loader) when it has one,
+            e.g. to be given for a generator
+        """
+        self.data_loader = data_loader
+        self.num_samples = num_samples
+        self.batch_len = batch_len or (lambda batch: len(batch[0]))
+        self.desc = desc
+        if total is None and hasattr(data_loader, '__len__'):
+            total = len(data_loader)
+        self.total = total
+        self.stats = {}
+
+    def evaluate(self, models: dict, step, make_accumulator, stop=None, checkpoint=None) -> dict:
+        """
+        Runs all models on a single pass over the data loader
+        :param models: models to evaluate, keyed by name
+        :param step: step(model, batch, accumulator) runs model on batch and adds the outcome to accumulator
+        :param make_accumulator: callable creating an empty accumulator, called once per model
+        :param stop: optional stop(accumulators) called after every batch, the pass ends early when it returns True
+        :param checkpoint: optional EvalCheckpoint, the pass resumes from it and periodically saves the accumulators
+        :return: accumulators keyed by model name
+        """
+        accumulators = {name: make_accumulator() for name in models}
+        model_seconds = dict.fromkeys(models, 0.)
+        load_seconds = 0.
+        samples = 0
+        cursor = 0
+        resumed = checkpoint.load() if checkpoint is not None else None
+        if resumed is not None:
+            cursor, (accumulators, samples) = resumed
+        bytes_start = io_bytes_read()
+        start = time.perf_counter()
+
+        load_start = time.perf_counter()
+        for batch in tqdm(skip_batches(self.data_loader, cursor), desc=self.desc, initial=cursor, total=self.total):
+            load_seconds += time.perf_counter() - load_start
+            for name, model in models.items():
+                step_start = time.perf_counter()
+                with torch.no_grad():
+                    step(model, batch, accumulators[name])
+                model_seconds[name] += time.perf_counter() - step_start
+            samples += self.batch_len(batch)
+            cursor += 1
+            if 0 < self.num_samples <= samples or (stop is not None and stop(accumulators)):
+                break
+            if checkpoint is not None:
+                checkpoint.maybe_save(cursor, (accumulators, samples))
+            load_start = time.perf_counter()
+
+        bytes_end = io_bytes_read()
+        self.stats = {'wall_seconds': time.perf_counter() - start,
+                      'load_seconds': load_seconds,
+                      'model_seconds': model_seconds,
+                      'bytes_read': bytes_end - bytes_start if bytes_start is not None else None,
+                      'samples': samples}
+        if checkpoint is not None:
+            checkpoint.clear()
+            self.stats['checkpoint'] = checkpoint.stats
+        logger.info("Evaluated %d models on %d samples in %.1fs (%.1fs loading data)",
+                    len(models), samples, self.stats['wall_seconds'], load_seconds)
+        return accumulators
+
+
+def compare_with_sequential(data_loader, models: dict, step, make_accumulator, num_samples: int = -1) -> dict:
+    """
+    Benchmarks the fan-out evaluation against evaluating the models one after the other, one pass each
+    :param data_loader: iterable of batches
+    :param models: models to evaluate, keyed by name
+    :param step: step(model, batch, accumulator) as for FanOutEvaluator.evaluate
+    :param make_accumulator: callable creating an empty accumulator
+    :param num_samples: number of samples per pass, -1 for the whole data loader
+    :return: wall seconds and bytes read of both flows, keyed by 'sequential' and 'fan_out'
+    """
+    evaluator = FanOutEvaluator(data_loader, num_samples, desc='sequential')
+    sequential = {'wall_seconds': 0., 'bytes_read': 0}
+    for name, model in models.items():
+        evaluator.evaluate({name: model}, step, make_accumulator)
+        sequential['wall_seconds'] += evaluator.stats['wall_seconds']
+        if evaluator.stats['bytes_read'] is None:
+            sequential['bytes_read'] = None
+        elif sequential['bytes_read'] is not None:
+            sequential['bytes_read'] += evaluator.stats['bytes_read']
+
+    evaluator = FanOutEvaluator(data_loader, num_samples, desc='fan-out')
+    evaluator.evaluate(models, step, make_accumulator)
+    fan_out = {'wall_seconds': evaluator.stats['wall_seconds'], 'bytes_read': evaluator.stats['bytes_read']}
+    logger.info("Sequential: %.1fs, %s bytes read. Fan-out: %.1fs, %s bytes read",
+                sequential['wall_seconds'], sequential['bytes_read'], fan_out['wall_seconds'], fan_out['bytes_read'])
+    return {'sequential': sequential, 'fan_out': fan_out}
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Process-wide pool of datasets and data loaders reused across evaluation and calibration calls
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from torch.utils.data import DataLoader, Subset
+
+
+logger = logging.getLogger('LoaderPool')
+
+MAX_LOADERS = 4
+
+
+class PooledLoader:
+    """
+    Data loader kept alive by the pool. Its workers persist between iterations, and the delay from the start of
+    each iteration to its first batch is recorded as the per-call overhead.
+    """
+
+    def __init__(self, data_loader: DataLoader, stats: dict):
+        self.data_loader = data_loader
+        self.dataset = data_loader.dataset
+        self.batch_size = data_loader.batch_size
+        self._stats = stats
+
+    def __len__(self):
+        return len(self.data_loader)
+
+    def __iter__(self):
+        start = time.perf_counter()
+        first = True
+        for batch in self.data_loader:
+            if first:
+                self._stats['first_batch_seconds'].append(time.perf_counter() - start)
+                first = False
+            yield batch
+
+    def close(self):
+        """Shuts down the persistent workers, the loader starts new ones if it is iterated again"""
+        # pylint: disable=protected-access
+        iterator = getattr(self.data_loader, '_iterator', None)
+        if iterator is not None and hasattr(iterator, '_shutdown_workers'):
+            iterator._shutdown_workers()
+        self.data_loader._iterator = None
+
+
+class LoaderPool:
+    """
+    Caches datasets by a caller-provided config key, so directory scans happen once per process, and data loaders
+    by (config, loader arguments) with persistent_workers, so worker processes are forked once. At most max_loaders
+    loaders are kept, the least recently used one is closed when another is created.
+    """
+
+    def __init__(self, max_loaders: int = MAX_LOADERS):
+        """
+        :param max_loaders: number of loaders, and so of sets of persistent workers, kept alive at once
+        """
+        self.max_loaders = max_loaders
+        self._datasets = {}
+        self._loaders = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def dataset(self, key, make_dataset):
+        """
+        Returns the dataset cached under key, calling make_dataset() to build it on first use
+        :param key: hashable description of the dataset, e.g. (path, transform name)
+        :param make_dataset: callable building the dataset
+        :return: the dataset
+        """
+        with self._lock:
+            if key not in self._datasets:
+                start = time.perf_counter()
+                self._datasets[key] = make_dataset()
+                self._stats_for(key)['dataset_seconds'] = time.perf_counter() - start
+            return self._datasets[key]
+
+    def loader(self, key, make_dataset, batch_size: int, num_samples: int = None, **loader_kwargs) -> PooledLoader:
+        """
+        Returns a data loader over the dataset cached under key, creating it on first use
+        :param key: hashable description of the dataset
+        :param make_dataset: callable building the dataset if it is not cached yet
+        :param batch_size: number of samples per batch
+        :param num_samples: only iterate the first num_samples samples, e.g. for calibration, without re-scanning
+        :param loader_kwargs: other DataLoader arguments, e.g. num_workers or shuffle
+        :return: the pooled loader
+        """
+        data_set = self.dataset(key, make_dataset)
+        loader_key = (key, batch_size, num_samples, tuple(sorted(loader_kwargs.items())))
+        with self._lock:
+            if loader_key not in self._loaders:
+                start = time.perf_counter()
+                if num_samples is not None:
+                    data_set = Subset(data_set, range(min(num_samples, len(data_set))))
+                persistent = loader_kwargs.get('num_workers', 0) > 0
+                data_loader = DataLoader(data_set, batch_size=batch_size, persistent_workers=persistent, **loader_kwargs)
+                stats = self._stats_for(key)
+                stats['loaders'] += 1
+                stats['loader_seconds'] += time.perf_counter() - start
+                self._loaders[loader_key] = PooledLoader(data_loader, stats)
+                while len(self._loaders) > self.max_loaders:
+                    _, evicted = self._loaders.popitem(last=False)
+                    evicted.close()
+            else:
+                self._loaders.move_to_end(loader_key)
+                self._stats_for(key)['reuses'] += 1
+            return self._loaders[loader_key]
+
+    def _stats_for(self, key) -> dict:
+        return self._stats.setdefault(key, {'dataset_seconds': 0., 'loaders': 0, 'loader_seconds': 0.,
+                                            'reuses': 0, 'first_batch_seconds': []})
+
+    @property
+    def stats(self) -> dict:
+        """
+        Per dataset key: seconds spent building the dataset and its loaders, number of loader reuses and the
+        delay to the first batch of every iteration (startup for the first, per-call overhead for the others)
+        """
+        return self._stats
+
+    def clear(self):
+        """Drops all datasets and loaders, shutting down their persistent workers"""
+        with self._lock:
+            for pooled in self._loaders.values():
+                pooled.close()
+            self._loaders.clear()
+            self._datasets.clear()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_loader_pool() -> LoaderPool:
+    """Returns the process-wide loader pool"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = LoaderPool()
+    return _default_pool
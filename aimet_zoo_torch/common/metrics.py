@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Streaming classification metrics accumulated on the device of the logits, synchronized once when computed
+"""
+import logging
+import time
+
+import torch
+import torch.distributed
+
+
+logger = logging.getLogger('Metrics')
+
+
+class ClassificationAccumulator:
+    """
+    Accumulates top-k accuracies and, when the number of classes is known, per-class accuracy and the confusion
+    matrix. Every update stays on the device of the logits, only compute() copies the counts to the host.
+    The per-sample top-1 hits of the latest batch are kept in last_hits, e.g. to pair the predictions of two models.
+    """
+
+    def __init__(self, topk: tuple = (1, 5), num_classes: int = None, confusion: bool = False):
+        """
+        :param topk: values of k to track accuracy for
+        :param num_classes: number of classes, required for per-class accuracy and the confusion matrix
+        :param confusion: also accumulate the num_classes x num_classes confusion matrix (rows are labels)
+        """
+        if confusion and num_classes is None:
+            raise ValueError('num_classes is required to accumulate a confusion matrix')
+        self.topk = tuple(topk)
+        self.num_classes = num_classes
+        self.confusion = confusion
+        self._correct = None
+        self._total = None
+        self._class_correct = None
+        self._class_total = None
+        self._confusion = None
+        self._max_k = None
+        self._k_index = None
+        self.last_hits = None
+
+    def _allocate(self, logits: torch.Tensor):
+        device = logits.device
+        self._max_k = min(max(self.topk), logits.shape[1])
+        self._k_index = torch.tensor([min(k, self._max_k) - 1 for k in self.topk], device=device)
+        self._correct = torch.zeros(len(self.topk), dtype=torch.int64, device=device)
+        self._total = torch.zeros((), dtype=torch.int64, device=device)
+        if self.num_classes is not None:
+            self._class_correct = torch.zeros(self.num_classes, dtype=torch.int64, device=device)
+            self._class_total = torch.zeros(self.num_classes, dtype=torch.int64, device=device)
+        if self.confusion:
+            self._confusion = torch.zeros(self.num_classes * self.num_classes, dtype=torch.int64, device=device)
+
+    def update(self, logits: torch.Tensor, labels: torch.Tensor):
+        """
+        Adds a batch, without synchronizing with the device
+        :param logits: (N, C) scores
+        :param labels: (N,) class indices, moved to the device of logits if needed
+        """
+        if self._total is None:
+            self._allocate(logits)
+        labels = labels.to(logits.device, non_blocking=True)
+        predictions = logits.topk(self._max_k, dim=1).indices
+        hits = predictions.eq(labels.unsqueeze(1))
+        self.last_hits = hits[:, 0]
+        # hits[:, :k].any(1) for every k, as cumulative sums over the ranks
+        hits_at = hits.cumsum(dim=1).clamp_(max=1).sum(dim=0)
+        self._correct += hits_at[self._k_index]
+        self._total += labels.numel()
+        if self.num_classes is not None:
+            self._class_correct += torch.bincount(labels, weights=hits[:, 0].to(torch.float32),
+                                                  minlength=self.num_classes).to(torch.int64)
+            self._class_total += torch.bincount(labels, minlength=self.num_classes)
+        if self.confusion:
+            self._confusion += torch.bincount(labels * self.num_classes + predictions[:, 0],
+                                              minlength=self.num_classes * self.num_classes)
+
+    def all_reduce(self):
+        """Sums the counts across the ranks of the default torch.distributed process group, in place"""
+        if self._total is None:
+            raise RuntimeError('every rank needs at least one batch before the accumulators can be reduced')
+        for counts in (self._correct, self._total, self._class_correct, self._class_total, self._confusion):
+            if counts is not None:
+                torch.distributed.all_reduce(counts)
+
+    def compute(self) -> dict:
+        """
+        Copies the counts to the host, the only synchronization with the device
+        :return: 'top<k>' accuracies in percent and 'samples', plus 'per_class' (percent, NaN for classes without
+            samples) and 'confusion' when tracked
+        """
+        if self._total is None:
+            return {'samples': 0, **{f'top{k}': float('nan') for k in self.topk}}
+        correct = self._correct.cpu()
+        total = int(self._total.cpu())
+        results = {f'top{k}': 100. * int(count) / total for k, count in zip(self.topk, correct)}
+        results['samples'] = total
+        if self.num_classes is not None:
+            class_total = self._class_total.cpu().double()
+            results['per_class'] = (100. * self._class_correct.cpu().double() / class_total).numpy()
+        if self.confusion:
+            results['confusion'] = self._confusion.cpu().view(self.num_classes, self.num_classes).numpy()
+        return results
+
+
+def compare_with_builtin_sum(logits: torch.Tensor, labels: torch.Tensor, repeats: int = 20) -> dict:
+    """
+    Times one batch update of the accumulator against the previous per-batch top-1 count, builtin sum() over
+    torch.eq followed by a copy to the host
+    :param logits: (N, C) scores of one batch, on the device to benchmark
+    :param labels: (N,) class indices
+    :param repeats: number of timed updates of each implementation
+    :return: seconds per batch, keyed by 'builtin_sum' and 'accumulator'
+    """
+    labels = labels.to(logits.device)
+    synchronize = torch.cuda.synchronize if logits.is_cuda else (lambda: None)
+    results = {}
+
+    synchronize()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        _ = sum(torch.eq(torch.argmax(logits, dim=1), labels)).cpu().numpy()
+    synchronize()
+    results['builtin_sum'] = (time.perf_counter() - start) / repeats
+
+    accumulator = ClassificationAccumulator()
+    synchronize()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        accumulator.update(logits, labels)
+    accumulator.compute()
+    results['accumulator'] = (time.perf_counter() - start) / repeats
+
+    logger.info("Per batch of %d: builtin sum %.3fms, accumulator %.3fms", len(labels),
+                1e3 * results['builtin_sum'], 1e3 * results['accumulator'])
+    return results
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Persistent snapshots of fully prepared QuantizationSimModel objects, so warm startups skip weight loading,
+cross-layer equalization, sim construction and encoding computation
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from importlib.metadata import version, PackageNotFoundError
+from pathlib import Path
+
+import torch
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR, memoized_sha256sum
+
+
+logger = logging.getLogger('QuantSimCache')
+
+_LOAD_KWARGS = {'weights_only': False} if 'weights_only' in inspect.signature(torch.load).parameters else {}
+
+
+AIMET_DISTRIBUTIONS = ('aimet-torch', 'AimetTorch', 'aimet_torch', 'aimet-torch-gpu', 'aimet-torch-cpu')
+
+
+def aimet_version() -> str:
+    """
+    Identifies the installed aimet_torch. Source builds and older wheels do not always register distribution
+    metadata, so the package version is tried first and the location and mtime of the package are the last resort.
+    """
+    try:
+        import aimet_torch  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    if getattr(aimet_torch, '__version__', None):
+        return aimet_torch.__version__
+    for distribution in AIMET_DISTRIBUTIONS:
+        try:
+            return version(distribution)
+        except PackageNotFoundError:
+            continue
+    package_file = inspect.getfile(aimet_torch)
+    return f'{os.path.dirname(package_file)}#{os.stat(package_file).st_mtime_ns}'
+
+
+def _library_versions() -> dict:
+    """Versions the pickled sim depends on, snapshots from other versions are never restored"""
+    return {'python': '.'.join(map(str, sys.version_info[:3])), 'torch': torch.__version__,
+            'aimet_torch': aimet_version()}
+
+
+class QuantSimCache:
+    """
+    Stores one pickled sim per key under quantsim/<key>.pt, next to a JSON sidecar recording how long the cold
+    build took. The key covers everything the prepared sim depends on: the model card, the digests of the
+    weights, encodings and aimet config, the quantization arguments and the dummy input shape.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        root = Path(cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.snapshots_dir = root / 'quantsim'
+        self.digests_dir = root / 'digests'
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.
+        self._lock = threading.Lock()
+
+    def key(self, model_card: dict, artifact_paths: dict, quant_kwargs: dict, input_shape: tuple, **extra) -> str:
+        """
+        Builds the snapshot key of a prepared sim
+        :param model_card: parsed model card JSON
+        :param artifact_paths: local artifact paths keyed by artifact name, None entries are skipped
+        :param quant_kwargs: QuantizationSimModel arguments other than the dummy input
+        :param input_shape: shape of the dummy input
+        :param extra: anything else the preparation depends on, e.g. whether optimized weights are loaded
+        :return: hex digest identifying the snapshot
+        """
+        description = {
+            'model_card': model_card,
+            'artifacts': {name: memoized_sha256sum(path, self.digests_dir)
+                          for name, path in sorted(artifact_paths.items()) if path and os.path.exists(path)},
+            'quant_kwargs': {name: value for name, value in quant_kwargs.items() if name != 'config_file'},
+            'input_shape': list(input_shape),
+            'versions': _library_versions(),
+            **extra,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def load(self, key: str):
+        """
+        Restores the sim stored under key
+        :param key: snapshot key
+        :return: the prepared sim, or None on a miss or an unreadable snapshot
+        """
+        snapshot_path = self.snapshots_dir / (key + '.pt')
+        start = time.perf_counter()
+        try:
+            with open(self.snapshots_dir / (key + '.json')) as f_in:
+                meta = json.load(f_in)
+            sim = torch.load(snapshot_path, **_LOAD_KWARGS)
+        except FileNotFoundError:
+            sim = None
+        except Exception as error:  # pylint: disable=broad-except
+            # a snapshot written by an incompatible environment is rebuilt rather than trusted
+            logger.warning("Discarding unreadable quantsim snapshot %s (%s)", snapshot_path.name, error)
+            sim = None
+        with self._lock:
+            if sim is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.seconds_saved += max(meta['build_seconds'] - (time.perf_counter() - start), 0.)
+        logger.info("Restored quantsim snapshot in %.2fs (cold build took %.2fs)",
+                    time.perf_counter() - start, meta['build_seconds'])
+        return sim
+
+    def save(self, key: str, sim, build_seconds: float) -> bool:
+        """
+        Pickles a prepared sim under key. Sims holding objects that cannot be pickled are simply not cached.
+        :param key: snapshot key
+        :param sim: prepared QuantizationSimModel
+        :param build_seconds: seconds the cold build took
+        :return: True if the snapshot was written
+        """
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        snapshot_path = self.snapshots_dir / (key + '.pt')
+        tmp_path = f'{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            torch.save(sim, tmp_path)
+        except (pickle.PicklingError, TypeError, AttributeError, RuntimeError) as error:
+            logger.warning("Quantsim cannot be snapshotted, it will be rebuilt on every run (%s)", error)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, snapshot_path)
+        tmp_path = f'{self.snapshots_dir / key}.json.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f_out:
+            json.dump({'build_seconds': build_seconds}, f_out)
+        os.replace(tmp_path, self.snapshots_dir / (key + '.json'))
+        return True
+
+    @property
+    def stats(self) -> dict:
+        """Hit and miss counts and the startup seconds avoided by hits"""
+        return {'hits': self.hits, 'misses': self.misses, 'seconds_saved': self.seconds_saved}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_quantsim_cache() -> QuantSimCache:
+    """Returns the process-wide quantsim snapshot cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = QuantSimCache()
+    return _default_cache
+
+
+def cached_quantsim(build_sim, key_fn, restore=None):
+    """
+    Returns a prepared sim from the snapshot cache, building and snapshotting it on a miss.
+    Setting $AIMET_ZOO_QUANTSIM_CACHE to 0 always rebuilds.
+    :param build_sim: callable returning the fully prepared sim
+    :param key_fn: callable returning the snapshot key, called before build_sim
+    :param restore: optional callable taking the restored sim, called on a hit to leave the caller in the state
+        build_sim would have left it in (e.g. with the pretrained weights loaded into its model)
+    :return: the prepared sim
+    """
+    if os.environ.get('AIMET_ZOO_QUANTSIM_CACHE', '1') == '0':
+        return build_sim()
+    cache = get_quantsim_cache()
+    key = key_fn()
+    sim = cache.load(key)
+    if sim is not None:
+        if restore is not None:
+            restore(sim)
+        return sim
+    start = time.perf_counter()
+    sim = build_sim()
+    build_seconds = time.perf_counter() - start
+    logger.info("Built quantsim in %.2fs", build_seconds)
+    cache.save(key, sim, build_seconds)
+    return sim
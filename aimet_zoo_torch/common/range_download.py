@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Resumable HTTP downloads made of parallel Range requests, with an optional bandwidth cap
+"""
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+from urllib.request import Request, urlopen
+
+
+logger = logging.getLogger('RangeDownload')
+
+BLOCK_SIZE = 1 << 16
+MIN_CHUNK_SIZE = 8 << 20
+
+
+class RemoteFileChanged(IOError):
+    """The remote file no longer matches the ETag/Last-Modified its partial chunks were downloaded from"""
+
+
+def default_max_bytes_per_sec() -> float:
+    """Bandwidth cap from $AIMET_ZOO_MAX_BYTES_PER_SEC, None (no cap) if unset"""
+    value = os.environ.get('AIMET_ZOO_MAX_BYTES_PER_SEC')
+    return float(value) if value else None
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all chunks of a download, capping the aggregate transfer rate
+    """
+
+    def __init__(self, max_bytes_per_sec: float = None):
+        """
+        :param max_bytes_per_sec: bandwidth cap in bytes per second, None for no cap
+        """
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self._allowance = 0.
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, num_bytes: int):
+        """Blocks until num_bytes can be transferred without exceeding the cap"""
+        if not self.max_bytes_per_sec:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self._allowance + (now - self._last) * self.max_bytes_per_sec,
+                                  self.max_bytes_per_sec)
+            self._last = now
+            self._allowance -= num_bytes
+            delay = -self._allowance / self.max_bytes_per_sec if self._allowance < 0 else 0.
+        if delay:
+            time.sleep(delay)
+
+
+def make_limiter(max_bytes_per_sec: float = None) -> RateLimiter:
+    """RateLimiter capping at max_bytes_per_sec, or at $AIMET_ZOO_MAX_BYTES_PER_SEC when it is None"""
+    return RateLimiter(default_max_bytes_per_sec() if max_bytes_per_sec is None else max_bytes_per_sec)
+
+
+def _probe(url: str, timeout: float):
+    """
+    Returns the final URL after redirects, the content length, whether byte ranges are served and the validators
+    (ETag and Last-Modified) identifying the version of the remote file
+    """
+    with urlopen(Request(url, headers={'Range': 'bytes=0-0'}), timeout=timeout) as response:
+        final_url = response.geturl()
+        validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        if response.status == 206:
+            content_range = response.headers.get('Content-Range', '')
+            size = content_range.rsplit('/', 1)[-1]
+            return final_url, int(size) if size.isdigit() else None, size.isdigit(), validators
+        size = response.headers.get('Content-Length')
+        return final_url, int(size) if size else None, False, validators
+
+
+def _if_range(validators: dict) -> dict:
+    """If-Range header making the server send the whole file instead of a range once the file changed"""
+    # weak ETags are not allowed in If-Range
+    etag = validators.get('etag')
+    if etag and not etag.startswith('W/'):
+        return {'If-Range': etag}
+    if validators.get('last_modified'):
+        return {'If-Range': validators['last_modified']}
+    return {}
+
+
+def _plan_chunks(size: int, num_chunks: int) -> list:
+    """Splits [0, size) into at most num_chunks inclusive byte ranges of at least MIN_CHUNK_SIZE"""
+    num_chunks = max(1, min(num_chunks, size // MIN_CHUNK_SIZE))
+    step = -(-size // num_chunks)
+    return [[start, min(start + step, size) - 1] for start in range(0, size, step)]
+
+
+class _Progress:
+    """Thread-safe byte counter forwarding to an urlretrieve-style reporthook(block_num, block_size, total_size)"""
+
+    def __init__(self, total: int, reporthook=None):
+        self.total = total
+        self.done = 0
+        self.reporthook = reporthook
+        self._lock = threading.Lock()
+
+    def add(self, num_bytes: int):
+        with self._lock:
+            self.done += num_bytes
+            if self.reporthook:
+                self.reporthook(1, self.done, self.total)
+
+
+def _fetch_chunk(url: str, part_path: str, start: int, end: int, limiter: RateLimiter, progress: _Progress,
+                 timeout: float, retries: int, validators: dict):
+    """Downloads bytes [start, end] of url into part_path, resuming from whatever part_path already holds"""
+    expected = end - start + 1
+    for attempt in range(retries + 1):
+        have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if have > expected:
+            # not a prefix of this chunk, e.g. left by another chunk layout, start the chunk over
+            logger.warning("Discarding %s, it holds %d bytes for a %d-byte chunk", part_path, have, expected)
+            os.remove(part_path)
+            have = 0
+        if have == expected:
+            return
+        try:
+            request = Request(url, headers={'Range': f'bytes={start + have}-{end}', **_if_range(validators)})
+            with urlopen(request, timeout=timeout) as response, open(part_path, 'ab') as f_out:
+                if response.status != 206:
+                    raise RemoteFileChanged(f'{url} changed during the download')
+                while True:
+                    block = response.read(BLOCK_SIZE)
+                    if not block:
+                        break
+                    limiter.consume(len(block))
+                    f_out.write(block)
+                    progress.add(len(block))
+        except (OSError, HTTPException) as error:
+            if attempt == retries or isinstance(error, RemoteFileChanged):
+                raise
+            logger.warning("Chunk %d-%d of %s interrupted (%s), resuming", start, end, url, error)
+            time.sleep(min(2 ** attempt, 30))
+    if os.path.getsize(part_path) != expected:
+        raise IOError(f'incomplete chunk {start}-{end} for {url}')
+
+
+def _fetch_stream(url: str, dst: str, limiter: RateLimiter, progress: _Progress, timeout: float):
+    """Plain single-stream download, for servers that do not support byte ranges"""
+    partial_path = dst + '.stream.partial'
+    received = 0
+    with urlopen(url, timeout=timeout) as response, open(partial_path, 'wb') as f_out:
+        size = response.headers.get('Content-Length')
+        while True:
+            block = response.read(BLOCK_SIZE)
+            if not block:
+                break
+            limiter.consume(len(block))
+            f_out.write(block)
+            received += len(block)
+            progress.add(len(block))
+    # a dropped connection can end the body early without an error
+    if size and received != int(size):
+        raise IOError(f'incomplete download of {url}: {received} of {size} bytes')
+    os.replace(partial_path, dst)
+
+
+def _remove_partials(dst: str, num_chunks: int = None):
+    """Deletes the chunk files of a download, all <dst>.*.partial files when the number of chunks is unknown"""
+    if num_chunks is None:
+        paths = glob.glob(glob.escape(dst) + '.*.partial')
+    else:
+        paths = [f'{dst}.{index}.partial' for index in range(num_chunks)]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download_file(url: str, dst: str, num_chunks: int = 4, max_bytes_per_sec: float = None,
+                  timeout: float = 60., retries: int = 5, reporthook=None, limiter: RateLimiter = None):
+    """
+    Downloads url to dst with parallel HTTP Range requests. Every chunk is written to its own
+    <dst>.<index>.partial file, so an interrupted download resumes from the bytes already on disk,
+    both across retries and across processes. Partials are only reused while the ETag/Last-Modified of the remote
+    file is unchanged. Servers without Range support fall back to a single stream.
+    :param url: http(s) URL to download
+    :param dst: destination path
+    :param num_chunks: maximum number of chunks fetched in parallel
+    :param max_bytes_per_sec: bandwidth cap for the whole download, defaults to $AIMET_ZOO_MAX_BYTES_PER_SEC, None
+        for no cap
+    :param timeout: socket timeout in seconds
+    :param retries: number of times an interrupted chunk is resumed before giving up
+    :param reporthook: optional urlretrieve-style progress callback
+    :param limiter: RateLimiter shared with concurrent downloads so the cap applies to all of them together,
+        max_bytes_per_sec is ignored when given
+    """
+    final_url, size, ranges, validators = _probe(url, timeout)
+    if limiter is None:
+        limiter = make_limiter(max_bytes_per_sec)
+    if not ranges or not size:
+        _fetch_stream(final_url, dst, limiter, _Progress(size or -1, reporthook), timeout)
+        return
+
+    # the manifest pins the chunk layout and the version of the remote file, so resumed partials are only reused
+    # for the same content. Without any validator the remote version cannot be checked and nothing is reused.
+    manifest_path = dst + '.manifest.json'
+    manifest = {'url': url, 'size': size, 'validators': validators, 'chunks': _plan_chunks(size, num_chunks)}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f_in:
+                previous = json.load(f_in)
+            num_previous = len(previous['chunks'])
+            reusable = previous['url'] == url and previous['size'] == size and \
+                previous.get('validators') == validators and any(validators.values())
+        except (ValueError, KeyError, TypeError):
+            # truncated or foreign manifest, the chunks it describes cannot be trusted
+            num_previous, reusable = None, False
+        if reusable:
+            manifest = previous
+        else:
+            logger.info("Discarding partial download of %s, the remote file changed", url)
+            _remove_partials(dst, num_previous)
+    else:
+        # chunks without a manifest have no known layout or version
+        _remove_partials(dst)
+    with open(manifest_path, 'w') as f_out:
+        json.dump(manifest, f_out)
+
+    part_paths = [f'{dst}.{index}.partial' for index in range(len(manifest['chunks']))]
+    progress = _Progress(size, reporthook)
+    progress.add(sum(os.path.getsize(path) for path in part_paths if os.path.exists(path)))
+    with ThreadPoolExecutor(max_workers=len(part_paths)) as executor:
+        futures = [executor.submit(_fetch_chunk, final_url, part_path, start, end, limiter, progress, timeout,
+                                   retries, validators)
+                   for part_path, (start, end) in zip(part_paths, manifest['chunks'])]
+        try:
+            for future in futures:
+                future.result()
+        except RemoteFileChanged:
+            # the chunks on disk mix two versions of the file, the next attempt starts over
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            _remove_partials(dst, len(part_paths))
+            os.remove(manifest_path)
+            raise
+
+    tmp_path = dst + '.tmp'
+    with open(tmp_path, 'wb') as f_out:
+        for part_path in part_paths:
+            with open(part_path, 'rb') as f_in:
+                shutil.copyfileobj(f_in, f_out, BLOCK_SIZE * 16)
+    os.replace(tmp_path, dst)
+    for part_path in part_paths:
+        os.remove(part_path)
+    os.remove(manifest_path)
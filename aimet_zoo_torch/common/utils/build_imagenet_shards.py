@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+''' Packs an ImageNet-style image folder into shards readable by ShardedImageNetDataset '''
+
+import argparse
+import logging
+
+from aimet_zoo_torch.common.utils.image_net_data_loader import build_shards, compare_layouts, DEFAULT_SHARD_SIZE
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Packs an image folder (one sub-directory per class) into shards.')
+    parser.add_argument('--dataset-path', help='Path to the image folder, e.g. ILSVRC2012/val', type=str, required=True)
+    parser.add_argument('--output-path',  help='Directory to write the shards and their index to', type=str, required=True)
+    parser.add_argument('--shard-size',   help='Approximate size of each shard in bytes', type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument('--benchmark-samples', help='Compare files opened and throughput of both layouts on this many images, 0 to skip',
+                        type=int, default=1000)
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = arguments()
+    index = build_shards(args.dataset_path, args.output_path, args.shard_size)
+    print(f"Packed {len(index['samples'])} images into {len(index['shards'])} shards in {args.output_path}")
+    if args.benchmark_samples:
+        results = compare_layouts(args.dataset_path, args.output_path, args.benchmark_samples)
+        for layout, stats in results.items():
+            print(f"{layout:>9} layout | files opened: {stats['files_opened']} | {stats['images_per_second']:.1f} images/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Cached metadata of datasets (classes, per-class counts, sample paths, image sizes), so evaluators do not decode the
+whole dataset to learn e.g. its number of classes
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR
+
+
+logger = logging.getLogger('DatasetIndex')
+
+INDEX_VERSION = 1
+
+
+def directory_fingerprint(root: str) -> list:
+    """
+    mtime and size of every directory under root. Adding, removing or renaming a file changes those of its directory,
+    and only directories are stat'ed, so this stays cheap on folders of many thousand images.
+    :param root: dataset root
+    :return: [relpath, mtime_ns, size] per directory
+    """
+    fingerprint = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames.sort()
+        stat = os.stat(dirpath)
+        fingerprint.append([os.path.relpath(dirpath, root), stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+class DatasetIndexCache:
+    """
+    Stores one gzipped JSON index per (dataset root, index kind) under dataset_index/, next to the directory
+    fingerprint it was built from. An index whose fingerprint no longer matches is rebuilt.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        root = cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.index_dir = os.path.join(root, 'dataset_index')
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, root: str, kind: str, build_index) -> dict:
+        """
+        Returns the index of kind for the dataset under root, building it on a miss
+        :param root: dataset root, fingerprinted to invalidate the index
+        :param kind: name of the index, e.g. 'segmentation:<digest>'
+        :param build_index: callable returning the index as a JSON-serializable dict
+        :return: the index
+        """
+        root = os.path.abspath(root)
+        start = time.perf_counter()
+        fingerprint = directory_fingerprint(root)
+        name = hashlib.sha256(json.dumps([INDEX_VERSION, kind, root]).encode()).hexdigest()
+        index_path = os.path.join(self.index_dir, name + '.json.gz')
+        try:
+            with gzip.open(index_path, 'rt') as f_in:
+                entry = json.load(f_in)
+        except (OSError, EOFError, ValueError):
+            entry = None
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            with self._lock:
+                self.hits += 1
+            logger.info("Read %s index of %s in %.1fms", kind, root, 1e3 * (time.perf_counter() - start))
+            return entry['index']
+
+        with self._lock:
+            self.misses += 1
+        index = build_index()
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = f'{index_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with gzip.open(tmp_path, 'wt') as f_out:
+            json.dump({'fingerprint': fingerprint, 'index': index}, f_out, separators=(',', ':'))
+        os.replace(tmp_path, index_path)
+        logger.info("Built %s index of %s in %.1fs", kind, root, time.perf_counter() - start)
+        return index
+
+    @property
+    def stats(self) -> dict:
+        """Number of indexes read from the cache and built"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_dataset_index_cache() -> DatasetIndexCache:
+    """Returns the process-wide dataset index cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DatasetIndexCache()
+    return _default_cache
+
+
+def _build_segmentation_index(root: str, image_paths: list, mask_paths: list, ignore_index: int) -> dict:
+    """Reads every mask once, recording the labels it contains"""
+    class_counts = {}
+    sizes = []
+    for mask_path in mask_paths:
+        with Image.open(mask_path) as mask:
+            sizes.append(list(mask.size))
+            labels = np.unique(np.asarray(mask))
+        for label in labels.tolist():
+            if label != ignore_index:
+                class_counts[label] = class_counts.get(label, 0) + 1
+    classes = sorted(class_counts)
+    return {'classes': classes,
+            'class_counts': [class_counts[label] for label in classes],
+            'samples': [[os.path.relpath(image_path, root), os.path.relpath(mask_path, root)]
+                        for image_path, mask_path in zip(image_paths, mask_paths)],
+            'image_sizes': sizes}
+
+
+def segmentation_index(root: str, image_paths: list, mask_paths: list, ignore_index: int = 255) -> dict:
+    """
+    Metadata of a segmentation dataset, built once per dataset version
+    :param root: dataset root
+    :param image_paths: image path of every sample
+    :param mask_paths: label mask path of every sample
+    :param ignore_index: mask value that is not a class
+    :return: 'classes' (label values present in the masks), 'class_counts' (masks containing each class), 'samples'
+        ([image relpath, mask relpath]) and 'image_sizes' ([width, height] per sample)
+    """
+    kind = 'segmentation:' + hashlib.sha256(json.dumps([list(mask_paths), ignore_index]).encode()).hexdigest()
+    return get_dataset_index_cache().get(
+        root, kind, lambda: _build_segmentation_index(root, image_paths, mask_paths, ignore_index))
@@ -11,37 +11,85 @@
 """
 Creates data-loader for Image-Net dataset
 """
+import io
+import json
 import logging
+import math
 import os
+import random
+import time
 
+from PIL import Image
 from torchvision import transforms
 from torchvision.datasets.folder import default_loader, has_file_allowed_extension
 from torch.utils.data import Dataset
+import torch
 import torch.utils.data as torch_data
 
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedCache, use_preprocessed_cache
+
 
 logger = logging.getLogger('Dataloader')
 
 IMG_EXTENSIONS = '.jpg', '.jpeg', '.png', '.ppm', '.bmp', '.pgm', '.tif'
 
+SHARD_INDEX_NAME = 'index.json'
+DEFAULT_SHARD_SIZE = 1 << 30
+
+
+def open_draft(f_in, draft_size: int = None) -> Image.Image:
+    """
+    Opens an image as RGB. With draft_size, JPEGs are decoded at the smallest DCT scale (1/2, 1/4 or 1/8) whose
+    shorter side is still at least draft_size, so a following Resize(draft_size) sees nearly the same input
+    while most of the pixels it would throw away are never decoded.
+    :param f_in: path or file object of the image
+    :param draft_size: shorter side the image is resized to afterwards, None to decode at full resolution
+    :return: the RGB image
+    """
+    image = Image.open(f_in)
+    if draft_size and image.format == 'JPEG':
+        width, height = image.size
+        scale = draft_size / min(width, height)
+        image.draft('RGB', (math.ceil(width * scale), math.ceil(height * scale)))
+    return image.convert('RGB')
+
+
+class DraftLoader:
+    """
+    Picklable image loader for ImageFolder decoding JPEGs at reduced resolution, see open_draft
+    """
+
+    def __init__(self, draft_size: int):
+        """
+        :param draft_size: shorter side the images are resized to afterwards
+        """
+        self.draft_size = draft_size
+
+    def __call__(self, path: str) -> Image.Image:
+        with open(path, 'rb') as f_in:
+            return open_draft(f_in, self.draft_size)
+
 
-def make_dataset(directory: str, class_to_idx: dict, extensions: tuple, num_samples_per_class: int) -> list:
+def make_dataset(directory: str, class_to_idx: dict, extensions: tuple, num_samples_per_class: int,
+                 seed: int = None) -> list:
     """
     Creates a dataset of images with num_samples_per_class images in each class
     :param directory: The string path to the data directory.
     :param class_to_idx: A dictionary mapping the name of the class to the index (label)
     :param extensions: list of valid extensions to load data
     :param num_samples_per_class: Number of samples to use per class.
+    :param seed: Pick the samples of each class at random with this seed, instead of in directory listing order.
     :return: list of images containing the entire dataset.
     """
     images = []
     num_classes = 0
+    rng = random.Random(seed) if seed is not None else None
     directory = os.path.expanduser(directory)
     for class_name in sorted(class_to_idx.keys()):
         class_path = os.path.join(directory, class_name)
         if os.path.isdir(class_path):
             class_idx = class_to_idx[class_name]
-            class_images = add_images_for_class(class_path, extensions, num_samples_per_class, class_idx)
+            class_images = add_images_for_class(class_path, extensions, num_samples_per_class, class_idx, rng)
             images.extend(class_images)
             num_classes += 1
 
@@ -49,27 +97,38 @@ def make_dataset(directory: str, class_to_idx: dict, extensions: tuple, num_samp
     return images
 
 
-def add_images_for_class(class_path: str, extensions: tuple, num_samples_per_class: int, class_idx: int) -> list:
+def select_per_class(items: list, num_samples_per_class: int, rng: random.Random = None, key=None) -> list:
+    """
+    Picks the samples of one class. With rng, the items are sorted and then shuffled, so the pick only depends on
+    the seed and the file names. ImageFolder and ShardedImageNetDataset both select through this function, visiting
+    the classes in the same order with a single rng, so a seed selects the same images from either layout.
+    :param items: file names (or samples) of the class
+    :param num_samples_per_class: Number of samples to keep, None for all.
+    :param rng: Shuffle with rng instead of keeping the listing order.
+    :param key: sort key of the items, their file name
+    :return: the selected items
+    """
+    if rng is not None:
+        items = sorted(items, key=key)
+        rng.shuffle(items)
+    return items[:num_samples_per_class] if num_samples_per_class else list(items)
+
+
+def add_images_for_class(class_path: str, extensions: tuple, num_samples_per_class: int, class_idx: int,
+                         rng: random.Random = None) -> list:
     """
     For a given class, adds num_samples_per_class images to a list.
     :param class_path: The string path to the class directory.
     :param extensions: List of valid extensions to load data
     :param num_samples_per_class: Number of samples to use per class.
     :param class_idx: numerical index of class.
+    :param rng: Visit the files in an order shuffled by rng, instead of in directory listing order.
     :return: list of images for given class.
     """
-    class_images = []
-    count = 0
-    for file_name in os.listdir(class_path):
-        if num_samples_per_class and count >= num_samples_per_class:
-            break
-        if has_file_allowed_extension(file_name, extensions):
-            image_path = os.path.join(class_path, file_name)
-            item = (image_path, class_idx)
-            class_images.append(item)
-            count += 1
-
-    return class_images
+    file_names = [file_name for file_name in os.listdir(class_path)
+                  if has_file_allowed_extension(file_name, extensions)]
+    return [(os.path.join(class_path, file_name), class_idx)
+            for file_name in select_per_class(file_names, num_samples_per_class, rng)]
 
 
 class ImageFolder(Dataset):
@@ -79,24 +138,27 @@ class ImageFolder(Dataset):
     """
 
     def __init__(self, root: str, transform=None, target_transform=None,
-                 num_samples_per_class: int = None):
+                 num_samples_per_class: int = None, draft_size: int = None, seed: int = None):
 
         """
         :param root: The path to the data directory.
         :param transform: The required processing to be applied on the sample.
         :param target_transform:  The required processing to be applied on the target.
         :param num_samples_per_class: Number of samples to use per class.
+        :param draft_size: Decode JPEGs at reduced resolution, keeping the shorter side at least this long.
+        :param seed: Pick the samples of each class at random with this seed.
         """
         Dataset.__init__(self)
         classes, class_to_idx = self._find_classes(root)
-        self.samples = make_dataset(root, class_to_idx, IMG_EXTENSIONS, num_samples_per_class)
+        self.samples = make_dataset(root, class_to_idx, IMG_EXTENSIONS, num_samples_per_class, seed)
         if not self.samples:
             raise (RuntimeError(
                 "Found 0 files in sub folders of: {}\nSupported extensions are: {}".format(
                     root, ",".join(IMG_EXTENSIONS))))
 
         self.root = root
-        self.loader = default_loader
+        self.draft_size = draft_size
+        self.loader = DraftLoader(draft_size) if draft_size else default_loader
         self.extensions = IMG_EXTENSIONS
 
         self.classes = classes
@@ -130,20 +192,214 @@ class ImageFolder(Dataset):
         return len(self.samples)
 
 
+def is_sharded(directory: str) -> bool:
+    """
+    Tells whether directory holds packed shards written by build_shards rather than one folder per class
+    :param directory: The path to the data directory.
+    """
+    return os.path.isfile(os.path.join(os.path.expanduser(directory), SHARD_INDEX_NAME))
+
+
+def build_shards(src_dir: str, dst_dir: str, shard_size: int = DEFAULT_SHARD_SIZE) -> dict:
+    """
+    Packs an image folder (one sub-directory per class) into a few large shard files of concatenated image bytes,
+    plus an index of (shard, offset, length, label) per image. Images keep the order make_dataset lists them in.
+    :param src_dir: The path to the data directory laid out as for ImageFolder.
+    :param dst_dir: The path to write the shards and the index to.
+    :param shard_size: Approximate size in bytes of each shard.
+    :return: the index
+    """
+    classes, class_to_idx = ImageFolder._find_classes(src_dir)
+    images = make_dataset(src_dir, class_to_idx, IMG_EXTENSIONS, None)
+    os.makedirs(dst_dir, exist_ok=True)
+    index = {'classes': classes, 'shards': [], 'samples': []}
+    f_out = None
+    for path, class_idx in images:
+        if f_out is None or f_out.tell() >= shard_size:
+            if f_out:
+                f_out.close()
+            index['shards'].append('shard-{:05d}.bin'.format(len(index['shards'])))
+            f_out = open(os.path.join(dst_dir, index['shards'][-1]), 'wb')
+        with open(path, 'rb') as f_in:
+            data = f_in.read()
+        index['samples'].append([len(index['shards']) - 1, f_out.tell(), len(data), class_idx,
+                                 os.path.relpath(path, src_dir)])
+        f_out.write(data)
+    if f_out:
+        f_out.close()
+
+    # the index is written last, so a directory only looks sharded once it is complete
+    tmp_path = os.path.join(dst_dir, SHARD_INDEX_NAME + '.tmp')
+    with open(tmp_path, 'w') as f_index:
+        json.dump(index, f_index)
+    os.replace(tmp_path, os.path.join(dst_dir, SHARD_INDEX_NAME))
+    logger.info("Packed %d images into %d shards", len(index['samples']), len(index['shards']))
+    return index
+
+
+class ShardedImageNetDataset(Dataset):
+    """
+    Drop-in replacement for ImageFolder reading images from shards written by build_shards. Opening the dataset
+    reads a single index file, and each worker process opens every shard once, instead of listing every class
+    directory and opening every image file.
+    """
+
+    def __init__(self, root: str, transform=None, target_transform=None,
+                 num_samples_per_class: int = None, draft_size: int = None, seed: int = None):
+        """
+        :param root: The path to the directory holding the shards and their index.
+        :param transform: The required processing to be applied on the sample.
+        :param target_transform:  The required processing to be applied on the target.
+        :param num_samples_per_class: Number of samples to use per class.
+        :param draft_size: Decode JPEGs at reduced resolution, keeping the shorter side at least this long.
+        :param seed: Pick the samples of each class at random with this seed.
+        """
+        Dataset.__init__(self)
+        self.root = os.path.expanduser(root)
+        with open(os.path.join(self.root, SHARD_INDEX_NAME)) as f_in:
+            index = json.load(f_in)
+        self.shards = index['shards']
+        self.samples = index['samples']
+        if num_samples_per_class or seed is not None:
+            # the shards keep make_dataset's order: classes in label order, files in directory listing order
+            by_class = {}
+            for sample in self.samples:
+                by_class.setdefault(sample[3], []).append(sample)
+            rng = random.Random(seed) if seed is not None else None
+            self.samples = [sample for label in sorted(by_class)
+                            for sample in select_per_class(by_class[label], num_samples_per_class, rng,
+                                                           key=lambda sample: os.path.basename(sample[4]))]
+        logger.info("Dataset consists of %d images in %d shards", len(self.samples), len(self.shards))
+
+        self.classes = index['classes']
+        self.class_to_idx = {name: idx for idx, name in enumerate(self.classes)}
+        self.targets = [s[3] for s in self.samples]
+        self.imgs = [(os.path.join(self.root, s[4]), s[3]) for s in self.samples]
+
+        self.transform = transform
+        self.target_transform = target_transform
+        self.draft_size = draft_size
+        self.files_opened = 1
+        self._fds = {}
+        self._pid = None
+
+    def _read(self, shard: int, offset: int, length: int) -> bytes:
+        # descriptors are opened lazily per process and read with pread, so forked workers never share offsets
+        if self._pid != os.getpid():
+            self._fds = {}
+            self._pid = os.getpid()
+        if shard not in self._fds:
+            self._fds[shard] = os.open(os.path.join(self.root, self.shards[shard]), os.O_RDONLY)
+            self.files_opened += 1
+        return os.pread(self._fds[shard], length, offset)
+
+    def __getitem__(self, index: int):
+        shard, offset, length, target, _ = self.samples[index]
+        sample = open_draft(io.BytesIO(self._read(shard, offset, length)), self.draft_size)
+        if self.transform is not None:
+            sample = self.transform(sample)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+
+        return sample, target
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_fds'] = {}
+        state['_pid'] = None
+        return state
+
+    def __del__(self):
+        if getattr(self, '_pid', None) == os.getpid():
+            for fd in self._fds.values():
+                os.close(fd)
+
+
+def compare_layouts(images_dir: str, shards_dir: str, num_samples: int = 1000) -> dict:
+    """
+    Decodes the same images from the directory layout and from the shards, reporting files opened and throughput
+    :param images_dir: The path to the data directory laid out as for ImageFolder.
+    :param shards_dir: The path to shards built from images_dir.
+    :param num_samples: Number of images to decode from each layout.
+    :return: files opened, seconds and images per second, keyed by 'directory' and 'sharded'
+    """
+    results = {}
+    for layout, root in (('directory', images_dir), ('sharded', shards_dir)):
+        start = time.perf_counter()
+        data_set = ImageFolder(root) if layout == 'directory' else ShardedImageNetDataset(root)
+        num_images = min(num_samples, len(data_set))
+        for index in range(num_images):
+            data_set[index]
+        seconds = time.perf_counter() - start
+        if layout == 'directory':
+            # one listing of the root and of every class directory, then one open per image
+            files_opened = 1 + len(data_set.classes) + num_images
+        else:
+            files_opened = data_set.files_opened
+        results[layout] = {'files_opened': files_opened, 'seconds': seconds, 'images_per_second': num_images / seconds}
+        logger.info("%s layout: %d files opened, %.1f images/s", layout, files_opened, num_images / seconds)
+    return results
+
+
+def compare_draft_decode(images_dir: str, image_size: int = 224, num_samples: int = 200, model=None) -> dict:
+    """
+    Checks reduced-resolution decoding against full decoding on the same images, through the validation transforms
+    :param images_dir: The path to the data directory (folders or shards), e.g. a small synthetic JPEG set
+    :param image_size: The length of the image
+    :param num_samples: Number of images to decode in each mode
+    :param model: Optional classifier; when given, the top-1 agreement between both decodes is reported
+    :return: images per second of both modes, mean and max absolute difference of the normalized inputs and,
+        with a model, the fraction of images whose top-1 prediction is unchanged
+    """
+    val_transforms = transforms.Compose([
+        transforms.Resize(image_size + 24),
+        transforms.CenterCrop(image_size),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])])
+    data_set_cls = ShardedImageNetDataset if is_sharded(images_dir) else ImageFolder
+    results = {}
+    inputs = {}
+    for mode, draft_size in (('full', None), ('draft', image_size + 24)):
+        data_set = data_set_cls(images_dir, transform=val_transforms, draft_size=draft_size)
+        num_images = min(num_samples, len(data_set))
+        start = time.perf_counter()
+        inputs[mode] = torch.stack([data_set[index][0] for index in range(num_images)])
+        results[mode + '_images_per_second'] = num_images / (time.perf_counter() - start)
+    difference = (inputs['full'] - inputs['draft']).abs()
+    results['mean_abs_difference'] = difference.mean().item()
+    results['max_abs_difference'] = difference.max().item()
+    if model is not None:
+        with torch.no_grad():
+            device = next(model.parameters()).device
+            top1 = {mode: model(batch.to(device)).argmax(dim=1) for mode, batch in inputs.items()}
+        results['top1_agreement'] = (top1['full'] == top1['draft']).float().mean().item()
+    logger.info("Full decode: %.1f images/s, draft decode: %.1f images/s, mean abs difference %.4f",
+                results['full_images_per_second'], results['draft_images_per_second'], results['mean_abs_difference'])
+    return results
+
+
 class ImageNetDataLoader:
     """
     For loading Validation data from the ImageNet dataset.
     """
 
     def __init__(self, images_dir: str, image_size: int, batch_size: int = 128,
-                 is_training: bool = False, num_workers: int = 8, num_samples_per_class: int = None):
+                 is_training: bool = False, num_workers: int = 8, num_samples_per_class: int = None,
+                 use_cache: bool = None, fast_decode: bool = False, seed: int = None):
         """
-        :param images_dir: The path to the data directory
+        :param images_dir: The path to the data directory, or to shards written by build_shards
         :param image_size: The length of the image
         :param batch_size: The batch size to use for training and validation
         :param is_training: Indicates whether to load the training or validation data
         :param num_workers: Indiicates to the data loader how many sub-processes to use for data loading.
         :param num_samples_per_class: Number of samples to use per class.
+        :param use_cache: Serve validation batches from the preprocessed-image cache. Defaults to
+            $AIMET_ZOO_PREPROCESSED_CACHE
+        :param fast_decode: Decode validation JPEGs at reduced resolution ahead of Resize, see open_draft
+        :param seed: Pick the num_samples_per_class samples of each class at random with this seed
         """
 
         # For normalization, mean and std dev values are calculated per channel
@@ -163,21 +419,32 @@ class ImageNetDataLoader:
             transforms.ToTensor(),
             normalize])
 
+        # directories packed with build_shards are read through their index instead of listing folders
+        data_set_cls = ShardedImageNetDataset if is_sharded(images_dir) else ImageFolder
+        if not is_training and use_preprocessed_cache(use_cache):
+            # Resize and CenterCrop are deterministic, so their output is computed once and memory-mapped
+            data_set = data_set_cls(root=images_dir, num_samples_per_class=num_samples_per_class,
+                                    draft_size=image_size + 24 if fast_decode else None, seed=seed)
+            self._data_loader = PreprocessedCache().loader(data_set, image_size + 24, image_size, batch_size,
+                                                           num_workers=num_workers)
+            return
+
         if is_training:
-            data_set = ImageFolder(
+            data_set = data_set_cls(
                 root=images_dir, transform=self.train_transforms,
-                num_samples_per_class=num_samples_per_class)
+                num_samples_per_class=num_samples_per_class, seed=seed)
         else:
-            data_set = ImageFolder(
+            data_set = data_set_cls(
                 root=images_dir, transform=self.val_transforms,
-                num_samples_per_class=num_samples_per_class)
+                num_samples_per_class=num_samples_per_class,
+                draft_size=image_size + 24 if fast_decode else None, seed=seed)
 
         self._data_loader = torch_data.DataLoader(
             data_set, batch_size=batch_size, shuffle=is_training,
             num_workers=num_workers, pin_memory=True)
 
     @property
-    def data_loader(self) -> torch_data.DataLoader:
+    def data_loader(self):
         """
         Returns the data-loader
         """
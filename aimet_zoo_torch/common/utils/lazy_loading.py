@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Memory-mapped checkpoint loading, so that model startup does not hold a second in-RAM copy of the weights
+"""
+import copy
+import inspect
+import itertools
+import json
+import logging
+import os
+import resource
+import time
+import zipfile
+
+import torch
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR, memoized_sha256sum
+from aimet_zoo_torch.common.quantsim_cache import aimet_version
+
+
+logger = logging.getLogger('LazyLoading')
+
+_LOAD_PARAMS = inspect.signature(torch.load).parameters
+MMAP_SUPPORTED = 'mmap' in _LOAD_PARAMS and \
+                 'assign' in inspect.signature(torch.nn.Module.load_state_dict).parameters
+# whole pickled models need full unpickling, which newer torch versions disable by default
+_PICKLE_KWARGS = {'weights_only': False} if 'weights_only' in _LOAD_PARAMS else {}
+
+CONVERTED_SUFFIX = '.mmap'
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def _log_load(path: str, start: float, mmap: bool):
+    logger.info("Loaded %s in %.2fs (mmap=%s), peak RSS %.0f MB",
+                os.path.basename(path), time.perf_counter() - start, mmap, peak_rss_mb())
+
+
+def load_checkpoint(path: str, use_mmap: bool = True):
+    """
+    Loads a checkpoint on CPU. When supported, tensor storages are memory-mapped from the file instead of being
+    read into RAM, so pages are only brought in while they are copied into the model.
+    :param path: path to a checkpoint saved with torch.save
+    :param use_mmap: memory-map the checkpoint if the file format and the torch version allow it
+    :return: the deserialized checkpoint
+    """
+    start = time.perf_counter()
+    mmap = use_mmap and MMAP_SUPPORTED and zipfile.is_zipfile(path)
+    if mmap:
+        checkpoint = torch.load(path, map_location='cpu', mmap=True, **_PICKLE_KWARGS)
+    else:
+        checkpoint = torch.load(path, map_location='cpu', **_PICKLE_KWARGS)
+    _log_load(path, start, mmap)
+    return checkpoint
+
+
+def load_state_dict_lazy(module: torch.nn.Module, path: str, key: str = None, use_mmap: bool = True):
+    """
+    Streams a memory-mapped state dict into module. load_state_dict copies parameter by parameter, so the
+    process never holds more than the module itself plus the pages of the tensor being copied.
+    :param module: module to load the weights into
+    :param path: path to a checkpoint holding a state dict
+    :param key: optional key of the state dict inside the checkpoint, e.g. 'state_dict'
+    :param use_mmap: memory-map the checkpoint if possible
+    """
+    checkpoint = load_checkpoint(path, use_mmap)
+    module.load_state_dict(checkpoint[key] if key else checkpoint)
+    del checkpoint
+
+
+def _source_meta(source_path: str) -> dict:
+    """What a file derived from source_path depends on: the SHA-256 of the source and the torch version"""
+    digests_dir = os.path.join(os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR), 'digests')
+    return {'source_sha256': memoized_sha256sum(source_path, digests_dir), 'torch': torch.__version__}
+
+
+def _read_meta(path: str) -> dict:
+    """Sidecar <path>.json of a derived file, empty if missing or unreadable"""
+    try:
+        with open(path + '.json') as f_in:
+            return json.load(f_in)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: str, meta: dict):
+    tmp_path = f'{path}.json.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f_out:
+        json.dump(meta, f_out)
+    os.replace(tmp_path, path + '.json')
+
+
+def _save_skeleton(model: torch.nn.Module, path: str):
+    """Saves model as its meta-device skeleton plus its state dict, the format read by _restore_skeleton.
+    model itself is moved to the meta device"""
+    state_dict = model.state_dict()
+    skeleton = model.to('meta')
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    torch.save({'skeleton': skeleton, 'state_dict': state_dict}, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _restore_skeleton(path: str):
+    """Rebuilds a module saved by _save_skeleton around its memory-mapped state dict, None if that is not possible"""
+    checkpoint = load_checkpoint(path)
+    model = checkpoint['skeleton']
+    model.load_state_dict(checkpoint['state_dict'], assign=True)
+    if any(tensor.is_meta for tensor in itertools.chain(model.parameters(), model.buffers())):
+        # tensors outside of the state dict (non-persistent buffers) cannot be restored from the skeleton
+        return None
+    return model
+
+
+def convert_pickled_model(path: str) -> str:
+    """
+    Converts a checkpoint holding a whole pickled nn.Module, once, into a mmap-friendly file next to it.
+    The converted file stores the state dict as zip records plus the module skeleton with its parameters
+    and buffers on the meta device. A sidecar records the SHA-256 of the source, so a replaced checkpoint is
+    converted again even if it kept the mtime of the old one.
+    :param path: path to the pickled model
+    :return: path to the converted checkpoint
+    """
+    converted_path = path + CONVERTED_SUFFIX
+    meta = _source_meta(path)
+    cached_meta = _read_meta(converted_path)
+    if os.path.exists(converted_path) and all(cached_meta.get(name) == value for name, value in meta.items()):
+        return converted_path
+    start = time.perf_counter()
+    _save_skeleton(torch.load(path, map_location='cpu', **_PICKLE_KWARGS), converted_path)
+    _write_meta(converted_path, meta)
+    logger.info("Converted %s to a mmap-friendly checkpoint in %.2fs", os.path.basename(path), time.perf_counter() - start)
+    return converted_path
+
+
+def load_pickled_model(path: str, use_mmap: bool = True) -> torch.nn.Module:
+    """
+    Loads a checkpoint holding a whole pickled nn.Module, with its weights memory-mapped from a converted copy
+    :param path: path to the pickled model
+    :param use_mmap: memory-map the weights if the torch version allows it
+    :return: the loaded module, on CPU
+    """
+    if not (use_mmap and MMAP_SUPPORTED):
+        return load_checkpoint(path, use_mmap=False)
+    model = _restore_skeleton(convert_pickled_model(path))
+    if model is None:
+        logger.warning("%s cannot be restored from its state dict, loading it fully", os.path.basename(path))
+        return load_checkpoint(path, use_mmap=False)
+    return model
+
+
+def load_or_build_model(source_path: str, cache_path: str, build_model) -> torch.nn.Module:
+    """
+    Returns the module build_model() derives from the weights at source_path, e.g. a cross-layer equalized model.
+    The result is persisted at cache_path with a sidecar recording the SHA-256 of source_path and the aimet_torch
+    version, and later runs restore it (memory-mapped when supported) instead of rebuilding, until the source weights
+    or aimet_torch change.
+    :param source_path: weights the module is derived from
+    :param cache_path: where to persist the derived module
+    :param build_model: callable building the derived module
+    :return: the derived module, on CPU
+    """
+    # the derivation (e.g. cross-layer equalization) is done by aimet_torch, another version may derive other weights
+    meta = {**_source_meta(source_path), 'aimet_torch': aimet_version()}
+    cached_meta = _read_meta(cache_path)
+
+    if all(cached_meta.get(name) == value for name, value in meta.items()) and os.path.exists(cache_path):
+        start = time.perf_counter()
+        model = _restore_skeleton(cache_path) if MMAP_SUPPORTED else load_checkpoint(cache_path, use_mmap=False)
+        if model is not None:
+            logger.info("Restored %s in %.2fs, building it took %.2fs", os.path.basename(cache_path),
+                        time.perf_counter() - start, cached_meta['build_seconds'])
+            return model
+
+    start = time.perf_counter()
+    model = build_model().cpu()
+    meta['build_seconds'] = time.perf_counter() - start
+    logger.info("Built %s in %.2fs", os.path.basename(cache_path), meta['build_seconds'])
+    if MMAP_SUPPORTED:
+        _save_skeleton(copy.deepcopy(model), cache_path)
+    else:
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, cache_path)
+    _write_meta(cache_path, meta)
+    return model
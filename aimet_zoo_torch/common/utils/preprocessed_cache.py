@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Cache of deterministically preprocessed (resized and center cropped) images, stored as a memory-mapped uint8 array
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+from torchvision import transforms
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR
+
+
+logger = logging.getLogger('PreprocessedCache')
+
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+CACHE_VERSION = 1
+
+
+def use_preprocessed_cache(use_cache: bool = None) -> bool:
+    """Resolves an opt-in flag, None meaning $AIMET_ZOO_PREPROCESSED_CACHE (off unless set to 1)"""
+    if use_cache is None:
+        return os.environ.get('AIMET_ZOO_PREPROCESSED_CACHE', '0') == '1'
+    return use_cache
+
+
+def _to_uint8_chw(image) -> torch.Tensor:
+    """PIL image to a CHW uint8 tensor, i.e. ToTensor without the conversion to float"""
+    return torch.from_numpy(np.asarray(image, dtype=np.uint8).transpose(2, 0, 1).copy())
+
+
+def dataset_digest(data_set) -> str:
+    """
+    Digest of an image dataset (ImageFolder or ShardedImageNetDataset) built from its sample list plus the mtimes of
+    the directories (or shards) holding the images, which change whenever files are added, removed or renamed
+    :param data_set: dataset exposing root and imgs, a list of (path, label)
+    :return: hex digest
+    """
+    root = data_set.root
+    entries = [(os.path.relpath(path, root), label) for path, label in data_set.imgs]
+    if hasattr(data_set, 'shards'):
+        # ShardedImageNetDataset: the images live in the shard files
+        watched = list(data_set.shards)
+    else:
+        watched = ['.'] + sorted({os.path.dirname(path) for path, _ in entries})
+    mtimes = [(name, os.stat(os.path.join(root, name)).st_mtime_ns) for name in watched]
+    description = json.dumps({'root': os.path.abspath(root), 'samples': entries, 'mtimes': mtimes})
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+class PreprocessedDataset(Dataset):
+    """Map-style view of the images of a PreprocessedDataLoader, returning one normalized (image, label) per index"""
+
+    def __init__(self, images: np.ndarray, labels: np.ndarray, indices: np.ndarray, mean: torch.Tensor,
+                 std: torch.Tensor):
+        self.images = images
+        self.labels = labels
+        self.indices = indices
+        self.mean = mean
+        self.std = std
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index: int):
+        index = self.indices[index]
+        image = torch.from_numpy(np.array(self.images[index])).float().div_(255)
+        return image.sub_(self.mean[0]).div_(self.std[0]), int(self.labels[index])
+
+
+class PreprocessedDataLoader:
+    """
+    Iterates (images, labels) batches sliced from a memory-mapped uint8 array of preprocessed images, converting to
+    float and normalizing on the fly. Random horizontal flips, if any, are applied per sample after slicing.
+    Exposes the DataLoader attributes the evaluation helpers read (dataset, batch_size, num_workers, ...), and
+    subset() for the helpers that shard or permute a loader.
+    """
+    num_workers = 0
+    collate_fn = None
+    pin_memory = False
+    drop_last = False
+    worker_init_fn = None
+
+    def __init__(self, images: np.ndarray, labels: np.ndarray, batch_size: int, shuffle: bool = False,
+                 mean: tuple = IMAGENET_MEAN, std: tuple = IMAGENET_STD, flip_p: float = 0., indices=None):
+        """
+        :param images: (N, 3, H, W) uint8 array
+        :param labels: (N,) int64 array
+        :param batch_size: number of images per batch
+        :param shuffle: visit the images in a random order
+        :param mean: per-channel normalization mean
+        :param std: per-channel normalization std
+        :param flip_p: probability of flipping each image horizontally
+        :param indices: only visit these images, in this order. Defaults to all images
+        """
+        self.images = images
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.mean = torch.tensor(mean).view(1, -1, 1, 1)
+        self.std = torch.tensor(std).view(1, -1, 1, 1)
+        self.flip_p = flip_p
+        self.indices = np.arange(len(labels)) if indices is None else np.asarray(indices, dtype=np.int64)
+        self.dataset = PreprocessedDataset(images, labels, self.indices, self.mean, self.std)
+
+    def subset(self, indices) -> 'PreprocessedDataLoader':
+        """
+        Loader over some of the images of this loader, e.g. the shard of a rank or a seeded permutation
+        :param indices: positions in this loader's dataset, visited in this order
+        :return: the new loader, sharing the memory-mapped images
+        """
+        loader = copy.copy(self)
+        loader.indices = self.indices[np.asarray(indices, dtype=np.int64)]
+        loader.dataset = PreprocessedDataset(self.images, self.labels, loader.indices, self.mean, self.std)
+        return loader
+
+    def __len__(self):
+        return -(-len(self.indices) // self.batch_size)
+
+    def __iter__(self):
+        order = self.indices[np.random.permutation(len(self.indices))] if self.shuffle else self.indices
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            if not self.shuffle and np.all(np.diff(indices) == 1):
+                # contiguous slices are read straight from the mapped pages
+                images = self.images[indices[0]:indices[-1] + 1]
+                labels = self.labels[indices[0]:indices[-1] + 1]
+            else:
+                if self.shuffle:
+                    indices = np.sort(indices)
+                images = self.images[indices]
+                labels = self.labels[indices]
+            images = torch.from_numpy(np.ascontiguousarray(images)).float().div_(255)
+            if self.flip_p:
+                flip = torch.rand(len(images)) < self.flip_p
+                images[flip] = images[flip].flip(-1)
+            yield images.sub_(self.mean).div_(self.std), torch.from_numpy(np.asarray(labels, dtype=np.int64))
+
+
+class PreprocessedCache:
+    """
+    Stores the resized and center cropped images of a dataset once under preprocessed/<key>/, keyed by the dataset
+    digest and the transform spec, as an (N, 3, crop, crop) uint8 array that later runs memory-map
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        root = cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.preprocessed_dir = os.path.join(root, 'preprocessed')
+
+    def _populate(self, entry_dir: str, data_set, resize: int, crop: int, num_workers: int):
+        """Decodes and crops every image once, writing them in dataset order into a temporary memmap renamed into place"""
+        tmp_dir = f'{entry_dir}.{os.getpid()}.tmp'
+        os.makedirs(tmp_dir)
+        start = time.perf_counter()
+        images = np.lib.format.open_memmap(os.path.join(tmp_dir, 'images.npy'), mode='w+', dtype=np.uint8,
+                                           shape=(len(data_set), 3, crop, crop))
+        labels = np.empty(len(data_set), dtype=np.int64)
+        # the caller keeps using data_set, its own transform is put back once the images are written
+        transform = data_set.transform
+        data_set.transform = transforms.Compose([transforms.Resize(resize), transforms.CenterCrop(crop), _to_uint8_chw])
+        try:
+            offset = 0
+            for batch, targets in DataLoader(data_set, batch_size=64, shuffle=False, num_workers=num_workers):
+                images[offset:offset + len(batch)] = batch.numpy()
+                labels[offset:offset + len(batch)] = targets.numpy()
+                offset += len(batch)
+        finally:
+            data_set.transform = transform
+        images.flush()
+        del images
+        np.save(os.path.join(tmp_dir, 'labels.npy'), labels)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f_out:
+            json.dump({'num_images': len(labels), 'build_seconds': time.perf_counter() - start}, f_out)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # another process finished the same dataset first, keep its copy
+            shutil.rmtree(tmp_dir)
+        logger.info("Preprocessed %d images in %.1fs", len(labels), time.perf_counter() - start)
+
+    def loader(self, data_set, resize: int, crop: int, batch_size: int, shuffle: bool = False,
+               flip_p: float = 0., mean: tuple = IMAGENET_MEAN, std: tuple = IMAGENET_STD,
+               num_workers: int = 8) -> PreprocessedDataLoader:
+        """
+        Returns a loader over the preprocessed images of data_set, preprocessing them on the first call
+        :param data_set: ImageFolder-like dataset exposing root, imgs and transform
+        :param resize: size passed to Resize
+        :param crop: size passed to CenterCrop
+        :param batch_size: number of images per batch
+        :param shuffle: visit the images in a random order
+        :param flip_p: probability of flipping each image horizontally, applied on the fly
+        :param mean: per-channel normalization mean
+        :param std: per-channel normalization std
+        :param num_workers: data loader workers used to decode the images on a miss
+        :return: the loader
+        """
+        spec = {'version': CACHE_VERSION, 'resize': resize, 'crop': crop, 'interpolation': 'bilinear',
+                'draft_size': getattr(data_set, 'draft_size', None)}
+        key = hashlib.sha256(json.dumps({'dataset': dataset_digest(data_set), 'transform': spec},
+                                        sort_keys=True).encode()).hexdigest()
+        entry_dir = os.path.join(self.preprocessed_dir, key)
+        if not os.path.exists(os.path.join(entry_dir, 'meta.json')):
+            os.makedirs(self.preprocessed_dir, exist_ok=True)
+            self._populate(entry_dir, data_set, resize, crop, num_workers)
+        images = np.load(os.path.join(entry_dir, 'images.npy'), mmap_mode='r')
+        labels = np.load(os.path.join(entry_dir, 'labels.npy'))
+        return PreprocessedDataLoader(images, labels, batch_size, shuffle, mean, std, flip_p)
+
+
+def compare_with_pil(pil_loader, cached_loader, num_batches: int = 50) -> dict:
+    """
+    Measures the throughput of a PIL-decoding data loader against a loader over the preprocessed cache
+    :param pil_loader: data loader decoding and transforming images with PIL
+    :param cached_loader: loader returned by PreprocessedCache.loader for the same dataset
+    :param num_batches: number of batches to time from each loader
+    :return: images per second, keyed by 'pil' and 'cached'
+    """
+    results = {}
+    for name, data_loader in (('pil', pil_loader), ('cached', cached_loader)):
+        num_images = 0
+        start = time.perf_counter()
+        for index, (images, _) in enumerate(data_loader):
+            num_images += len(images)
+            if index + 1 >= num_batches:
+                break
+        results[name] = num_images / (time.perf_counter() - start)
+    logger.info("PIL decoding: %.1f images/s, preprocessed cache: %.1f images/s", results['pil'], results['cached'])
+    return results
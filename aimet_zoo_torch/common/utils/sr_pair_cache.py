@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Cache of the low-res/high-res image pairs of super-resolution test sets, stored as memory-mapped uint8 arrays so the
+HR crops and bicubic LR images are computed once per dataset, scale and pair recipe
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from aimet_zoo_torch.common.artifact_cache import DEFAULT_CACHE_DIR
+
+
+logger = logging.getLogger('SRPairCache')
+
+CACHE_VERSION = 1
+
+
+def image_files_digest(image_paths: list) -> str:
+    """
+    Digest of a list of image files built from their names, sizes and mtimes
+    :param image_paths: paths of the HR images
+    :return: hex digest
+    """
+    entries = []
+    for path in image_paths:
+        stat = os.stat(path)
+        entries.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+
+class SRPairCache:
+    """
+    Stores the pairs of a dataset under sr_pairs/<key>/ as two flat uint8 files, lr.bin and hr.bin, plus the offset
+    and shape of every image in index.json. The key covers the dataset digest, the scaling factor and a description
+    of how the pairs are made (crop policy, resize implementation), so changing any of them builds a new entry.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        :param cache_dir: root directory of the cache. Defaults to $AIMET_ZOO_CACHE_DIR or ~/.cache/aimet_zoo
+        """
+        root = cache_dir or os.environ.get('AIMET_ZOO_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.pairs_dir = os.path.join(root, 'sr_pairs')
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.
+        self.load_seconds = 0.
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _populate(entry_dir: str, image_paths: list, make_pair):
+        """Makes every pair once, appending them in dataset order to temporary files renamed into place"""
+        tmp_dir = f'{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp'
+        os.makedirs(tmp_dir)
+        start = time.perf_counter()
+        index = []
+        offsets = {'lr': 0, 'hr': 0}
+        with open(os.path.join(tmp_dir, 'lr.bin'), 'wb') as lr_out, \
+                open(os.path.join(tmp_dir, 'hr.bin'), 'wb') as hr_out:
+            for path in image_paths:
+                entry = {'path': os.path.basename(path)}
+                for name, img, f_out in zip(('lr', 'hr'), make_pair(path), (lr_out, hr_out)):
+                    img = np.ascontiguousarray(img, dtype=np.uint8)
+                    f_out.write(img.tobytes())
+                    entry[name] = [offsets[name], list(img.shape)]
+                    offsets[name] += img.size
+                index.append(entry)
+        with open(os.path.join(tmp_dir, 'index.json'), 'w') as f_out:
+            json.dump({'pairs': index, 'build_seconds': time.perf_counter() - start}, f_out)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # another process finished the same dataset first, keep its copy
+            shutil.rmtree(tmp_dir)
+
+    @staticmethod
+    def _map(path: str, size: int) -> np.ndarray:
+        """Read-only memory map of a flat uint8 file, an empty array for an empty dataset"""
+        return np.memmap(path, dtype=np.uint8, mode='r') if size else np.empty(0, dtype=np.uint8)
+
+    def get(self, image_paths: list, scaling_factor, make_pair, spec: dict) -> list:
+        """
+        Returns the LR/HR pairs of the HR images at image_paths, making and storing them on a miss
+        :param image_paths: paths of the HR images, in dataset order
+        :param scaling_factor: SR scaling factor
+        :param make_pair: make_pair(path) returns the (lr, hr) uint8 HWC arrays of an image
+        :param spec: JSON-serializable description of make_pair, e.g. crop policy and resize implementation
+        :return: list of (lr, hr) read-only uint8 HWC arrays backed by the memory-mapped files
+        """
+        start = time.perf_counter()
+        key = hashlib.sha256(json.dumps({'version': CACHE_VERSION, 'dataset': image_files_digest(image_paths),
+                                         'scaling_factor': scaling_factor, 'spec': spec},
+                                        sort_keys=True).encode()).hexdigest()
+        entry_dir = os.path.join(self.pairs_dir, key)
+        hit = os.path.exists(os.path.join(entry_dir, 'index.json'))
+        if not hit:
+            os.makedirs(self.pairs_dir, exist_ok=True)
+            self._populate(entry_dir, image_paths, make_pair)
+
+        with open(os.path.join(entry_dir, 'index.json')) as f_in:
+            meta = json.load(f_in)
+        index = meta['pairs']
+        sizes = {name: sum(int(np.prod(entry[name][1])) for entry in index) for name in ('lr', 'hr')}
+        arrays = {name: self._map(os.path.join(entry_dir, name + '.bin'), sizes[name]) for name in ('lr', 'hr')}
+        pairs = []
+        for entry in index:
+            pair = []
+            for name in ('lr', 'hr'):
+                offset, shape = entry[name]
+                pair.append(arrays[name][offset:offset + int(np.prod(shape))].reshape(shape))
+            pairs.append(tuple(pair))
+
+        seconds = time.perf_counter() - start
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.load_seconds += seconds
+            else:
+                self.misses += 1
+                self.build_seconds += seconds
+        if hit:
+            logger.info("Loaded %d LR/HR pairs in %.1fms (built in %.2fs)", len(pairs), 1e3 * seconds,
+                        meta['build_seconds'])
+        else:
+            logger.info("Built %d LR/HR pairs in %.2fs", len(pairs), seconds)
+        return pairs
+
+    @property
+    def stats(self) -> dict:
+        """Number of datasets loaded from the cache and built, and the seconds spent on each"""
+        return {'hits': self.hits, 'misses': self.misses, 'load_seconds': self.load_seconds,
+                'build_seconds': self.build_seconds}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_sr_pair_cache() -> SRPairCache:
+    """Returns the process-wide SR pair cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SRPairCache()
+    return _default_cache
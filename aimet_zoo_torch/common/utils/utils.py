@@ -8,6 +8,7 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 
+import argparse
 import torch
 
 # Returns 'cuda' only when use_cuda is True and a GPU is available 
@@ -17,3 +18,14 @@ def get_device(args):
         raise Exception('use-cuda set to True, but cuda is not available')
     return torch.device('cuda' if args.use_cuda else 'cpu')
 
+
+# argparse type for boolean flags: type=bool turns any non-empty string, "False" included, into True
+def str2bool(value):
+    if isinstance(value, bool):
+        return value
+    if value.lower() in ('yes', 'true', 't', 'y', '1'):
+        return True
+    if value.lower() in ('no', 'false', 'f', 'n', '0'):
+        return False
+    raise argparse.ArgumentTypeError('Boolean value expected.')
+
@@ -13,7 +13,7 @@ from aimet_zoo_torch.deeplabv3.model.utils.metrics import Evaluator
 import torch
 import random
 import numpy as np
-from tqdm import tqdm
+from aimet_zoo_torch.common.fan_out_eval import FanOutEvaluator
 
 
 class DataloaderConfig():
@@ -44,25 +44,26 @@ def get_dataloaders_and_eval_func(pascal_path):
     config = DataloaderConfig(dataset_path=pascal_path)
     train_loader, val_loader, test_loader, num_class = make_data_loader(config, **kwargs)
 
-    def eval_func(model, args): 
+    def eval_step(model, batch, evaluator, device):
+        images, label = batch
+        output = model(images.to(device))
+        pred = torch.argmax(output, 1).data.cpu().numpy()
+        evaluator.add_batch(label.cpu().numpy(), pred)
+
+    def eval_func(model, args):
+        """mIoU of model, or of every model of a {name: model} dict on a single pass over the data"""
         iterations = args[0]
         device = args[1]
-        evaluator = Evaluator(21) # 21 for Pascal, 150 for ADE20k
-        evaluator.reset()
-        model.eval()
-        model.to(device)
-        total_samples = 0
-        for sample in tqdm(val_loader):
-            images, label = sample
-            images, label = images.to(device), label.cpu().numpy()
-            output = model(images)
-            pred = torch.argmax(output, 1).data.cpu().numpy()
-            evaluator.add_batch(label, pred)
-            total_samples += images.size()[0]
-            if type(iterations)==int and iterations > 0 and total_samples >= iterations:
-                break
-        mIoU = evaluator.Mean_Intersection_over_Union()
-        return mIoU
+        models = model if isinstance(model, dict) else {None: model}
+        for m in models.values():
+            m.eval()
+            m.to(device)
+        num_samples = iterations if type(iterations)==int else -1
+        accumulators = FanOutEvaluator(val_loader, num_samples).evaluate(
+            models, lambda m, batch, evaluator: eval_step(m, batch, evaluator, device),
+            lambda: Evaluator(21)) # 21 for Pascal, 150 for ADE20k
+        mIoUs = {name: evaluator.Mean_Intersection_over_Union() for name, evaluator in accumulators.items()}
+        return mIoUs if isinstance(model, dict) else mIoUs[None]
 
     return train_loader, val_loader, eval_func
 
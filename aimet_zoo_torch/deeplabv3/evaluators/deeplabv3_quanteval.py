@@ -16,7 +16,8 @@ import urllib.request
 from tqdm import tqdm
 import argparse
 from aimet_zoo_torch.deeplabv3 import DeepLabV3_Plus
-from aimet_zoo_torch.common.utils.utils import get_device
+from aimet_zoo_torch.common.utils.utils import get_device, str2bool
+from aimet_zoo_torch.common.utils.dataset_index import segmentation_index
 from aimet_zoo_torch.deeplabv3.dataloader import get_dataloaders_and_eval_func
 
 # Torch related imports
@@ -32,7 +33,7 @@ def arguments():
     parser.add_argument('--batch-size',			help='Data batch size for a model', type = int, default=4)
     parser.add_argument('--default-output-bw',  help='Default output bitwidth for quantization.', type = int, default=8)
     parser.add_argument('--default-param-bw',   help='Default parameter bitwidth for quantization.', type = int, default=8)
-    parser.add_argument('--use-cuda',           help='Run evaluation on GPU.', type = bool, default=True)
+    parser.add_argument('--use-cuda',           help='Run evaluation on GPU.', type = str2bool, default=True)
     args = parser.parse_args()
     return args
 
@@ -55,13 +56,10 @@ def main():
 
     train_loader, val_loader, eval_func = get_dataloaders_and_eval_func(pascal_path = args.dataset_path)
 
-    uniques = torch.Tensor().to(device)
-    for X, Y in val_loader:
-        uniq = torch.unique(Y).to(device)
-        uniques = torch.cat([uniques, uniq])
-    input_shape = X.shape
-    uniques = torch.unique(uniques)
-    num_classes = uniques.shape[0] - 1
+    # label values found in the validation masks, other than the 255 boundary
+    val_set = val_loader.dataset
+    index = segmentation_index(args.dataset_path, val_set.images, val_set.categories)
+    num_classes = len(index['classes'])
 
     # Load original model
     model_orig = DeepLabV3_Plus(model_config=args.model_config, num_classes=num_classes)
@@ -75,24 +73,22 @@ def main():
     model_optim.model.to(device)
     model_optim.model.eval()
 
-    print('Evaluating Original Model')
-    sim_orig = model_orig.get_quantsim(quantized=False)
+    sim_orig = model_orig.get_quantsim(quantized=False, device=device)
     sim_orig.compute_encodings(eval_func, [iterations, device]) # dont use AdaRound encodings for the original model
-    mIoU_orig_fp32 = eval_func(model_orig.model, [iterations, device])
-    del model_orig
-    torch.cuda.empty_cache()
-    mIoU_orig_int8 = eval_func(sim_orig.model, [iterations, device])
-    del sim_orig
-    torch.cuda.empty_cache()
-
-    print('Evaluating Optimized Model')
-    sim_optim = model_optim.get_quantsim(quantized=True)
+    sim_optim = model_optim.get_quantsim(quantized=True, device=device)
     sim_optim.compute_encodings(eval_func, [iterations, device])
-    mIoU_optim_fp32 = eval_func(model_optim.model, [iterations, device])
-    del model_optim
-    torch.cuda.empty_cache()
-    mIoU_optim_int8 = eval_func(sim_optim.model, [iterations, device])
-    del sim_optim
+
+    print('Evaluating Original and Optimized Models')
+    # all four models are evaluated on a single pass over the validation set
+    mIoUs = eval_func({'orig_fp32': model_orig.model,
+                       'orig_int8': sim_orig.model,
+                       'optim_fp32': model_optim.model,
+                       'optim_int8': sim_optim.model}, [iterations, device])
+    mIoU_orig_fp32 = mIoUs['orig_fp32']
+    mIoU_orig_int8 = mIoUs['orig_int8']
+    mIoU_optim_fp32 = mIoUs['optim_fp32']
+    mIoU_optim_int8 = mIoUs['optim_int8']
+    del model_orig, sim_orig, model_optim, sim_optim
     torch.cuda.empty_cache()
 
     print(f'Original Model | 32-bit Environment | mIoU: {mIoU_orig_fp32:.4f}')
@@ -12,6 +12,7 @@ import torch
 import json
 import os
 from aimet_zoo_torch.common.downloader import Downloader
+from aimet_zoo_torch.common.utils.lazy_loading import load_pickled_model, load_state_dict_lazy, load_or_build_model
 from .modeling.deeplab import DeepLab
 from aimet_torch.cross_layer_equalization import equalize_model
 from aimet_torch.quantsim import QuantizationSimModel, load_encodings_to_sim
@@ -32,6 +33,7 @@ class DeepLabV3_Plus(Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.model = DeepLab(backbone = 'mobilenet',
@@ -45,34 +47,30 @@ class DeepLabV3_Plus(Downloader):
         self.input_shape = tuple(x if x != None else 1 for x in self.cfg['input_shape'])
         self.model_config = model_config
 
+    def _build_equalized_model(self):
+        """applies cross-layer equalization to the model and loads the optimized weights into it"""
+        equalize_model(self.model, self.input_shape)
+        load_state_dict_lazy(self.model, self.path_post_opt_weights)
+        return self.model
+
     def from_pretrained(self, quantized=False):
         if not self.cfg:
             raise NotImplementedError('There are no pretrained weights available for the model_config passed')
-        self._download_pre_opt_weights()
-        self._download_post_opt_weights()
-        self._download_aimet_config()
-        self._download_aimet_encodings()
-        self._download_adaround_encodings()
+        self._download_artifacts()
         if quantized:
             if self.model_config == 'dlv3_w4a8':
-                self.model = torch.load(self.path_post_opt_weights)
+                self.model = load_pickled_model(self.path_post_opt_weights)
             else:
-                equalize_model(self.model, self.input_shape)
-                state_dict = torch.load(self.path_post_opt_weights)
-                self.model.load_state_dict(state_dict)
-                del state_dict
+                # the equalized model is persisted next to the weights, so CLE only runs once per checkpoint
+                self.model = load_or_build_model(self.path_post_opt_weights, self.path_post_opt_weights + '.cle',
+                                                 self._build_equalized_model)
         else:
-            checkpoint = torch.load(self.path_pre_opt_weights)
-            self.model.load_state_dict(checkpoint['state_dict'])
-            del checkpoint
+            load_state_dict_lazy(self.model, self.path_pre_opt_weights, key='state_dict')
         self.model.cuda()
 
-    def get_quantsim(self, quantized=False):
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
-        device = torch.device('cuda')
+    def get_quantsim(self, quantized=False, device=None):
+        """get quantsim object with pre-loaded encodings, on device (defaults to cuda when available, else cpu)"""
+        device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
             'quant_scheme': self.cfg['optimization_config']['quantization_configuration']['quant_scheme'],
@@ -80,9 +78,16 @@ class DeepLabV3_Plus(Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self.model.cuda(), **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-        return sim
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self.model.to(device), **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
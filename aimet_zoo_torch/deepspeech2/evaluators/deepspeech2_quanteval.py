@@ -16,7 +16,7 @@ from the SeanNaren repo with manual configuration of quantization ops.
 
 import os
 import argparse
-import urllib.request
+from aimet_zoo_torch.common.range_download import download_file
 
 import torch
 
@@ -354,14 +354,14 @@ def download_weights():
     """
     # Download original model
     if not os.path.exists("./librispeech_pretrained_v2.pth"):
-        urllib.request.urlretrieve(
+        download_file(
             "https://github.com/SeanNaren/deepspeech.pytorch/releases/download/v2.0/librispeech_pretrained_v2.pth",
             "librispeech_pretrained_v2.pth",
         )
 
     # Download config file
     if not os.path.exists("./default_config.json"):
-        urllib.request.urlretrieve(
+        download_file(
             "https://raw.githubusercontent.com/quic/aimet/release-aimet-1.22.1/TrainingExtensions/common/src/python/aimet_common/quantsim_config/default_config_per_channel.json",
             "default_config.json",
         )
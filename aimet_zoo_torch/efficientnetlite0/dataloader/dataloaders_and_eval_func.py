@@ -13,35 +13,37 @@ import torchvision
 from torchvision import transforms as T
 from torch.utils.data import Dataset, DataLoader
 from tqdm import tqdm
+from aimet_zoo_torch.common.loader_pool import get_loader_pool
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedCache, use_preprocessed_cache
 
 # ImageNet data loader
-def get_imagenet_dataloader(image_dir, BATCH_SIZE=64):
-    def generate_dataloader(data, transform, batch_size=BATCH_SIZE):
-        if data is None:
-            return None
-
-        if transform is None:
-            dataset = torchvision.datasets.ImageFolder(data, transform=T.ToTensor())
-        else:
-            dataset = torchvision.datasets.ImageFolder(data, transform=transform)
-
-        dataloader = DataLoader(dataset, batch_size=batch_size,
-                                shuffle=False, num_workers=4)
-
-        return dataloader
-
-    # Define transformation
-    preprocess_transform_pretrain = T.Compose([
-        T.Resize(256),  # Resize images to 256 x 256
-        T.CenterCrop(224),  # Center crop image
-        T.RandomHorizontalFlip(),
-        T.ToTensor(),  # Converting cropped images to tensors
-        T.Normalize(mean=[0.485, 0.456, 0.406],
-                    std=[0.229, 0.224, 0.225])
-    ])
-
-    dataloader = generate_dataloader(image_dir, transform=preprocess_transform_pretrain, batch_size=BATCH_SIZE)
-    return dataloader
+def get_imagenet_dataloader(image_dir, BATCH_SIZE=64, use_cache=None, num_samples=None):
+    """
+    ImageNet loader kept in the loader pool, so repeated evaluation and calibration calls reuse the scanned
+    dataset and its workers. num_samples restricts it to the first samples, e.g. for calibration
+    """
+    if image_dir is None:
+        return None
+    if use_preprocessed_cache(use_cache):
+        # Resize and CenterCrop are cached, the random flip that follows them is applied on the fly
+        return PreprocessedCache().loader(torchvision.datasets.ImageFolder(image_dir), 256, 224, BATCH_SIZE,
+                                          flip_p=0.5, num_workers=4)
+
+    def make_dataset():
+        # Define transformation
+        preprocess_transform_pretrain = T.Compose([
+            T.Resize(256),  # Resize images to 256 x 256
+            T.CenterCrop(224),  # Center crop image
+            T.RandomHorizontalFlip(),
+            T.ToTensor(),  # Converting cropped images to tensors
+            T.Normalize(mean=[0.485, 0.456, 0.406],
+                        std=[0.229, 0.224, 0.225])
+        ])
+        return torchvision.datasets.ImageFolder(image_dir, transform=preprocess_transform_pretrain)
+
+    return get_loader_pool().loader((image_dir, 'resize256_crop224_flip'), make_dataset, batch_size=BATCH_SIZE,
+                                    num_samples=num_samples, shuffle=False, num_workers=4)
 
 
 def eval_func(model, DATA_DIR, BATCH_SIZE=16):
@@ -49,31 +51,29 @@ def eval_func(model, DATA_DIR, BATCH_SIZE=16):
     # Get Dataloader
     dataloader_eval = get_imagenet_dataloader(DATA_DIR, BATCH_SIZE)
 
-    correct = 0
-    total_samples = 0
+    accumulator = ClassificationAccumulator(topk=(1,))
     on_cuda = next(model.parameters()).is_cuda
 
     with torch.no_grad():
         for data, label in tqdm(dataloader_eval):
             if on_cuda:
                 data, label = data.cuda(), label.cuda()
-            output = model(data)
-            _, prediction = torch.max(output, 1)
-            correct += (prediction == label).sum()
-            total_samples += len(output)
+            accumulator.update(model(data), label)
 
-    return float(100 * correct / total_samples)
+    return accumulator.compute()['top1']
 
 
 def pass_calibration_data(model, args):
     """Forward pass for encoding calculations"""
     # Get Dataloader
 
-    dataloader_encoding = get_imagenet_dataloader(args['evaluation_dataset'])
+    samples = 100  # number of samples for validation
+    # the loop below stops after the first batch taking it past `samples`, so only those batches are loaded
+    num_batches = samples // args['batch_size'] + 1
+    dataloader_encoding = get_imagenet_dataloader(args['evaluation_dataset'], num_samples=num_batches * 64)
     on_cuda = next(model.parameters()).is_cuda
     model.eval()
     batch_counter = 0
-    samples = 100  # number of samples for validation
     with torch.no_grad():
         for input_data, target_data in dataloader_encoding:
             if on_cuda:
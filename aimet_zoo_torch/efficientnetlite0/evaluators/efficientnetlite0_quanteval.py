@@ -15,6 +15,7 @@ import argparse
 import torch
 
 # aimet model zoo imports
+from aimet_zoo_torch.common.loader_pool import get_loader_pool
 from aimet_zoo_torch.common.utils.image_net_data_loader import ImageNetDataLoader
 from aimet_zoo_torch.efficientnetlite0.dataloader import eval_func, forward_pass
 from aimet_zoo_torch.efficientnetlite0 import EfficientNetLite0
@@ -74,6 +75,8 @@ def main():
     sim.compute_encodings(forward_pass, forward_pass_callback_args=encoding_dataloader.data_loader)
     quant_acc = eval_func(sim.model, config.dataset_path, config.batch_size)
     print(f'=========Quantized model Accuracy: {quant_acc:0.2f}% ')
+    # shut down the persistent workers of the pooled loaders
+    get_loader_pool().clear()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -32,6 +32,7 @@ class EfficientNetLite0(Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.input_shape = tuple(x if x is not None else 1 for x in self.cfg['input_shape'])
@@ -41,11 +42,7 @@ class EfficientNetLite0(Downloader):
     def from_pretrained(self, quantized=False):
         if not self.cfg:
             raise NotImplementedError('There are no pretrained weights available for the model_config passed')
-        self._download_pre_opt_weights()
-        self._download_post_opt_weights()
-        self._download_aimet_config()
-        self._download_aimet_encodings()
-        self._download_adaround_encodings()
+        self._download_artifacts()
         if quantized:
             self.model = torch.load(self.path_post_opt_weights)
         else:
@@ -53,14 +50,11 @@ class EfficientNetLite0(Downloader):
             self.model.cuda()
         self.model.eval()
 
-    def get_quantsim(self, quantized=False):
+    def get_quantsim(self, quantized=False, device=None):
+        """get quantsim object with pre-loaded encodings, on device (defaults to cuda when available, else cpu)"""
         if not self.cfg:
             raise NotImplementedError('There is no Quantization Simulation available for the model_config passed')
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
-        device = torch.device('cuda')
+        device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
             'quant_scheme': self.cfg['optimization_config']['quantization_configuration']['quant_scheme'],
@@ -68,15 +62,22 @@ class EfficientNetLite0(Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self.model.cuda(), **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-            print('load_encodings_to_sim finished!')
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-            print('set_and_freeze_param_encodings finished!')
-        sim.model.eval()
-        return sim
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self.model.to(device), **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+                print('load_encodings_to_sim finished!')
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+                print('set_and_freeze_param_encodings finished!')
+            sim.model.eval()
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
 
     def __call__(self, x):
         return self.model(x)
\ No newline at end of file
@@ -103,7 +103,8 @@ def eval_metrics(iou_acc, net, mf_score=None):
         "command": " ".join(sys.argv[1:]),
     }
     # logx.save_model(save_dict, metric=mean_iu, epoch=epoch)
-    torch.cuda.synchronize()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
 
     print("-" * 107)
 
@@ -82,7 +82,7 @@ def calc_err_mask_all(pred, gtruth, num_classes):
     return err_mask.astype(int)
 
 
-def eval_minibatch(data, net, calc_metrics, gpu_id, fp16, align_corners):
+def eval_minibatch(data, net, calc_metrics, gpu_id, fp16, align_corners, device=None):
     """
     Evaluate a single minibatch of images.
      * calculate metrics
@@ -92,9 +92,12 @@ def eval_minibatch(data, net, calc_metrics, gpu_id, fp16, align_corners):
       1. 'MSCALE', or in-model multi-scale: where the multi-scale iteration loop is
          handled within the model itself (see networks/mscale.py -> nscale_forward())
       2. 'multi_scale_inference', where we use Averaging to combine scales
+
+    device is where net and the images are run, by default cuda:<gpu_id> when CUDA is available, else the CPU
     """
     torch.cuda.empty_cache()
-    device = torch.device("cuda:" + str(gpu_id) if torch.cuda.is_available() else "cpu")
+    if device is None:
+        device = torch.device("cuda:" + str(gpu_id) if torch.cuda.is_available() else "cpu")
     if fp16:
         net = net.half()
     net = net.to(device)
@@ -130,10 +133,9 @@ def eval_minibatch(data, net, calc_metrics, gpu_id, fp16, align_corners):
         # with other scales of prediction
 
     output = resize_tensor(_pred.float(), input_size, align_corners)
-    assert_msg = "output_size {} gt_cuda size {}"
-    gt_cuda = gt_image.cuda()
-    assert_msg = assert_msg.format(output.size()[2:], gt_cuda.size()[1:])
-    assert output.size()[2:] == gt_cuda.size()[1:], assert_msg
+    assert_msg = "output_size {} gt size {}"
+    assert_msg = assert_msg.format(output.size()[2:], gt_image.size()[1:])
+    assert output.size()[2:] == gt_image.size()[1:], assert_msg
     assert output.size()[1] == CITYSCAPES_NUM_CLASSES, assert_msg
 
     ## Update loss and scoring datastructure
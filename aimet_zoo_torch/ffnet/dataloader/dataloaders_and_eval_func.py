@@ -10,24 +10,51 @@
 from .cityscapes.utils.misc import eval_metrics
 from .cityscapes.utils.trnval_utils import eval_minibatch
 from .cityscapes.dataloader.get_dataloaders import return_dataloader
-from tqdm import tqdm
+import os
+import numpy as np
+import torch.distributed as dist
+from aimet_zoo_torch.common.distributed_eval import all_reduce_sum, is_distributed, shard_loader
+from aimet_zoo_torch.common.eval_checkpoint import EvalCheckpoint, model_fingerprint
+from aimet_zoo_torch.common.fan_out_eval import FanOutEvaluator
+from aimet_zoo_torch.ffnet.model.config import CITYSCAPES_NUM_CLASSES
 
 
 
-def get_dataloaders_and_eval_func(dataset_path, batch_size, num_workers=4):
+def get_dataloaders_and_eval_func(dataset_path, batch_size, num_workers=4, checkpoint_dir=None):
+    """
+    :param checkpoint_dir: if set, evaluations periodically save their progress there and resume from it after an
+        interruption
+    """
     val_loader = return_dataloader(num_workers, batch_size, cityscapes_base_path=dataset_path)
 
+    def eval_step(model, data, iou_acc):
+        # run where the model already is, e.g. on the CPU of a gloo rank of a CUDA machine
+        device = next(model.parameters()).device
+        iou_acc += eval_minibatch(data, model, True, 0, False, False, device=device)
+
     # Define evaluation func to evaluate model with data_loader
     def eval_func(model, args=None):
-        iterations = args[0] if type(args)==list and len(args)>0 else float('inf')
-        model.eval()
-        iou_acc = 0
-
-        for data in tqdm(val_loader, desc='evaluate'):
-            _iou_acc = eval_minibatch(data, model, True, 0, False, False)
-            iou_acc += _iou_acc
-        mean_iou = eval_metrics(iou_acc, model)
-
-        return mean_iou
+        """mean IoU of model, or of every model of a {name: model} dict on a single pass over the data"""
+        iterations = args[0] if type(args)==list and len(args)>0 else -1
+        models = model if isinstance(model, dict) else {None: model}
+        for m in models.values():
+            m.eval()
+        # under torchrun every rank evaluates its own shard of the validation set
+        rank, world_size = (dist.get_rank(), dist.get_world_size()) if is_distributed() else (0, 1)
+        num_samples = -(-iterations // world_size) if iterations > 0 else iterations
+        checkpoint = None
+        if checkpoint_dir is not None:
+            # only resumed for the same weights, data and arguments
+            key = {'models': {str(name): model_fingerprint(m) for name, m in models.items()},
+                   'dataset_path': dataset_path, 'batch_size': batch_size, 'iterations': iterations,
+                   'rank': rank, 'world_size': world_size}
+            checkpoint = EvalCheckpoint(os.path.join(checkpoint_dir, f'ffnet_eval.{rank}.ckpt'), key)
+        # the confusion matrices are summed in place, one per model, then across ranks
+        accumulators = FanOutEvaluator(shard_loader(val_loader), num_samples).evaluate(
+            models, eval_step, lambda: np.zeros((CITYSCAPES_NUM_CLASSES, CITYSCAPES_NUM_CLASSES), dtype=np.int64),
+            checkpoint=checkpoint)
+        accumulators = {name: all_reduce_sum(accumulator) for name, accumulator in accumulators.items()}
+        mean_ious = {name: eval_metrics(accumulators[name], m) for name, m in models.items()}
+        return mean_ious if isinstance(model, dict) else mean_ious[None]
 
     return None, val_loader, eval_func
\ No newline at end of file
@@ -19,7 +19,8 @@ sys.path.append(os.path.dirname(sys.path[0]))
 import argparse
 from tqdm import tqdm
 from functools import partial
-from aimet_zoo_torch.common.utils.utils import get_device
+from aimet_zoo_torch.common.utils.utils import get_device, str2bool
+from aimet_zoo_torch.common.distributed_eval import init_from_env, is_main_process
 from aimet_zoo_torch.ffnet.dataloader import get_dataloaders_and_eval_func
 from aimet_zoo_torch.ffnet import FFNet
 
@@ -47,9 +48,10 @@ def seed(seed_number):
 def eval_func(model, dataloader):
     model.eval()
     iou_acc = 0
+    device = next(model.parameters()).device
 
     for data in tqdm(dataloader, desc='evaluate'):
-        _iou_acc = eval_minibatch(data, model, True, 0, False, False)
+        _iou_acc = eval_minibatch(data, model, True, 0, False, False, device=device)
         iou_acc += _iou_acc
     mean_iou = eval_metrics(iou_acc, model)
 
@@ -86,7 +88,8 @@ def arguments():
     parser.add_argument('--batch-size',         help='Data batch size for a model', type=int, default=8)
     parser.add_argument('--default-output-bw',  help='Default output bitwidth for quantization.', type=int, default=8)
     parser.add_argument('--default-param-bw',   help='Default parameter bitwidth for quantization.', type=int, default=8)
-    parser.add_argument('--use-cuda',           help='Run evaluation on GPU.', type=bool, default=True)
+    parser.add_argument('--use-cuda',           help='Run evaluation on GPU.', type=str2bool, default=True)
+    parser.add_argument('--checkpoint-dir',     help='Periodically save evaluation progress here and resume from it', type=str, default=None)
     args = parser.parse_args()
     return args
 
@@ -107,6 +110,8 @@ def main(args):
     config = ModelConfig(args)
     device = get_device(args)
     print(f'device: {device}')
+    # with torchrun, each rank evaluates a shard of the validation set
+    init_from_env()
 
     # Load original model
     model_orig = FFNet(model_config = config.model_config)
@@ -123,7 +128,8 @@ def main(args):
     model_optim.model.eval()
 
     # Get Dataloader
-    train_loader, val_loader, eval_func = get_dataloaders_and_eval_func(dataset_path = config.dataset_path, batch_size = config.batch_size, num_workers = 4)
+    train_loader, val_loader, eval_func = get_dataloaders_and_eval_func(dataset_path = config.dataset_path, batch_size = config.batch_size, num_workers = 4,
+                                                                    checkpoint_dir = config.checkpoint_dir)
 
     # Initialize Quantized model
     dummy_input = torch.rand(config.input_shape, device=device)
@@ -132,38 +138,37 @@ def main(args):
     ModelValidator.validate_model(model_orig.model, dummy_input)
     ModelValidator.validate_model(model_optim.model, dummy_input)
 
-    print('Evaluating Original Model')
-    sim_orig = model_orig.get_quantsim(quantized=False)
+    sim_orig = model_orig.get_quantsim(quantized=False, device=device)
     #sim_orig = QuantizationSimModel(model_orig, **kwargs)
     if "pre_down" in config.model_config:
         sim_orig.model.smoothing.output_quantizer.enabled = False
         sim_orig.model.smoothing.param_quantizers['weight'].enabled = False
     # forward_func = partial(forward_pass, device)
     # sim_orig.compute_encodings(forward_func, forward_pass_callback_args=val_loader)
-    
-    mIoU_orig_fp32 = eval_func(model_orig.model, None)
-    del model_orig
-    torch.cuda.empty_cache()
-    mIoU_orig_int8 = eval_func(sim_orig.model, None)
-    del sim_orig
-    torch.cuda.empty_cache()
 
-    print('Evaluating Optimized Model')
-    sim_optim = model_optim.get_quantsim(quantized=True)
+    sim_optim = model_optim.get_quantsim(quantized=True, device=device)
     #sim_optim = QuantizationSimModel(model_optim, **kwargs)
     if "pre_down" in config.model_config:
-        sim_orig.model.smoothing.output_quantizer.enabled = False
-        sim_orig.model.smoothing.param_quantizers['weight'].enabled = False
+        sim_optim.model.smoothing.output_quantizer.enabled = False
+        sim_optim.model.smoothing.param_quantizers['weight'].enabled = False
     forward_func = partial(forward_pass, device)
     sim_optim.compute_encodings(forward_func, forward_pass_callback_args=val_loader)
 
-    mIoU_optim_fp32 = eval_func(model_optim.model, None)
-    del model_optim
-    torch.cuda.empty_cache()
-    mIoU_optim_int8 = eval_func(sim_optim.model, None)
-    del sim_optim
+    print('Evaluating Original and Optimized Models')
+    # all four models are evaluated on a single pass over the validation set
+    mIoUs = eval_func({'orig_fp32': model_orig.model,
+                       'orig_int8': sim_orig.model,
+                       'optim_fp32': model_optim.model,
+                       'optim_int8': sim_optim.model})
+    mIoU_orig_fp32 = mIoUs['orig_fp32']
+    mIoU_orig_int8 = mIoUs['orig_int8']
+    mIoU_optim_fp32 = mIoUs['optim_fp32']
+    mIoU_optim_int8 = mIoUs['optim_int8']
+    del model_orig, sim_orig, model_optim, sim_optim
     torch.cuda.empty_cache()
 
+    if not is_main_process():
+        return
     print(f'Original Model | 32-bit Environment | mIoU: {mIoU_orig_fp32:.4f}')
     print(f'Original Model | {config.default_param_bw}-bit Environment | mIoU: {mIoU_orig_int8:.4f}')
     print(f'Optimized Model | 32-bit Environment | mIoU: {mIoU_optim_fp32:.4f}')
@@ -1,10 +1,13 @@
 # Copyright (c) 2022 Qualcomm Technologies, Inc.
 # All Rights Reserved.
 
-from .ffnet_S_mobile import *
-from .ffnet_NS_mobile import *
-from .ffnet_gpu_large import *
-from .ffnet_S_gpu_large import *
-from .ffnet_N_gpu_large import *
-from .ffnet_gpu_small import *
-from .ffnet_S_gpu_small import *
+# Variant modules are imported on first use through the registry index instead of eagerly,
+# so importing this package does not build all model constructors.
+from .model_registry import list_models, model_entrypoint, _model_index
+
+
+def __getattr__(name):
+    # keeps `from aimet_zoo_torch.ffnet.model import segmentation_ffnet...` working
+    if name in _model_index:
+        return model_entrypoint(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
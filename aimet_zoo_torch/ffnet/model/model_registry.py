@@ -1,10 +1,130 @@
 # Copyright (c) 2022 Qualcomm Technologies, Inc.
 # All Rights Reserved.
 
+import importlib
 import sys
 
 _model_entrypoints = {}
 
+# static index of the constructors registered by every variant module, so that looking up one model
+# only imports the module that defines it. Keep in sync when adding @register_model functions.
+_module_models = {
+    "ffnet_S_mobile": (
+        "segmentation_ffnet86S_dBBB_mobile",
+        "segmentation_ffnet78S_dBBB_mobile",
+        "segmentation_ffnet54S_dBBB_mobile",
+        "segmentation_ffnet40S_dBBB_mobile",
+        "segmentation_ffnet150S_BBB_mobile_pre_down",
+        "segmentation_ffnet86S_BBB_mobile_pre_down",
+        "segmentation_ffnet78S_BBB_mobile_pre_down",
+        "segmentation_ffnet54S_BBB_mobile_pre_down",
+        "segmentation_ffnet40S_BBB_mobile_pre_down",
+        "segmentation_ffnet150S_BCC_mobile_pre_down",
+        "segmentation_ffnet86S_BCC_mobile_pre_down",
+        "segmentation_ffnet78S_BCC_mobile_pre_down",
+        "segmentation_ffnet54S_BCC_mobile_pre_down",
+        "segmentation_ffnet40S_BCC_mobile_pre_down",
+        "segmentation_ffnet150S_BBB_mobile",
+        "segmentation_ffnet86S_BBB_mobile",
+        "segmentation_ffnet78S_BBB_mobile",
+        "segmentation_ffnet54S_BBB_mobile",
+        "segmentation_ffnet40S_BBB_mobile",
+        "segmentation_ffnet150S_BCC_mobile",
+        "segmentation_ffnet86S_BCC_mobile",
+        "segmentation_ffnet78S_BCC_mobile",
+        "segmentation_ffnet54S_BCC_mobile",
+        "segmentation_ffnet40S_BCC_mobile",
+        "classification_ffnet150S_BBX_mobile",
+        "classification_ffnet86S_BBX_mobile",
+        "classification_ffnet78S_BBX_mobile",
+        "classification_ffnet54S_BBX_mobile",
+        "classification_ffnet40S_BBX_mobile",
+        "segmentation_ffnet78S_BCC_mobile_pre_down_train",
+    ),
+    "ffnet_NS_mobile": (
+        "segmentation_ffnet122NS_CBB_mobile_pre_down",
+        "segmentation_ffnet74NS_CBB_mobile_pre_down",
+        "segmentation_ffnet46NS_CBB_mobile_pre_down",
+        "segmentation_ffnet122NS_CCC_mobile_pre_down",
+        "segmentation_ffnet74NS_CCC_mobile_pre_down",
+        "segmentation_ffnet46NS_CCC_mobile_pre_down",
+        "segmentation_ffnet122NS_CBB_mobile",
+        "segmentation_ffnet74NS_CBB_mobile",
+        "segmentation_ffnet46NS_CBB_mobile",
+        "segmentation_ffnet122NS_CCC_mobile",
+        "segmentation_ffnet74NS_CCC_mobile",
+        "segmentation_ffnet46NS_CCC_mobile",
+        "classification_ffnet122NS_CBX_mobile",
+        "classification_ffnet74NS_CBX_mobile",
+        "classification_ffnet46NS_CBX_mobile",
+        "segmentation_ffnet122NS_CBB_mobile_pre_down_train",
+    ),
+    "ffnet_gpu_large": (
+        "segmentation_ffnet150_AAA",
+        "segmentation_ffnet134_AAA",
+        "segmentation_ffnet101_AAA",
+        "segmentation_ffnet86_AAA",
+        "segmentation_ffnet56_AAA",
+        "segmentation_ffnet50_AAA",
+        "segmentation_ffnet34_AAA",
+        "segmentation_ffnet150_ABB",
+        "segmentation_ffnet86_ABB",
+        "segmentation_ffnet56_ABB",
+        "segmentation_ffnet34_ABB",
+        "segmentation_ffnet150_AAA_train",
+    ),
+    "ffnet_S_gpu_large": (
+        "segmentation_ffnet150S_BBB",
+        "segmentation_ffnet86S_BBB",
+        "segmentation_ffnet86S_BBB_train",
+    ),
+    "ffnet_N_gpu_large": (
+        "segmentation_ffnet122N_CBB",
+        "segmentation_ffnet74N_CBB",
+        "segmentation_ffnet46N_CBB",
+        "classification_ffnet122N_CBX",
+        "classification_ffnet74N_CBX",
+        "classification_ffnet46N_CBX",
+        "segmentation_ffnet122N_CBB_train",
+    ),
+    "ffnet_gpu_small": (
+        "segmentation_ffnet150_dAAA",
+        "segmentation_ffnet134_dAAA",
+        "segmentation_ffnet101_dAAA",
+        "segmentation_ffnet86_dAAA",
+        "segmentation_ffnet56_dAAA",
+        "segmentation_ffnet50_dAAA",
+        "segmentation_ffnet34_dAAA",
+        "segmentation_ffnet18_dAAA",
+        "segmentation_ffnet150_dAAC",
+        "segmentation_ffnet86_dAAC",
+        "segmentation_ffnet34_dAAC",
+        "segmentation_ffnet18_dAAC",
+        "classification_ffnet150_AAX",
+        "classification_ffnet134_AAX",
+        "classification_ffnet101_AAX",
+        "classification_ffnet86_AAX",
+        "classification_ffnet56_AAX",
+        "classification_ffnet50_AAX",
+        "classification_ffnet34_AAX",
+        "classification_ffnet18_AAX",
+        "segmentation_ffnet150_dAAC_train",
+    ),
+    "ffnet_S_gpu_small": (
+        "segmentation_ffnet150S_dBBB",
+        "segmentation_ffnet86S_dBBB",
+        "classification_ffnet150S_BBX",
+        "classification_ffnet86S_BBX",
+        "segmentation_ffnet86S_dBBB_train",
+    ),
+}
+
+_model_index = {
+    model_name: module_name
+    for module_name, model_names in _module_models.items()
+    for model_name in model_names
+}
+
 
 def register_model(fn):
     # lookup containing module
@@ -21,12 +141,19 @@ def register_model(fn):
     return fn
 
 
+def list_models():
+    """List the names of all known models, without importing their modules"""
+    return sorted(set(_model_index) | set(_model_entrypoints))
+
+
 def model_entrypoint(model_name):
-    """Fetch a model entrypoint for specified model name"""
+    """Fetch a model entrypoint for specified model name, importing only the module that defines it"""
+    if model_name not in _model_entrypoints and model_name in _model_index:
+        importlib.import_module(f"{__package__}.{_model_index[model_name]}")
     if model_name in _model_entrypoints:
         return _model_entrypoints[model_name]
     else:
         raise RuntimeError(
             f"Unknown model ({model_name}); known models are: "
-            f"{_model_entrypoints.keys()}"
+            f"{list_models()}"
         )
@@ -32,7 +32,8 @@ import argparse
 import logging
 from itertools import chain
 import progressbar
-import urllib.request
+from aimet_zoo_torch.common.range_download import download_file
+from aimet_zoo_torch.common.archive_cache import extract_archive
 
 from torch.utils.data import DataLoader
 
@@ -103,22 +104,19 @@ def download_weights(args):
         os.mkdir(".cache")
 
     url_config = f"{OFFICIAL_URL_HEAD}/default_config.json"
-    urllib.request.urlretrieve(
-        url_config, "./.cache/default_config.json", DownloadProgressBar()
+    download_file(
+        url_config, "./.cache/default_config.json", reporthook=DownloadProgressBar()
     )
     if args.model_eval_type == "fp32":
         OFFICIAL_URL_TAR = f"{OFFICIAL_URL_HEAD}/gpt2_wikitext_finetune.tar.gz"
-        urllib.request.urlretrieve(
-            OFFICIAL_URL_TAR, "./.cache/weights.tar.gz", DownloadProgressBar()
-        )
     elif args.model_eval_type == "int8":
         OFFICIAL_URL_TAR = f"{OFFICIAL_URL_HEAD}/gpt2_wikitext_5e-5_1e-3_150_8.tar.gz"
-        urllib.request.urlretrieve(
-            OFFICIAL_URL_TAR, "./.cache/weights.tar.gz", DownloadProgressBar()
-        )
 
-    with tarfile.open("./.cache/weights.tar.gz") as pth_weights:
-        pth_weights.extractall("./.cache/")
+    # keep each archive under its own name so warm runs skip the download and reuse the extracted copy
+    tar_path = "./.cache/" + OFFICIAL_URL_TAR.split("/")[-1]
+    if not os.path.exists(tar_path):
+        download_file(OFFICIAL_URL_TAR, tar_path, reporthook=DownloadProgressBar())
+    extract_archive(tar_path, "./.cache/")
 
 
 class ModelConfig:
@@ -168,6 +166,12 @@ def parse_args():
         default=8,
         help="Batch size (per device) for the evaluation dataloader.",
     )
+    parser.add_argument(
+        "--checkpoint_dir",
+        type=str,
+        default=None,
+        help="Periodically save evaluation progress to this directory and resume from it.",
+    )
     args = parser.parse_args()
     return args
 
@@ -18,6 +18,8 @@ from aimet_torch.quantsim import QuantizationSimModel
 from aimet_torch.qc_quantize_op import QcQuantizeWrapper
 from aimet_common.defs import QuantScheme
 
+from aimet_zoo_torch.common.eval_checkpoint import EvalCheckpoint, model_fingerprint, skip_batches
+
 
 def get_dummy_input(loader):
     for batch in loader:
@@ -32,18 +34,26 @@ def get_dummy_input(loader):
         return tuple(output)
 
 
-def evaluate_model(model, iterations, loader, metric):
+def evaluate_model(model, iterations, loader, metric, checkpoint=None):
     model.eval()
     losses = []
-    for step, batch in enumerate(loader):
+    start_step = 0
+    resumed = checkpoint.load() if checkpoint is not None else None
+    if resumed is not None:
+        start_step, losses = resumed
+    for step, batch in enumerate(skip_batches(loader, start_step), start_step):
         if step < iterations:
             for k in batch.keys():
                 batch[k] = batch[k].to("cuda")
             with torch.no_grad():
                 outputs = model(**batch)
             losses.append(outputs[0].item())
+            if checkpoint is not None:
+                checkpoint.maybe_save(step + 1, losses)
         else:
             break
+    if checkpoint is not None:
+        checkpoint.clear()
     loss = np.mean(losses)
     if metric == "loss":
         return loss
@@ -77,6 +87,15 @@ def clamp_quantizer(quantized_model, clamp_min, clamp_max):
                 param.data = torch.Tensor([clamp_min]).to(param.device)
 
 
+def eval_checkpoint(config, name, model):
+    """checkpoint of the perplexity evaluation of model, None unless config.checkpoint_dir is set"""
+    if getattr(config, "checkpoint_dir", None) is None:
+        return None
+    key = {"model": model_fingerprint(model), "model_name_or_path": config.model_name_or_path,
+           "block_size": config.block_size, "batch_size": config.per_device_eval_batch_size}
+    return EvalCheckpoint(os.path.join(config.checkpoint_dir, f"gpt2_{name}_eval.ckpt"), key)
+
+
 def quantize_model(model, train_dataloader, eval_dataloader, config):
 
     metric = "perplexity"
@@ -95,7 +114,7 @@ def quantize_model(model, train_dataloader, eval_dataloader, config):
         )
 
     full_precision_model_performance = evaluate_model(
-        model, 1e5, eval_dataloader, metric
+        model, 1e5, eval_dataloader, metric, eval_checkpoint(config, "fp32", model)
     )
 
     quant_sim = QuantizationSimModel(
@@ -126,7 +145,7 @@ def quantize_model(model, train_dataloader, eval_dataloader, config):
 
     iterations=1e5
     quantized_model_performance = evaluate_model(
-        quant_sim.model, iterations, eval_dataloader, metric
+        quant_sim.model, iterations, eval_dataloader, metric, eval_checkpoint(config, "int8", quant_sim.model)
     )
     return quant_sim, full_precision_model_performance, quantized_model_performance
 
@@ -12,6 +12,7 @@ import torch
 import json
 import os
 from aimet_zoo_torch.common.downloader import Downloader
+from aimet_zoo_torch.common.utils.lazy_loading import load_pickled_model, load_state_dict_lazy, load_or_build_model
 from aimet_zoo_torch.inverseform.model.utils.config import assert_and_infer_cfg, cfg
 from aimet_zoo_torch.inverseform.model.models.lighthrnet import HRNet16
 from aimet_zoo_torch.inverseform.model.models.ocrnet import OCRNet
@@ -35,6 +36,7 @@ class HRNetInverseForm(Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.input_shape = tuple(x if x is not None else 1 for x in self.cfg['input_shape'])
@@ -53,29 +55,28 @@ class HRNetInverseForm(Downloader):
             C.MODEL.DOWN_CONV = False
             self.model = OCRNet(num_classes = num_classes, criterion=None)
     
+    def _build_equalized_model(self):
+        """applies cross-layer equalization to the model and loads the optimized weights into it"""
+        equalize_model(self.model, self.input_shape)
+        load_state_dict_lazy(self.model, self.path_post_opt_weights)
+        return self.model
+
     def from_pretrained(self, quantized=False):
         if not self.cfg:
             raise NotImplementedError('There are no pretrained weights available for the model_config passed')
-        self._download_pre_opt_weights()
-        self._download_post_opt_weights()
-        self._download_aimet_config()
-        self._download_aimet_encodings()
-        self._download_adaround_encodings()
+        self._download_artifacts()
         if quantized:
-            equalize_model(self.model, self.input_shape)
-            state_dict = torch.load(self.path_post_opt_weights)
-            self.model.load_state_dict(state_dict)
+            # the equalized model is persisted next to the weights, so CLE only runs once per checkpoint
+            self.model = load_or_build_model(self.path_post_opt_weights, self.path_post_opt_weights + '.cle',
+                                             self._build_equalized_model)
         else:
-            self.model = torch.load(self.path_pre_opt_weights)
+            self.model = load_pickled_model(self.path_pre_opt_weights)
 
-    def get_quantsim(self, quantized=False):
+    def get_quantsim(self, quantized=False, device=None):
+        """get quantsim object with pre-loaded encodings, on device (defaults to cuda when available, else cpu)"""
         if not self.cfg:
             raise NotImplementedError('There is no Quantization Simulation available for the model_config passed')
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
-        device = torch.device('cuda')
+        device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
             'quant_scheme': self.cfg['optimization_config']['quantization_configuration']['quant_scheme'],
@@ -83,11 +84,18 @@ class HRNetInverseForm(Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self.model.cuda(), **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-            print('load_encodings_to_sim finished!')
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-            print('set_and_freeze_param_encodings finished!')
-        return sim
\ No newline at end of file
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self.model.to(device), **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+                print('load_encodings_to_sim finished!')
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+                print('set_and_freeze_param_encodings finished!')
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
\ No newline at end of file
@@ -29,7 +29,7 @@
 import logging
 import os
 import sys
-import urllib
+from aimet_zoo_torch.common.range_download import download_file
 import torch
 import progressbar
 
@@ -103,12 +103,12 @@ def download_weights(data_args):
     if not os.path.exists(".cache"):
         os.mkdir(".cache")
     url_checkpoint_test = f"{OFFICIAL_URL_HEAD}/{data_args.dataset_name}_fp.pth"
-    urllib.request.urlretrieve(
-        url_checkpoint_test, "./.cache/fp.pth", DownloadProgressBar()
+    download_file(
+        url_checkpoint_test, "./.cache/fp.pth", reporthook=DownloadProgressBar()
     )
     url_checkpoint_test = f"{OFFICIAL_URL_HEAD}/{data_args.dataset_name}_qat.ckpt"
-    urllib.request.urlretrieve(
-        url_checkpoint_test, "./.cache/qat.ckpt", DownloadProgressBar()
+    download_file(
+        url_checkpoint_test, "./.cache/qat.ckpt", reporthook=DownloadProgressBar()
     )
 
 
@@ -30,7 +30,7 @@
 # python import
 import logging
 import os
-import urllib
+from aimet_zoo_torch.common.range_download import download_file
 import progressbar
 import numpy as np
 import torch
@@ -114,12 +114,12 @@ def download_weights(data_args):
     if not os.path.exists(".cache"):
         os.mkdir(".cache")
     url_checkpoint_test = f"{OFFICIAL_URL_HEAD}/{data_args.task_name}_fp.pth"
-    urllib.request.urlretrieve(
-        url_checkpoint_test, "./.cache/fp.pth", DownloadProgressBar()
+    download_file(
+        url_checkpoint_test, "./.cache/fp.pth", reporthook=DownloadProgressBar()
     )
     url_checkpoint_test = f"{OFFICIAL_URL_HEAD}/{data_args.task_name}_qat.ckpt"
-    urllib.request.urlretrieve(
-        url_checkpoint_test, "./.cache/qat.ckpt", DownloadProgressBar()
+    download_file(
+        url_checkpoint_test, "./.cache/qat.ckpt", reporthook=DownloadProgressBar()
     )
 
 
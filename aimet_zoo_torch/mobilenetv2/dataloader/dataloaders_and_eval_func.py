@@ -10,11 +10,15 @@
 
 
 import torch
+import torch.distributed as dist
 from torch.utils.data import DataLoader
 from torchvision import transforms, datasets
 import random
 import numpy as np
-from tqdm import tqdm
+from aimet_zoo_torch.common.distributed_eval import all_reduce_sum, is_distributed, shard_loader
+from aimet_zoo_torch.common.fan_out_eval import FanOutEvaluator
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedCache, use_preprocessed_cache
 
 
 def work_init(work_id):
@@ -23,7 +27,11 @@ def work_init(work_id):
     np.random.seed(init_seed + work_id)
 
 
-def make_dataloader(dataset_path, image_size, batch_size=16, num_workers=8):
+def make_dataloader(dataset_path, image_size, batch_size=16, num_workers=8, use_cache=None):
+    if use_preprocessed_cache(use_cache):
+        # Resize and CenterCrop are deterministic, so their output is computed once and memory-mapped
+        return PreprocessedCache().loader(datasets.ImageFolder(dataset_path), image_size + 24, image_size,
+                                          batch_size, shuffle=True, num_workers=num_workers)
     data_loader_kwargs = {'worker_init_fn': work_init, 'num_workers': min(num_workers, batch_size//2)}
     normalize = transforms.Normalize(mean=[0.485, 0.456, 0.406],
                                      std=[0.229, 0.224, 0.225])
@@ -37,30 +45,36 @@ def make_dataloader(dataset_path, image_size, batch_size=16, num_workers=8):
     return dataloader
 
 
-def get_dataloaders_and_eval_func(imagenet_path, image_size=224):
+def eval_step(model, batch, accumulator, device):
+    """adds the logits of a batch to accumulator, a ClassificationAccumulator kept on device"""
+    sample, label = batch
+    accumulator.update(model(sample.to(device)), label)
+
+
+def get_dataloaders_and_eval_func(imagenet_path, image_size=224, use_cache=None):
     train_loader = make_dataloader(dataset_path = imagenet_path,
-                                image_size = image_size)
+                                image_size = image_size,
+                                use_cache = use_cache)
     val_loader = make_dataloader(dataset_path = imagenet_path,
-                                image_size = image_size)
+                                image_size = image_size,
+                                use_cache = use_cache)
 
     def eval_func(model, args):
-        num_samples = args[0] if args[0] > 0 else float('inf')
+        """top-1 accuracy of model, or of every model of a {name: model} dict on a single pass over the data"""
+        num_samples = args[0]
         device = args[1]
-        top1_acc = 0.0
-        total_num = 0
-        model.to(device)
-        for idx, (sample, label) in enumerate(tqdm(val_loader)):
-            total_num += sample.size()[0]
-            sample = sample.to(device)
-            label = label.to(device)
-            logits = model(sample)
-            pred = torch.argmax(logits, dim=1)
-            correct = sum(torch.eq(pred, label)).cpu().numpy()
-            top1_acc += correct
-            if total_num >= num_samples:
-                break
-        avg_acc = top1_acc * 100. / total_num
-        return avg_acc
+        models = model if isinstance(model, dict) else {None: model}
+        for m in models.values():
+            m.to(device)
+        # under torchrun every rank evaluates its own shard and the counts are summed across ranks
+        if is_distributed() and num_samples > 0:
+            num_samples = -(-num_samples // dist.get_world_size())
+        evaluator = FanOutEvaluator(shard_loader(val_loader), num_samples)
+        accumulators = evaluator.evaluate(models, lambda m, batch, acc: eval_step(m, batch, acc, device),
+                                          lambda: ClassificationAccumulator(topk=(1,)))
+        accumulators = {name: all_reduce_sum(accumulator) for name, accumulator in accumulators.items()}
+        accuracies = {name: accumulator.compute()['top1'] for name, accumulator in accumulators.items()}
+        return accuracies if isinstance(model, dict) else accuracies[None]
 
     return train_loader, val_loader, eval_func
 
@@ -14,7 +14,12 @@ import argparse
 import torch
 from aimet_zoo_torch.mobilenetv2 import MobileNetV2
 from aimet_zoo_torch.mobilenetv2.dataloader import get_dataloaders_and_eval_func
-from aimet_zoo_torch.common.utils.utils import get_device
+from aimet_zoo_torch.mobilenetv2.dataloader.dataloaders_and_eval_func import eval_step
+from aimet_zoo_torch.common.utils.utils import get_device, str2bool
+from aimet_zoo_torch.common.calibration import calibration_loader, CalibrationRunner
+from aimet_zoo_torch.common.distributed_eval import init_from_env, is_main_process
+from aimet_zoo_torch.common.early_stop import evaluate_until_confident
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
 
 
 def arguments():
@@ -24,7 +29,9 @@ def arguments():
     parser.add_argument('--default-output-bw', help='Default output bitwidth for quantization.', type=int, default=8)
     parser.add_argument('--default-param-bw', help='Default parameter bitwidth for quantization.', type=int, default=8)
     parser.add_argument('--batch-size', help='Data batch size for a model', type=int, default=16)
-    parser.add_argument('--use-cuda', help='Run evaluation on GPU', type=bool, default=True)
+    parser.add_argument('--use-cuda', help='Run evaluation on GPU', type=str2bool, default=True)
+    parser.add_argument('--tolerance', help='Regression check: stop once the int8 - fp32 accuracy delta is known to within this many percent (95%% interval)',
+                        type=float, default=None)
     args = parser.parse_args()
     return args
 
@@ -41,6 +48,8 @@ def main():
     seed(0)
     args = arguments()
     device = get_device(args)
+    # with torchrun, each rank evaluates a shard of the validation set
+    init_from_env()
     eval_samples = -1
     encoding_samples = 2000
 
@@ -49,34 +58,57 @@ def main():
     X, Y = next(iter(val_loader))
     input_shape = X.shape
 
-    uniques = torch.Tensor().to(device)
-    for X, Y in val_loader:
-        uniq = torch.unique(Y).to(device)
-        uniques = torch.cat([uniques, uniq])
-    uniques = torch.unique(uniques)
-    num_classes = uniques.shape[0]
     dummy_input = torch.randn(input_shape)
+    # forward-only calibration on a fixed, class-stratified subset instead of eval_func over shuffled batches
+    calibration = CalibrationRunner(calibration_loader(args.dataset_path, image_size=224, num_samples=encoding_samples),
+                                    encoding_samples, device)
 
     print('### Simulating original model performance ###')
     model_fp32 = MobileNetV2(model_config = args.model_config)
     model_fp32.from_pretrained(quantized=False)
     model_fp32.model.eval()
     #sim = QuantizationSimModel(model_fp32, dummy_input=dummy_input, **kwargs)
-    sim = model_fp32.get_quantsim(quantized=False)
-    sim.compute_encodings(eval_func, [encoding_samples, device])
-    orig_acc_fp32 = eval_func(model_fp32.model.to(device), [eval_samples, device])
-    orig_acc_int8 = eval_func(sim.model.to(device), [eval_samples, device])
+    sim_fp32 = model_fp32.get_quantsim(quantized=False, device=device)
+    sim_fp32.compute_encodings(calibration, None)
+    print(f"Calibrated on {calibration.stats['samples']} samples in {calibration.stats['wall_seconds']:.1f}s")
 
     print('### Simulating quantized model performance ###')
     model_int8 = MobileNetV2(model_config = args.model_config)
     model_int8.from_pretrained(quantized=True)
     model_int8.model.eval()
     #sim = QuantizationSimModel(model_int8, dummy_input=dummy_input, **kwargs)
-    sim = model_fp32.get_quantsim(quantized=True)
-    sim.compute_encodings(eval_func, [encoding_samples, device])
-    optim_acc_fp32 = eval_func(model_int8.model.to(device), [eval_samples, device])
-    optim_acc_int8 = eval_func(sim.model.to(device), [eval_samples, device])
+    # built from model_int8: get_quantsim loads the equalized weights into the model it is called on, and
+    # model_fp32.model is still evaluated below
+    sim_int8 = model_int8.get_quantsim(quantized=True, device=device)
+    sim_int8.compute_encodings(calibration, None)
+    print(f"Calibrated on {calibration.stats['samples']} samples in {calibration.stats['wall_seconds']:.1f}s")
 
+    if args.tolerance is not None:
+        # paired fp32/int8 predictions over a seeded permutation, stopping as soon as the interval is tight enough
+        for model in (model_fp32.model, sim_int8.model):
+            model.to(device)
+        _, stats = evaluate_until_confident(val_loader, {'fp32': model_fp32.model, 'int8': sim_int8.model},
+                                            lambda m, batch, acc: eval_step(m, batch, acc, device),
+                                            lambda: ClassificationAccumulator(topk=(1,)), 'fp32', 'int8', args.tolerance)
+        print()
+        print("Regression Check Summary:")
+        print(f"Optimized int8 - original fp32 accuracy: [{stats['interval'][0]:.3f}, {stats['interval'][1]:.3f}]")
+        print(f"Samples consumed: {stats['samples']} of {stats['total_samples']}, "
+              f"{stats['seconds_saved']:.1f}s saved compared with a full pass")
+        return
+
+    # all four models are evaluated on a single pass over the validation set
+    accuracies = eval_func({'orig_fp32': model_fp32.model,
+                            'orig_int8': sim_fp32.model,
+                            'optim_fp32': model_int8.model,
+                            'optim_int8': sim_int8.model}, [eval_samples, device])
+    orig_acc_fp32 = accuracies['orig_fp32']
+    orig_acc_int8 = accuracies['orig_int8']
+    optim_acc_fp32 = accuracies['optim_fp32']
+    optim_acc_int8 = accuracies['optim_int8']
+
+    if not is_main_process():
+        return
     print()
     print("Evaluation Summary:")
     print(f"Original Model | Accuracy on 32-bit device: {orig_acc_fp32:.4f}")
@@ -10,6 +10,7 @@
 
 from .MobileNetV2 import MobileNetV2 as Mobile_Net_V2
 from aimet_zoo_torch.common.downloader import Downloader
+from aimet_zoo_torch.common.utils.lazy_loading import load_checkpoint, load_or_build_model
 import torch
 import os
 import json
@@ -32,6 +33,7 @@ class MobileNetV2(Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.model = Mobile_Net_V2(n_class = self.cfg['model_args']['num_classes'],
@@ -43,20 +45,25 @@ class MobileNetV2(Downloader):
                                        input_size = input_size,
                                        width_mult = width_mult)
 
+    def _build_equalized_model(self):
+        """applies cross-layer equalization to the model and loads the optimized weights into it"""
+        equalize_model(self.model, (1, 3, 224, 224))
+        quantized_state_dict = load_checkpoint(self.path_post_opt_weights)
+        # need to rename some state dict keys due to differences in aimet naming between when the state dict was generated and now
+        quantized_state_dict['state_dict']['classifier.weight'] = quantized_state_dict['state_dict']['classifier.1.weight']
+        del quantized_state_dict['state_dict']['classifier.1.weight']
+        quantized_state_dict['state_dict']['classifier.bias'] = quantized_state_dict['state_dict']['classifier.1.bias']
+        del quantized_state_dict['state_dict']['classifier.1.bias']
+        self.model.load_state_dict(quantized_state_dict['state_dict'])
+        return self.model
+
     def from_pretrained(self, quantized=False):
         """load pretrained weights"""
-        self._download_aimet_config()
-        self._download_post_opt_weights()
+        self._download_artifacts()
         if quantized:
-            equalize_model(self.model, (1, 3, 224, 224)) 
-            quantized_state_dict = torch.load(self.path_post_opt_weights)
-            # need to rename some state dict keys due to differences in aimet naming between when the state dict was generated and now
-            quantized_state_dict['state_dict']['classifier.weight'] = quantized_state_dict['state_dict']['classifier.1.weight']
-            del quantized_state_dict['state_dict']['classifier.1.weight']
-            quantized_state_dict['state_dict']['classifier.bias'] = quantized_state_dict['state_dict']['classifier.1.bias']
-            del quantized_state_dict['state_dict']['classifier.1.bias']
-            self.model.load_state_dict(quantized_state_dict['state_dict'])
-            del quantized_state_dict
+            # the equalized model is persisted next to the weights, so CLE only runs once per checkpoint
+            self.model = load_or_build_model(self.path_post_opt_weights, self.path_post_opt_weights + '.cle',
+                                             self._build_equalized_model)
         else:
             try:
                 from torch.hub import load_state_dict_from_url
@@ -67,12 +74,9 @@ class MobileNetV2(Downloader):
             self.model.load_state_dict(state_dict)
 
 
-    def get_quantsim(self, quantized=False):
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
-        device = torch.device('cuda')
+    def get_quantsim(self, quantized=False, device=None):
+        """get quantsim object with pre-loaded encodings, on device (defaults to cuda when available, else cpu)"""
+        device = torch.device(device or ('cuda' if torch.cuda.is_available() else 'cpu'))
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
             'quant_scheme': self.cfg['optimization_config']['quantization_configuration']['quant_scheme'],
@@ -80,9 +84,16 @@ class MobileNetV2(Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self.model.cuda(), **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-        return sim
\ No newline at end of file
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self.model.to(device), **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
\ No newline at end of file
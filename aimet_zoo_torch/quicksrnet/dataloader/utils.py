@@ -11,14 +11,31 @@
 
 import glob
 import os
+from fractions import Fraction
 from matplotlib import pyplot as plt
 import cv2
 import numpy as np
 import torch
+import torch.nn.functional as F
+from aimet_zoo_torch.common.utils.sr_pair_cache import get_sr_pair_cache
 from .imresize import imresize
 
 
-def load_dataset(test_images_dir, scaling_factor=2):
+# Cap on the low-res pixels of a batch, bounding the activation memory: 16 images of 128x128, 6 of 160x240. Batching
+# pays off on GPUs, on a single CPU core it can run slower than single images (see benchmarks/bench_sr_inference.py),
+# so the evaluators default to a batch size of 1
+MAX_BATCH_PIXELS = 1 << 18
+
+# imresize engine making the LR images. The LR pixels are truncated to uint8, so engines differing by rounding
+# noise can still shift a pixel by one, and the pair cache keys on the mode
+IMRESIZE_MODE = 'vec'
+
+# How create_hr_lr_pair makes a pair, part of the key of the on-disk pair cache
+PAIR_SPEC = {'crop': 'center, divisible by scaling factor', 'resize': 'matlab imresize bicubic',
+             'resize_mode': IMRESIZE_MODE, 'dtype': 'uint8'}
+
+
+def load_dataset(test_images_dir, scaling_factor=2, use_cache=True):
     """
     Load the images from the specified directory and develop the low-res and high-res images.
 
@@ -26,6 +43,8 @@ def load_dataset(test_images_dir, scaling_factor=2):
         Directory to get the test images from
     :param scaling_factor:
         Scaling factor to use while generating low-res images from their high-res counterparts
+    :param use_cache:
+        Read the uint8 pairs from the on-disk pair cache, making and storing them on the first run
     :return:
         Pre-processed input images for the model, and low-res and high-res images for visualization
     """
@@ -35,18 +54,36 @@ def load_dataset(test_images_dir, scaling_factor=2):
     IMAGES_HR = []
 
     # Load the test images
-    for img_path in glob.glob(os.path.join(test_images_dir, '*')):
-        img = cv2.imread(img_path)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-        lr_img, hr_img = create_hr_lr_pair(img, scaling_factor)
+    img_paths = sorted(glob.glob(os.path.join(test_images_dir, '*')))
+    make_pair = lambda img_path: read_hr_lr_pair(img_path, scaling_factor)
+    if use_cache:
+        pairs = get_sr_pair_cache().get(img_paths, scaling_factor, make_pair, PAIR_SPEC)
+    else:
+        pairs = map(make_pair, img_paths)
 
-        IMAGES_LR.append(lr_img)
-        IMAGES_HR.append(hr_img)
+    for lr_img, hr_img in pairs:
+        IMAGES_LR.append(to_tensor(lr_img))
+        IMAGES_HR.append(to_tensor(hr_img))
 
     return IMAGES_LR, IMAGES_HR
 
 
+def read_hr_lr_pair(img_path, scaling_factor=2):
+    """
+    Read an image and create its uint8 low-res and high-res image-pair.
+
+    :param img_path:
+        Path of the high-res image
+    :param scaling_factor:
+        Scaling factor to use while generating low-res images
+    :return:
+        low-res and high-res uint8 HWC images
+    """
+    img = cv2.imread(img_path)
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return create_hr_lr_uint8_pair(img, scaling_factor)
+
+
 def create_hr_lr_pair(img, scaling_factor=2):
     """
     Create low-res images from high-res images.
@@ -58,6 +95,21 @@ def create_hr_lr_pair(img, scaling_factor=2):
     :return:
         low-res and high-res image-pair
     """
+    lr_img, hr_img = create_hr_lr_uint8_pair(img, scaling_factor)
+    return to_tensor(lr_img), to_tensor(hr_img)
+
+
+def create_hr_lr_uint8_pair(img, scaling_factor=2):
+    """
+    Center-crop the high-res image and create its low-res counterpart, both as uint8 HWC images.
+
+    :param img:
+        The high-res image from which the low-res image is created
+    :param scaling_factor:
+         Scaling factor to use while generating low-res images
+    :return:
+        low-res and high-res uint8 HWC images
+    """
     height, width = img.shape[0:2]
 
     # Take the largest possible center-crop of it such that its dimensions are perfectly divisible by the scaling factor
@@ -72,7 +124,7 @@ def create_hr_lr_pair(img, scaling_factor=2):
     hr_height, hr_width = hr_img.shape[0:2]
 
     hr_img = np.array(hr_img, dtype='float64')
-    lr_img = imresize(hr_img, 1. / scaling_factor)  # equivalent to matlab's imresize
+    lr_img = imresize(hr_img, 1. / scaling_factor, mode=IMRESIZE_MODE)  # equivalent to matlab's imresize
     lr_img = np.uint8(np.clip(lr_img, 0., 255.))  # this is to simulate matlab's imwrite operation
     hr_img = np.uint8(hr_img)
 
@@ -81,13 +133,20 @@ def create_hr_lr_pair(img, scaling_factor=2):
     # Sanity check
     assert hr_width == lr_width * scaling_factor and hr_height == lr_height * scaling_factor
 
-    lr_img = torch.from_numpy(lr_img.transpose((2, 0, 1))).contiguous()
-    lr_img = lr_img.to(dtype=torch.float32).div(255)
+    return lr_img, hr_img
 
-    hr_img = torch.from_numpy(hr_img.transpose((2, 0, 1))).contiguous()
-    hr_img = hr_img.to(dtype=torch.float32).div(255)
 
-    return lr_img, hr_img
+def to_tensor(img):
+    """
+    Converts a numpy uint8 channel-last image to a torch channel-first [0., 1.] image.
+
+    :param img:
+        The uint8 HWC image, possibly a read-only view of the pair cache
+    :return:
+        The float32 CHW image
+    """
+    img = torch.from_numpy(np.ascontiguousarray(img.transpose((2, 0, 1))))
+    return img.to(dtype=torch.float32).div(255)
 
 
 def post_process(img):
@@ -127,10 +186,12 @@ def pass_calibration_data(model, calibration_data):
     :param sim_model:
         The QuantizationSimModel object to compute encodings for
     :param calibration_data:
-        Tuple containing calibration images and a flag to use GPU or CPU
+        Tuple containing calibration images, a flag to use GPU or CPU and optionally a batch size. Images of the
+        same shape are calibrated in batches of up to that size, default: 1
     """
 
-    images, use_cuda = calibration_data
+    images, use_cuda = calibration_data[:2]
+    batch_size = calibration_data[2] if len(calibration_data) > 2 else 1
     if use_cuda:
         device = torch.device('cuda')
     else:
@@ -139,8 +200,157 @@ def pass_calibration_data(model, calibration_data):
     model.eval()
 
     with torch.no_grad():
-        for itx, img in enumerate(images):
-            print(f'\rCalibrate activation encodings: {itx + 1} / {len(images)}', end='')
-            input_img = img.unsqueeze(0).to(device)
-            _ = model(input_img)
-    print('\n')
\ No newline at end of file
+        run_batched(model, images, device, batch_size, desc='Calibrate activation encodings')
+    print('\n')
+
+
+def _pad_to(img, height, width):
+    """Pad a CHW image to height x width by replicating its bottom and right borders."""
+    pad_height, pad_width = height - img.shape[-2], width - img.shape[-1]
+    if not pad_height and not pad_width:
+        return img
+    return F.pad(img.unsqueeze(0), (0, pad_width, 0, pad_height), mode='replicate').squeeze(0)
+
+
+def shape_buckets(images, batch_size, pad_multiple=None, max_pixels=MAX_BATCH_PIXELS):
+    """
+    Group images into batches of a single shape, so a fully convolutional model processes them together.
+
+    :param images:
+        The CHW images to group
+    :param batch_size:
+        Maximum number of images per batch
+    :param pad_multiple:
+        If set, pad every image up to a multiple of this size, by replicating its bottom and right borders, so
+        images of similar sizes share a bucket. Default: `None`, only images of identical shapes are batched, which
+        leaves the model outputs unchanged. Padded images differ from unpadded ones near their bottom and right edges
+    :param max_pixels:
+        Maximum number of (padded) pixels per image times images per batch, larger images are run one at a time
+    :return:
+        Generator of (indices of the images, NCHW batch, original (height, width) of the images)
+    """
+    buckets = {}
+    for index, img in enumerate(images):
+        height, width = img.shape[-2:]
+        if pad_multiple:
+            height = -(-height // pad_multiple) * pad_multiple
+            width = -(-width // pad_multiple) * pad_multiple
+        buckets.setdefault((height, width), []).append(index)
+
+    for (height, width), indices in buckets.items():
+        bucket_batch_size = max(1, min(batch_size, max_pixels // (height * width)))
+        for start in range(0, len(indices), bucket_batch_size):
+            chunk = indices[start:start + bucket_batch_size]
+            batch = torch.stack([_pad_to(images[index], height, width) for index in chunk])
+            yield chunk, batch, [tuple(images[index].shape[-2:]) for index in chunk]
+
+
+def run_batched(model, images, device, batch_size, pad_multiple=None, max_pixels=MAX_BATCH_PIXELS, desc=None):
+    """
+    Run the model on shape-bucketed batches of images and crop the outputs back to each image.
+
+    :param model:
+        The model instance to infer from
+    :param images:
+        The CHW input images
+    :param device:
+        Device to run the model on
+    :param batch_size:
+        Maximum number of images per batch
+    :param pad_multiple:
+        Padding granularity of the buckets, see shape_buckets
+    :param max_pixels:
+        Pixel budget of a batch, see shape_buckets
+    :param desc:
+        If set, progress message printed after every batch
+    :return:
+        The CHW outputs of the model, in the order of the images
+    """
+    outputs = [None] * len(images)
+    done = 0
+    for indices, batch, sizes in shape_buckets(images, batch_size, pad_multiple, max_pixels):
+        batch_out = model(batch.to(device))
+        scale_height = batch_out.shape[-2] / batch.shape[-2]
+        scale_width = batch_out.shape[-1] / batch.shape[-1]
+        for position, (index, (height, width)) in enumerate(zip(indices, sizes)):
+            outputs[index] = batch_out[position, :, :round(height * scale_height), :round(width * scale_width)]
+        done += len(indices)
+        if desc:
+            print(f'\r{desc}: {done} / {len(images)}', end='')
+    return outputs
+
+
+def _tile_starts(length, tile_size, tile_overlap, multiple=1):
+    """
+    Start of every tile along an axis, all multiples of `multiple`. The last tile runs to the end of the image, so
+    it may be up to multiple - 1 pixels longer than tile_size
+    """
+    if length <= tile_size:
+        return [0]
+    step = max(multiple, (tile_size - tile_overlap) // multiple * multiple)
+    last = (length - tile_size) // multiple * multiple
+    return list(range(0, last, step)) + [last]
+
+
+def _scale_denominator(scale):
+    """Smallest low-res step whose high-res counterpart is a whole number of pixels, 2 for a 1.5x model"""
+    return Fraction(scale).limit_denominator(16).denominator
+
+
+def _blend_ramp(length, overlap, first, last):
+    """Tile weights along an axis, ramping linearly over the overlaps with the previous and next tiles"""
+    ramp = torch.ones(length)
+    if overlap > 0:
+        edge = (torch.arange(min(overlap, length), dtype=torch.float32) + 0.5) / overlap
+        if not first:
+            ramp[:len(edge)] = edge
+        if not last:
+            ramp[-len(edge):] = torch.minimum(ramp[-len(edge):], edge.flip(0))
+    return ramp
+
+
+def run_tiled(model, img_lr, tile_size=128, tile_overlap=16):
+    """
+    Super-resolve an image tile by tile, so peak activation memory depends on the tile size and not the image size.
+    Overlapping tiles are feathered with linear weight ramps and normalized by the summed weights, which hides the
+    seams left by the zero padding at tile borders.
+
+    :param model:
+        The model instance to infer from
+    :param img_lr:
+        The (1, C, H, W) low-res image, on the model device
+    :param tile_size:
+        Side of the low-res tiles
+    :param tile_overlap:
+        Low-res pixels shared by neighbouring tiles, less than tile_size
+    :return:
+        The (1, C, H * scale, W * scale) super-resolved image, the scale may be fractional (e.g. 1.5x)
+    """
+    if not 0 <= tile_overlap < tile_size:
+        raise ValueError(f'tile_overlap must be in [0, {tile_size}), got {tile_overlap}')
+    height, width = img_lr.shape[-2:]
+    # the first tile gives the scale, with fractional scales the tiles start on low-res pixels that map to whole
+    # high-res pixels, e.g. even ones at 1.5x, so every tile lands exactly on the high-res grid
+    tile_sr = model(img_lr[..., :tile_size, :tile_size])
+    scale_height = tile_sr.shape[-2] / min(height, tile_size)
+    scale_width = tile_sr.shape[-1] / min(width, tile_size)
+    rows = _tile_starts(height, tile_size, tile_overlap, _scale_denominator(scale_height))
+    cols = _tile_starts(width, tile_size, tile_overlap, _scale_denominator(scale_width))
+    # floored like the output of a fractional-scale model run on the whole image
+    img_sr = tile_sr.new_zeros(tile_sr.shape[:2] + (int(height * scale_height), int(width * scale_width)))
+    weights = tile_sr.new_zeros(img_sr.shape[-2:])
+    overlap_height, overlap_width = round(tile_overlap * scale_height), round(tile_overlap * scale_width)
+    for i, top in enumerate(rows):
+        bottom = height if i == len(rows) - 1 else top + tile_size
+        for j, left in enumerate(cols):
+            right = width if j == len(cols) - 1 else left + tile_size
+            if i or j:
+                tile_sr = model(img_lr[..., top:bottom, left:right])
+            ramp = _blend_ramp(tile_sr.shape[-2], overlap_height, i == 0, i == len(rows) - 1)[:, None] * \
+                _blend_ramp(tile_sr.shape[-1], overlap_width, j == 0, j == len(cols) - 1)[None, :]
+            ramp = ramp.to(tile_sr.device)
+            rows_sr = slice(round(top * scale_height), round(top * scale_height) + tile_sr.shape[-2])
+            cols_sr = slice(round(left * scale_width), round(left * scale_width) + tile_sr.shape[-1])
+            img_sr[..., rows_sr, cols_sr] += tile_sr * ramp
+            weights[rows_sr, cols_sr] += ramp
+    return img_sr.div_(weights)
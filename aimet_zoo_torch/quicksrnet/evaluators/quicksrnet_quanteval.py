@@ -11,8 +11,10 @@
 ''' AIMET evaluation code for QuickSRNet '''
 
 import argparse
+import time
 from aimet_zoo_torch.quicksrnet import QuickSRNet
 from aimet_zoo_torch.quicksrnet.model.helpers import evaluate_average_psnr
+from aimet_zoo_torch.common.utils.sr_pair_cache import get_sr_pair_cache
 from aimet_zoo_torch.quicksrnet.dataloader.utils import load_dataset, pass_calibration_data
 from aimet_zoo_torch.quicksrnet.model.inference import run_model
 
@@ -25,8 +27,14 @@ def arguments():
     parser.add_argument('--model-config', help='model configuration to be tested', type=str)
     parser.add_argument('--default-output-bw', help='Default output bitwidth for quantization.', type=int, default=8)
     parser.add_argument('--default-param-bw', help='Default parameter bitwidth for quantization.', type=int, default=8)
-    parser.add_argument('--batch-size',help='batch_size for loading data',type=int,default=16)
+    parser.add_argument('--batch-size', help='Run up to this many same-shape images together, 1 runs them one at a '
+                        'time', type=int, default=1)
+    parser.add_argument('--pad-multiple', help='Pad images to multiples of this size so that similar shapes are '
+                        'batched together', type=int, default=None)
     parser.add_argument('--use-cuda', help='Run evaluation on GPU', type=bool, default=True)
+    parser.add_argument('--tile-size', help='Super-resolve images in tiles of this side, bounding peak memory',
+                        type=int, default=None)
+    parser.add_argument('--tile-overlap', help='Low-res pixels shared by neighbouring tiles', type=int, default=16)
     args = parser.parse_args()
     return args
 
@@ -43,18 +51,24 @@ def main():
     model_int8.from_pretrained(quantized=True)
     sim_int8 = model_int8.get_quantsim(quantized=True)
 
+    start = time.perf_counter()
     IMAGES_LR, IMAGES_HR = load_dataset(args.dataset_path, model_fp32.scaling_factor)
+    warm = get_sr_pair_cache().stats['hits'] > 0
+    print(f'Prepared {len(IMAGES_LR)} LR/HR pairs in {time.perf_counter() - start:.2f}s '
+          f'({"warm" if warm else "cold"} pair cache)')
 
     sim_fp32.compute_encodings(forward_pass_callback=pass_calibration_data,
-                            forward_pass_callback_args=(IMAGES_LR, args.use_cuda))
+                            forward_pass_callback_args=(IMAGES_LR, args.use_cuda, args.batch_size))
     sim_int8.compute_encodings(forward_pass_callback=pass_calibration_data,
-                            forward_pass_callback_args=(IMAGES_LR, args.use_cuda))
+                            forward_pass_callback_args=(IMAGES_LR, args.use_cuda, args.batch_size))
 
     # Run model inference on test images and get super-resolved images
-    IMAGES_SR_original_fp32 = run_model(model_fp32, IMAGES_LR, args.use_cuda)
-    IMAGES_SR_original_int8 = run_model(sim_fp32.model, IMAGES_LR, args.use_cuda)
-    IMAGES_SR_optimized_fp32 = run_model(model_int8, IMAGES_LR, args.use_cuda)
-    IMAGES_SR_optimized_int8 = run_model(sim_int8.model, IMAGES_LR, args.use_cuda)
+    run_kwargs = {'tile_size': args.tile_size, 'tile_overlap': args.tile_overlap, 'batch_size': args.batch_size,
+                  'pad_multiple': args.pad_multiple}
+    IMAGES_SR_original_fp32 = run_model(model_fp32, IMAGES_LR, args.use_cuda, **run_kwargs)
+    IMAGES_SR_original_int8 = run_model(sim_fp32.model, IMAGES_LR, args.use_cuda, **run_kwargs)
+    IMAGES_SR_optimized_fp32 = run_model(model_int8, IMAGES_LR, args.use_cuda, **run_kwargs)
+    IMAGES_SR_optimized_int8 = run_model(sim_int8.model, IMAGES_LR, args.use_cuda, **run_kwargs)
 
     # Get the average PSNR for all test-images
     avg_psnr = evaluate_average_psnr(IMAGES_SR_original_fp32, IMAGES_HR)
@@ -8,6 +8,10 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 
+import os
+from aimet_zoo_torch.common.range_download import download_file
+from aimet_zoo_torch.common.archive_cache import extract_archive
+
 
 def get_tar_path(model_index, model_spec_index):
 
@@ -111,4 +115,26 @@ def get_tar_path(model_index, model_spec_index):
         else:
             tar_path += 'release_quicksrnet_large_4x.tar.gz'
 
-    return tar_path
\ No newline at end of file
+    return tar_path
+
+
+def download_and_extract(model_index, model_spec_index, checkpoint_dir):
+    """
+    Download the release tarball of a model and extract it into checkpoint_dir.
+    The tarball is kept next to the checkpoints and its extracted content is cached, so later runs only stat files.
+
+    :param model_index:
+        Index of the model family, as used by get_tar_path
+    :param model_spec_index:
+        Index of the model variant, as used by get_tar_path
+    :param checkpoint_dir:
+        Directory to store the tarball and extract the checkpoints into
+    :return:
+        Relative paths of the extracted files
+    """
+    tar_url = get_tar_path(model_index, model_spec_index)
+    tar_path = os.path.join(checkpoint_dir, tar_url.split('/')[-1])
+    if not os.path.exists(tar_path):
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        download_file(tar_url, tar_path)
+    return extract_archive(tar_path, checkpoint_dir)
@@ -18,8 +18,16 @@ It was released under an MIT license here:
 import torch
 import torch.nn as nn
 
+import time
+from functools import lru_cache
+
 import numpy as np
 from math import ceil, floor
+from scipy import sparse
+
+
+# Number of (in_length, out_length, scale, kernel, kernel_width) contributions kept by cached_contributions
+CONTRIBUTION_CACHE_SIZE = 128
 
 
 def deriveSizeFromScale(img_shape, scale):
@@ -77,6 +85,27 @@ def contributions(in_length, out_length, scale, kernel, k_width):
     return weights, indices
 
 
+@lru_cache(maxsize=CONTRIBUTION_CACHE_SIZE)
+def cached_contributions(in_length, out_length, scale, kernel, k_width):
+    """
+    contributions() and their sparse matrix, memoized on the arguments. SR test sets resize many images sharing a
+    height or width by the same scale, so the kernel weights and indices of an axis are computed once. The kernel
+    antialiases whenever scale < 1, so scale also selects antialiasing. The arrays are shared and read-only.
+    """
+    weights, indices = contributions(in_length, out_length, scale, kernel, k_width)
+    weights.setflags(write=False)
+    indices.setflags(write=False)
+    return weights, indices, contribution_matrix(weights, indices, in_length)
+
+
+def contribution_cache_stats():
+    """Hits, misses, number of entries and hit rate of the contributions cache"""
+    info = cached_contributions.cache_info()
+    lookups = info.hits + info.misses
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.}
+
+
 def imresizemex(inimg, weights, indices, dim):
     in_shape = inimg.shape
     w_shape = weights.shape
@@ -119,15 +148,56 @@ def imresizevec(inimg, weights, indices, dim):
         return outimg
 
 
-def resizeAlongDim(A, dim, weights, indices, mode="vec"):
+def contribution_matrix(weights, indices, in_length):
+    """
+    Sparse (out_length, in_length) matrix of the contributions of every input pixel to every output pixel. Border
+    pixels mirrored into the kernel support appear several times in a row and are summed.
+    """
+    weights = weights.reshape(weights.shape[0], -1)
+    indices = indices.reshape(indices.shape[0], -1)
+    rows = np.repeat(np.arange(weights.shape[0]), weights.shape[1])
+    return sparse.csr_matrix((weights.ravel(), (rows, indices.ravel())), shape=(weights.shape[0], in_length))
+
+
+def _apply_along_dim(inimg, matmul, out_length, dim):
+    """Applies matmul, a product with an (out_length, in_length) matrix, along dim of an H x W x C image"""
+    img = np.moveaxis(inimg.astype(np.float64, copy=False), dim, 0)
+    outimg = matmul(img.reshape(img.shape[0], -1)).reshape((out_length,) + img.shape[1:])
+    outimg = np.moveaxis(outimg, 0, dim)
+    if inimg.dtype == np.uint8:
+        outimg = np.clip(outimg, 0, 255)
+        return np.around(outimg).astype(np.uint8)
+    else:
+        return outimg
+
+
+def imresizesparse(inimg, matrix, dim):
+    return _apply_along_dim(inimg, matrix.dot, matrix.shape[0], dim)
+
+
+def imresizetorch(inimg, matrix, dim):
+    coo = matrix.tocoo()
+    matrix = torch.sparse_coo_tensor(torch.from_numpy(np.vstack((coo.row, coo.col)).astype(np.int64)),
+                                     torch.from_numpy(coo.data), coo.shape)
+    return _apply_along_dim(inimg, lambda img: torch.sparse.mm(matrix, torch.from_numpy(img)).numpy(),
+                            coo.shape[0], dim)
+
+
+def resizeAlongDim(A, dim, weights, indices, mode="vec", matrix=None):
+    if mode in ("torch", "sparse") and matrix is None:
+        matrix = contribution_matrix(weights, indices, A.shape[dim])
     if mode == "org":
         out = imresizemex(A, weights, indices, dim)
-    else:
+    elif mode == "vec":
         out = imresizevec(A, weights, indices, dim)
+    elif mode == "torch":
+        out = imresizetorch(A, matrix, dim)
+    else:
+        out = imresizesparse(A, matrix, dim)
     return out
 
 
-def imresize(I, scalar_scale=None, method='bicubic', output_shape=None, mode="vec"):
+def imresize(I, scalar_scale=None, method='bicubic', output_shape=None, mode="vec", use_cache=True):
     if method == 'bicubic':
         kernel = cubic
     elif method == 'bilinear':
@@ -151,10 +221,16 @@ def imresize(I, scalar_scale=None, method='bicubic', output_shape=None, mode="ve
     order = np.argsort(scale_np)
     weights = []
     indices = []
+    matrices = []
     for k in range(2):
-        w, ind = contributions(I.shape[k], output_size[k], scale[k], kernel, kernel_width)
+        if use_cache:
+            w, ind, matrix = cached_contributions(I.shape[k], output_size[k], scale[k], kernel, kernel_width)
+        else:
+            w, ind = contributions(I.shape[k], output_size[k], scale[k], kernel, kernel_width)
+            matrix = None
         weights.append(w)
         indices.append(ind)
+        matrices.append(matrix)
     B = np.copy(I)
     flag2D = False
     if B.ndim == 2:
@@ -162,7 +238,7 @@ def imresize(I, scalar_scale=None, method='bicubic', output_shape=None, mode="ve
         flag2D = True
     for k in range(2):
         dim = order[k]
-        B = resizeAlongDim(B, dim, weights[dim], indices[dim], mode)
+        B = resizeAlongDim(B, dim, weights[dim], indices[dim], mode, matrices[dim])
     if flag2D:
         B = np.squeeze(B, axis=2)
     return B
@@ -172,3 +248,54 @@ def convertDouble2Byte(I):
     B = np.clip(I, 0.0, 1.0)
     B = 255 * B
     return np.around(B).astype(np.uint8)
+
+
+def compare_modes(image_sizes=((256, 256), (512, 512), (1024, 1024)), scalar_scale=0.25,
+                  modes=("vec", "sparse", "torch"), repeats=3):
+    """
+    Times the resize modes on random float64 RGB images of each size, against the first mode
+    :param image_sizes: (height, width) of the images to resize
+    :param scalar_scale: resize factor
+    :param modes: modes to compare, the first one is the reference
+    :param repeats: timed runs per mode, the fastest is kept
+    :return: per image size and mode, seconds per image, speedup and max abs difference from the reference
+    """
+    rng = np.random.default_rng(0)
+    results = {}
+    for size in image_sizes:
+        img = rng.uniform(0, 255, size=tuple(size) + (3,))
+        outputs = {}
+        seconds = {}
+        for mode in modes:
+            seconds[mode] = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                outputs[mode] = imresize(img, scalar_scale, mode=mode)
+                seconds[mode] = min(seconds[mode], time.perf_counter() - start)
+        reference = modes[0]
+        results[tuple(size)] = {mode: {"seconds": seconds[mode],
+                                       "speedup": seconds[reference] / seconds[mode],
+                                       "max_abs_diff": float(np.max(np.abs(outputs[mode] - outputs[reference])))}
+                                for mode in modes}
+    return results
+
+
+def benchmark_contribution_cache(images, scalar_scale=0.25, mode="vec"):
+    """
+    Resizes every image of a dataset with and without the contributions cache, starting from an empty cache
+    :param images: H x W (x C) images, e.g. the high-res images of an SR test set
+    :param scalar_scale: resize factor
+    :param mode: resize mode
+    :return: seconds of both passes, speedup and the cache stats after the cached pass
+    """
+    start = time.perf_counter()
+    for img in images:
+        imresize(img, scalar_scale, mode=mode, use_cache=False)
+    uncached = time.perf_counter() - start
+    cached_contributions.cache_clear()
+    start = time.perf_counter()
+    for img in images:
+        imresize(img, scalar_scale, mode=mode)
+    cached = time.perf_counter() - start
+    return {"uncached_seconds": uncached, "cached_seconds": cached, "speedup": uncached / cached,
+            "cache": contribution_cache_stats()}
@@ -8,12 +8,15 @@
 #  @@-COPYRIGHT-END-@@
 # =============================================================================
 
+import time
+
 import torch
 import torch.nn as nn
 from aimet_torch.quantsim import QuantizationSimModel
 from aimet_torch.qc_quantize_op import QuantScheme
 from .models import *
-from aimet_zoo_torch.quicksrnet.dataloader.utils import pass_calibration_data
+from .helpers import evaluate_average_psnr, evaluate_psnr
+from aimet_zoo_torch.quicksrnet.dataloader.utils import pass_calibration_data, run_batched, run_tiled
 import aimet_torch.quantsim as quantsim
 import aimet_torch.onnx_utils as aimet_onnx_utils
 aimet_onnx_utils.map_torch_types_to_onnx.update(
@@ -22,6 +25,7 @@ aimet_onnx_utils.map_torch_types_to_onnx.update(
 from aimet_torch.model_preparer import prepare_model
 from aimet_torch.onnx_utils import OnnxExportApiArgs
 from aimet_torch.qc_quantize_op import QuantScheme
+from aimet_zoo_torch.common.utils.lazy_loading import peak_rss_mb
 
 
 def load_model(model_checkpoint, model_name, model_args, use_quant_sim_model=False, 
@@ -95,7 +99,7 @@ def load_model(model_checkpoint, model_name, model_args, use_quant_sim_model=Fal
     return model
 
 
-def run_model(model, inputs_lr, use_cuda):
+def run_model(model, inputs_lr, use_cuda, tile_size=None, tile_overlap=16, batch_size=1, pad_multiple=None):
     """
     Run inference on the model with the set of given input test-images.
     
@@ -105,6 +109,14 @@ def run_model(model, inputs_lr, use_cuda):
         The set of pre-processed input images to test
     :param use_cuda:
         Use CUDA or CPU
+    :param tile_size:
+        If set, super-resolve each image in tiles of this side (see run_tiled) instead of at once
+    :param tile_overlap:
+        Low-res pixels shared by neighbouring tiles
+    :param batch_size:
+        Run images of the same (padded) shape in batches of up to this size, see shape_buckets. Ignored when tiling
+    :param pad_multiple:
+        If set, pad the images to multiples of this size so that similar shapes share a batch
     :return:
         The super-resolved images obtained from the model for the given test-images
     """
@@ -116,13 +128,93 @@ def run_model(model, inputs_lr, use_cuda):
     model.eval()
     images_sr = []
 
+    if batch_size > 1 and not tile_size:
+        with torch.no_grad():
+            images_sr = [sr_img.detach().cpu() for sr_img in
+                         run_batched(model, inputs_lr, device, batch_size, pad_multiple)]
+        print('')
+        return images_sr
+
     # Inference
     for count, img_lr in enumerate(inputs_lr):
         with torch.no_grad():
             img_lr = img_lr.unsqueeze(0).to(device)
-            sr_img = model(img_lr)
+            if tile_size:
+                sr_img = run_tiled(model, img_lr, tile_size, tile_overlap)
+            else:
+                sr_img = model(img_lr)
         sr_img = sr_img.squeeze(0).detach().cpu()
         images_sr.append(sr_img)
     print('')
 
-    return images_sr
\ No newline at end of file
+    return images_sr
+
+
+def compare_tiled_inference(model, inputs_lr, images_hr, use_cuda, tile_size=128, tile_overlap=16):
+    """
+    Run tiled and whole-image inference on the test-images and compare their throughput, peak memory and PSNR.
+    Peak RSS is the high-water mark of the process, so the tiled run goes first and is not charged for the
+    whole-image activations.
+
+    :param model:
+        The model instance to infer from
+    :param inputs_lr:
+        The set of pre-processed input images to test
+    :param images_hr:
+        The original high-res images
+    :param use_cuda:
+        Use CUDA or CPU
+    :param tile_size:
+        Side of the low-res tiles
+    :param tile_overlap:
+        Low-res pixels shared by neighbouring tiles
+    :return:
+        Images per second, peak RSS in MB and average PSNR of both modes, and the lowest PSNR of a tiled image
+        against its whole-image counterpart
+    """
+    results = {}
+    images_sr = {}
+    for name, size in (('tiled', tile_size), ('whole', None)):
+        start = time.perf_counter()
+        images_sr[name] = run_model(model, inputs_lr, use_cuda, tile_size=size, tile_overlap=tile_overlap)
+        seconds = time.perf_counter() - start
+        results[name] = {'images_per_second': len(inputs_lr) / seconds, 'peak_rss_mb': peak_rss_mb(),
+                         'psnr': evaluate_average_psnr(images_sr[name], images_hr)}
+        print(f'{name.capitalize()} inference | {results[name]["images_per_second"]:.2f} images/s | '
+              f'peak RSS {results[name]["peak_rss_mb"]:.0f} MB | Avg. PSNR: {results[name]["psnr"]:.3f}')
+    results['parity_psnr'] = min(evaluate_psnr(tiled, whole)
+                                 for tiled, whole in zip(images_sr['tiled'], images_sr['whole']))
+    print(f'Tiled vs whole-image | Min. PSNR: {results["parity_psnr"]:.2f}')
+    return results
+
+
+def compare_batched_inference(model, inputs_lr, use_cuda, batch_size=16, pad_multiple=None):
+    """
+    Run inference image by image and in shape-bucketed batches, and compare their throughput and outputs.
+
+    :param model:
+        The model instance to infer from
+    :param inputs_lr:
+        The set of pre-processed input images to test
+    :param use_cuda:
+        Use CUDA or CPU
+    :param batch_size:
+        Maximum number of images per batch
+    :param pad_multiple:
+        Padding granularity of the buckets, see shape_buckets
+    :return:
+        Images per second at batch 1 and bucketed, the speedup and the largest absolute difference of the outputs
+    """
+    images_sr = {}
+    results = {}
+    for name, size in (('batch_1', 1), ('bucketed', batch_size)):
+        start = time.perf_counter()
+        images_sr[name] = run_model(model, inputs_lr, use_cuda, batch_size=size, pad_multiple=pad_multiple)
+        results[name] = len(inputs_lr) / (time.perf_counter() - start)
+    results['speedup'] = results['bucketed'] / results['batch_1']
+    results['max_abs_diff'] = max((single - batched).abs().max().item()
+                                  for single, batched in zip(images_sr['batch_1'], images_sr['bucketed']))
+    print(f'Batch 1: {results["batch_1"]:.2f} images/s | Bucketed batch {batch_size}: '
+          f'{results["bucketed"]:.2f} images/s ({results["speedup"]:.2f}x) | Max. abs. diff: '
+          f'{results["max_abs_diff"]:.2e}')
+    return results
@@ -13,6 +13,7 @@ import json
 import os
 from aimet_torch.quantsim import QuantizationSimModel, load_encodings_to_sim
 from aimet_zoo_torch.common.downloader import Downloader
+from aimet_zoo_torch.common.utils.lazy_loading import load_state_dict_lazy
 from aimet_zoo_torch.quicksrnet.model.models import QuickSRNetBase
 
 
@@ -42,6 +43,7 @@ class QuickSRNet(QuickSRNetBase, Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.input_shape = tuple(x if x is not None else 1 for x in self.cfg['input_shape'])
@@ -55,18 +57,12 @@ class QuickSRNet(QuickSRNetBase, Downloader):
         """load pretrained weights"""
         if not self.cfg:
             raise NotImplementedError('There are no pretrained weights available for the model_config passed')
-        self._download_pre_opt_weights()
-        self._download_post_opt_weights()
-        self._download_aimet_config()
-        self._download_aimet_encodings()
-        self._download_adaround_encodings()
+        self._download_artifacts()
         if quantized:
-            state_dict = torch.load(self.path_post_opt_weights)['state_dict']
-            self.load_state_dict(state_dict)
+            load_state_dict_lazy(self, self.path_post_opt_weights, key='state_dict')
             self.cuda()
         else:
-            state_dict = torch.load(self.path_pre_opt_weights)['state_dict']
-            self.load_state_dict(state_dict)
+            load_state_dict_lazy(self, self.path_pre_opt_weights, key='state_dict')
             self.cuda()
         self.eval()
 
@@ -74,10 +70,6 @@ class QuickSRNet(QuickSRNetBase, Downloader):
         """get quantsim object with pre-loaded encodings"""
         if not self.cfg:
             raise NotImplementedError('There is no Quantization Simulation available for the model_config passed')
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
         device = torch.device('cuda')
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
@@ -86,12 +78,19 @@ class QuickSRNet(QuickSRNetBase, Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self, **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-            print('load_encodings_to_sim finished!')
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-            print('set_and_freeze_param_encodings finished!')
-        sim.model.eval()
-        return sim
\ No newline at end of file
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self, **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+                print('load_encodings_to_sim finished!')
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+                print('set_and_freeze_param_encodings finished!')
+            sim.model.eval()
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
\ No newline at end of file
@@ -14,8 +14,8 @@
 import os
 import sys
 import argparse
-import urllib.request
-import tarfile
+from aimet_zoo_torch.common.range_download import download_file
+from aimet_zoo_torch.common.archive_cache import extract_archive
 import yaml
 import copy
 
@@ -41,22 +41,24 @@ def download_weights(args):
     # Download original model
     FILE_NAME = args.model_orig_path + "/darknet21"
     ORIGINAL_MODEL_URL = "https://github.qualcomm.com/qualcomm-ai/aimet-model-zoo/releases/download/torch_rangenet_plus_w8a8/rangeNet_plus_FP32.tar.gz"
+    # keep the archive next to the model so warm runs skip the download and reuse the extracted copy
+    TAR_NAME = args.model_orig_path + "/darknet21.tar.gz"
     if not os.path.exists(FILE_NAME):
-        urllib.request.urlretrieve(ORIGINAL_MODEL_URL, "darknet21.tar.gz")
-        file = tarfile.open("darknet21.tar.gz")
-        file.extractall(args.model_orig_path)
-        os.remove("darknet21.tar.gz")
+        if not os.path.exists(TAR_NAME):
+            os.makedirs(args.model_orig_path, exist_ok=True)
+            download_file(ORIGINAL_MODEL_URL, TAR_NAME)
+        extract_archive(TAR_NAME, args.model_orig_path)
 
     # Download optimized weights
     FILE_NAME = args.model_optim_path + "/rangeNet_plus_w8a8_checkpoint.pth"
     OPTIMIZED_CHECKPOINT_URL = "https://github.qualcomm.com/qualcomm-ai/aimet-model-zoo/releases/download/torch_rangenet_plus_w8a8/rangeNet_plus_w8a8_checkpoint.pth"
     if not os.path.exists(FILE_NAME):
-        urllib.request.urlretrieve(OPTIMIZED_CHECKPOINT_URL, FILE_NAME)
+        download_file(OPTIMIZED_CHECKPOINT_URL, FILE_NAME)
 
     # Download config file
     QUANTSIM_CONFIG_URL = "https://raw.githubusercontent.com/quic/aimet/release-aimet-1.23/TrainingExtensions/common/src/python/aimet_common/quantsim_config/default_config_per_channel.json"
     if not os.path.exists("./default_config_per_channel.json"):
-        urllib.request.urlretrieve(QUANTSIM_CONFIG_URL, "default_config_per_channel.json")
+        download_file(QUANTSIM_CONFIG_URL, "default_config_per_channel.json")
 
 # Set seed for reproducibility
 def seed(seed_number):
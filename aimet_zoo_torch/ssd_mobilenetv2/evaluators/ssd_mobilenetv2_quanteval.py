@@ -52,6 +52,7 @@ from aimet_zoo_torch.ssd_mobilenetv2.model.vision.utils import box_utils, measur
 
 # AIMET model zoo imports
 from aimet_zoo_torch.common.utils.utils import get_device
+from aimet_zoo_torch.common.fan_out_eval import FanOutEvaluator
 from aimet_zoo_torch.ssd_mobilenetv2 import SSDMobileNetV2, create_mobilenetv2_ssd_lite_predictor
 
 def download_labels():
@@ -203,57 +204,68 @@ def compute_average_precision_per_class(num_true_cases, gt_boxes, difficult_case
 		return measurements.compute_average_precision(precision, recall)
 
 
-def evaluate_predictor(predictor):
+def predict_step(predictor, sample, results):
 	'''
-	:param predictor:
-	:return: Average precision per classes for the given predictor
+	Runs predictor on one (index, image) sample and appends its detections to results
 	'''
-
-	results = []
-	for i in tqdm(range(len(dataset))):
-		image = dataset.get_image(i)
-		boxes, labels, probs = predictor.predict(image)
-		indexes = torch.ones(labels.size(0), 1, dtype=torch.float32) * i
-		results.append(torch.cat([
-			indexes.reshape(-1, 1),
-			labels.reshape(-1, 1).float(),
-			probs.reshape(-1, 1),
-			boxes + 1.0  # matlab's indexes start from 1
-		], dim=1))
-	results = torch.cat(results)
-	for class_index, class_name in enumerate(class_names):
-		if class_index == 0:
-			continue  # ignore background
-		prediction_path = eval_path / f"det_test_{class_name}.txt"
-		with open(prediction_path, "w") as f:
-			sub = results[results[:, 1] == class_index, :]
-			for i in range(sub.size(0)):
-				tmp = sub[i, 2:].cpu()
-				prob_box = tmp.numpy()
-				image_id = dataset.ids[int(sub[i, 0])]
-				print(
-					image_id + " " + " ".join([str(v) for v in prob_box]),
-					file=f
-				)
-	aps = []
-	print("\n\nAverage Precision Per Class:")
-	for class_index, class_name in enumerate(class_names):
-		if class_index == 0:
-			continue
-		prediction_path = eval_path / f"det_test_{class_name}.txt"
-		ap = compute_average_precision_per_class(
-			true_case_stat[class_index],
-			all_gb_boxes[class_index],
-			all_difficult_cases[class_index],
-			prediction_path,
-			config.iou_threshold,
-			config.use_2007_metric
-		)
-		aps.append(ap)
-		print(f"{class_name}: {ap}")
-
-	print(f"\nAverage Precision Across All Classes:{sum(aps)/len(aps)}")
-	return aps
+	i, image = sample
+	boxes, labels, probs = predictor.predict(image)
+	indexes = torch.ones(labels.size(0), 1, dtype=torch.float32) * i
+	results.append(torch.cat([
+		indexes.reshape(-1, 1),
+		labels.reshape(-1, 1).float(),
+		probs.reshape(-1, 1),
+		boxes + 1.0  # matlab's indexes start from 1
+	], dim=1))
+
+
+def evaluate_predictors(predictors):
+	'''
+	:param predictors: predictors keyed by name, all run on a single pass over the dataset
+	:return: Average precision per classes for every predictor, keyed by name
+	'''
+	samples = ((i, dataset.get_image(i)) for i in range(len(dataset)))
+	evaluator = FanOutEvaluator(samples, batch_len=lambda sample: 1, total=len(dataset))
+	all_results = evaluator.evaluate(predictors, predict_step, list)
+	all_aps = {}
+	for name, results in all_results.items():
+		results = torch.cat(results)
+		predictions_path = eval_path / name
+		predictions_path.mkdir(exist_ok=True)
+		for class_index, class_name in enumerate(class_names):
+			if class_index == 0:
+				continue  # ignore background
+			prediction_path = predictions_path / f"det_test_{class_name}.txt"
+			with open(prediction_path, "w") as f:
+				sub = results[results[:, 1] == class_index, :]
+				for i in range(sub.size(0)):
+					tmp = sub[i, 2:].cpu()
+					prob_box = tmp.numpy()
+					image_id = dataset.ids[int(sub[i, 0])]
+					print(
+						image_id + " " + " ".join([str(v) for v in prob_box]),
+						file=f
+					)
+		aps = []
+		print(f"\n\nAverage Precision Per Class ({name}):")
+		for class_index, class_name in enumerate(class_names):
+			if class_index == 0:
+				continue
+			prediction_path = predictions_path / f"det_test_{class_name}.txt"
+			ap = compute_average_precision_per_class(
+				true_case_stat[class_index],
+				all_gb_boxes[class_index],
+				all_difficult_cases[class_index],
+				prediction_path,
+				config.iou_threshold,
+				config.use_2007_metric
+			)
+			aps.append(ap)
+			print(f"{class_name}: {ap}")
+
+		print(f"\nAverage Precision Across All Classes:{sum(aps)/len(aps)}")
+		all_aps[name] = aps
+	return all_aps
 
 
 class ModelConfig():
@@ -300,25 +312,16 @@ if __name__ == '__main__':
 	predictor_sim_int8 = create_mobilenetv2_ssd_lite_predictor(sim_int8.model, nms_method=config.nms_method, device=device)
 	sim_int8.compute_encodings(eval_func_int8, (predictor_sim_int8, 2000, device))
 
-	# Original FP32 model on FP32 device
-	print('Computing Original Model on FP32 device')
-	aps = evaluate_predictor(predictor_orig_fp32)
-	mAP_fp32model_fp32env = sum(aps)/len(aps)
-
-	# Original FP32 model on INT8 device
-	print('Computing Original Model on INT8 device')
-	aps = evaluate_predictor(predictor_sim_fp32)
-	mAP_fp32model_int8env = sum(aps)/len(aps)
-
-	# Quantized INT8 model on FP32 device
-	print('Computing Optimized Model on FP32 device')
-	aps = evaluate_predictor(predictor_orig_int8)
-	mAP_int8model_fp32env = sum(aps)/len(aps)
-
-	# Quantized INT8 model on INT8 device
-	print('Computing Optimized Model on INT8 device')
-	aps = evaluate_predictor(predictor_sim_int8)
-	mAP_int8model_int8env = sum(aps)/len(aps)
+	# all four predictors are evaluated on a single pass over the dataset
+	print('Computing Original and Optimized Models on FP32 and INT8 devices')
+	all_aps = evaluate_predictors({'orig_fp32': predictor_orig_fp32,
+								   'orig_int8': predictor_sim_fp32,
+								   'optim_fp32': predictor_orig_int8,
+								   'optim_int8': predictor_sim_int8})
+	mAP_fp32model_fp32env = sum(all_aps['orig_fp32'])/len(all_aps['orig_fp32'])
+	mAP_fp32model_int8env = sum(all_aps['orig_int8'])/len(all_aps['orig_int8'])
+	mAP_int8model_fp32env = sum(all_aps['optim_fp32'])/len(all_aps['optim_fp32'])
+	mAP_int8model_int8env = sum(all_aps['optim_int8'])/len(all_aps['optim_int8'])
 
 	print('\n\n')
 	print('## Evaluation Summary ##')
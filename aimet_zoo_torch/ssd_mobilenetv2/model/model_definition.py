@@ -14,6 +14,7 @@ import torch
 import json
 import os
 from aimet_zoo_torch.common.downloader import Downloader
+from aimet_zoo_torch.common.utils.lazy_loading import load_state_dict_lazy, load_or_build_model
 from aimet_torch.quantsim import QuantizationSimModel, load_encodings_to_sim
 from aimet_torch.cross_layer_equalization import equalize_model
 from aimet_zoo_torch.ssd_mobilenetv2.model.vision.ssd.mobilenet_v2_ssd_lite import create_mobilenetv2_ssd_lite, create_mobilenetv2_ssd_lite_predictor
@@ -36,6 +37,7 @@ class SSDMobileNetV2(Downloader):
                                 url_adaround_encodings = self.cfg['artifacts']['url_adaround_encodings'],
                                 url_aimet_encodings = self.cfg['artifacts']['url_aimet_encodings'],
                                 url_aimet_config = self.cfg['artifacts']['url_aimet_config'],
+                                sha256_checksums = self.cfg['artifacts'].get('sha256_checksums'),
                                 model_dir = parent_dir,
                                 model_config = model_config)
             self.input_shape = tuple(x if x is not None else 1 for x in self.cfg['input_shape'])
@@ -44,31 +46,29 @@ class SSDMobileNetV2(Downloader):
             self.model = create_mobilenetv2_ssd_lite(num_classes, width_mult = width_mult, is_test = is_test)
         self.model.eval()      
     
+    def _build_equalized_model(self):
+        """applies cross-layer equalization to the model and loads the optimized weights into it"""
+        equalize_model(self.model, self.input_shape)
+        load_state_dict_lazy(self.model, self.path_post_opt_weights)
+        return self.model
+
     def from_pretrained(self, quantized=False):
         """load pretrained weights"""
         if not self.cfg:
             raise NotImplementedError('There are no pretrained weights available for the model_config passed')
-        self._download_pre_opt_weights()
-        self._download_post_opt_weights()
-        self._download_aimet_config()
-        self._download_aimet_encodings()
-        self._download_adaround_encodings()
+        self._download_artifacts()
         if quantized:
-            equalize_model(self.model, self.input_shape)
-            state_dict = torch.load(self.path_post_opt_weights)
+            # the equalized model is persisted next to the weights, so CLE only runs once per checkpoint
+            self.model = load_or_build_model(self.path_post_opt_weights, self.path_post_opt_weights + '.cle',
+                                             self._build_equalized_model)
         else:
-            state_dict = torch.load(self.path_pre_opt_weights)
-        self.model.load_state_dict(state_dict)
+            load_state_dict_lazy(self.model, self.path_pre_opt_weights)
         self.model.eval()
 
     def get_quantsim(self, quantized=False):
         """get quantsim object with pre-loaded encodings"""
         if not self.cfg:
             raise NotImplementedError('There is no Quantization Simulation available for the model_config passed')
-        if quantized:
-            self.from_pretrained(quantized=True)
-        else:
-            self.from_pretrained(quantized=False)
         device = torch.device('cuda')
         dummy_input = torch.rand(self.input_shape, device = device)
         kwargs = {
@@ -77,14 +77,21 @@ class SSDMobileNetV2(Downloader):
             'default_output_bw': self.cfg['optimization_config']['quantization_configuration']['output_bw'],
             'config_file': self.path_aimet_config,
             'dummy_input': dummy_input}
-        sim = QuantizationSimModel(self.model, **kwargs)
-        if self.path_aimet_encodings and quantized:
-            load_encodings_to_sim(sim, self.path_aimet_encodings)
-            print('load_encodings_to_sim finished!')
-        if self.path_adaround_encodings and quantized:
-            sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
-            print('set_and_freeze_param_encodings finished!')
-        return sim
+
+        def build_sim():
+            if quantized:
+                self.from_pretrained(quantized=True)
+            else:
+                self.from_pretrained(quantized=False)
+            sim = QuantizationSimModel(self.model, **kwargs)
+            if self.path_aimet_encodings and quantized:
+                load_encodings_to_sim(sim, self.path_aimet_encodings)
+                print('load_encodings_to_sim finished!')
+            if self.path_adaround_encodings and quantized:
+                sim.set_and_freeze_param_encodings(self.path_adaround_encodings)
+                print('set_and_freeze_param_encodings finished!')
+            return sim
+        return self._cached_quantsim(build_sim, quantized, kwargs)
 
     def __call__(self, x):
         """default behevior when a class instance is invoked"""
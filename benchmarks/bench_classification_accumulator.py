@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the on-device classification accumulator: seconds per batch update against the per-batch top-1 count the
+evaluators used before, builtin sum() over torch.eq followed by a copy to the host, and a check that both count
+the same top-1 hits
+"""
+import argparse
+
+import torch
+
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator, compare_with_builtin_sum
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the classification accumulator.')
+    parser.add_argument('--batch-sizes', help='batch sizes to time', type=int, nargs='+', default=[32, 64, 256])
+    parser.add_argument('--num-classes', help='number of classes of the logits', type=int, default=1000)
+    parser.add_argument('--repeats', help='timed updates per implementation', type=int, default=20)
+    parser.add_argument('--device', help='device of the logits, defaults to cuda when available', type=str,
+                        default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    device = torch.device(args.device or ('cuda' if torch.cuda.is_available() else 'cpu'))
+    torch.manual_seed(0)
+    print(f"{args.num_classes} classes on {device}, mean of {args.repeats} updates")
+    for batch_size in args.batch_sizes:
+        logits = torch.randn(batch_size, args.num_classes, device=device)
+        labels = torch.randint(args.num_classes, (batch_size,))
+        results = compare_with_builtin_sum(logits, labels, repeats=args.repeats)
+
+        accumulator = ClassificationAccumulator(topk=(1,))
+        accumulator.update(logits, labels)
+        old_count = int(sum(torch.eq(torch.argmax(logits, dim=1), labels.to(device))).cpu())
+        same = round(accumulator.compute()['top1'] * batch_size / 100) == old_count
+        print(f"batch {batch_size}: builtin sum {1e3 * results['builtin_sum']:.3f} ms, "
+              f"accumulator {1e3 * results['accumulator']:.3f} ms, "
+              f"speedup: {results['builtin_sum'] / results['accumulator']:.1f}x, same top-1 count: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the data-parallel CPU evaluation: scaling_benchmark times a sharded classification pass over synthetic
+images at 1/2/4/8 gloo ranks, and the all-reduced accuracies of every world size are compared with the single rank
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import torch
+import torchvision
+from torch.utils.data import DataLoader, Dataset
+
+from aimet_zoo_torch.common.distributed_eval import all_reduce_sum, is_main_process, scaling_benchmark, shard_loader
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
+
+
+class SyntheticImages(Dataset):
+    """Random images and labels generated from the index, so every rank sees the same sample at the same index"""
+
+    def __init__(self, num_samples: int, image_size: int, num_classes: int):
+        self.num_samples = num_samples
+        self.image_size = image_size
+        self.num_classes = num_classes
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, index: int):
+        generator = torch.Generator().manual_seed(index)
+        image = torch.rand(3, self.image_size, self.image_size, generator=generator)
+        return image, int(torch.randint(self.num_classes, (), generator=generator))
+
+
+def evaluate(num_samples, image_size, batch_size, num_classes, results_path):
+    """Evaluates a seeded resnet18 on this rank's shard, then writes the all-reduced accuracies from rank 0"""
+    torch.manual_seed(0)
+    model = torchvision.models.resnet18(num_classes=num_classes).eval()
+    data_loader = DataLoader(SyntheticImages(num_samples, image_size, num_classes), batch_size=batch_size)
+    accumulator = ClassificationAccumulator(topk=(1, 5))
+    with torch.no_grad():
+        for images, labels in shard_loader(data_loader):
+            accumulator.update(model(images), labels)
+    results = all_reduce_sum(accumulator).compute()
+    if is_main_process():
+        world_size = int(os.environ.get('WORLD_SIZE', '1'))
+        with open(f'{results_path}.{world_size}', 'w') as f_out:
+            json.dump(results, f_out)
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the data-parallel CPU evaluation.')
+    parser.add_argument('--ranks', help='world sizes to time', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--num-samples', help='number of synthetic images', type=int, default=256)
+    parser.add_argument('--image-size', help='side of the synthetic images', type=int, default=160)
+    parser.add_argument('--batch-size', help='batch size', type=int, default=16)
+    parser.add_argument('--num-classes', help='number of classes', type=int, default=100)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    with tempfile.TemporaryDirectory() as work_dir:
+        results_path = os.path.join(work_dir, 'results')
+        report = scaling_benchmark(evaluate, (args.num_samples, args.image_size, args.batch_size, args.num_classes,
+                                              results_path), ranks=tuple(args.ranks))
+        accuracies = {}
+        for world_size in args.ranks:
+            with open(f'{results_path}.{world_size}') as f_in:
+                accuracies[world_size] = json.load(f_in)
+
+    print(f"resnet18 on {args.num_samples} images of {args.image_size}x{args.image_size}, batch size "
+          f"{args.batch_size}, {os.cpu_count()} cores")
+    reference = accuracies[args.ranks[0]]
+    for world_size, entry in report.items():
+        same = all(accuracies[world_size][name] == reference[name] for name in ('top1', 'top5', 'samples'))
+        print(f"{world_size} ranks: {entry['seconds']:.2f}s, speedup {entry['speedup']:.2f}x, "
+              f"{accuracies[world_size]['samples']} samples, same accuracies as {args.ranks[0]} rank: {same}")
+
+
+if __name__ == '__main__':
+    main()
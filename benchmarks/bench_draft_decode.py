@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the reduced-resolution JPEG decode of the ImageNet loader: images per second of full and draft decoding
+through the validation transforms, the difference between the inputs both produce and the top-1 agreement of a
+classifier on them. Draft decoding only kicks in once a DCT scale keeps the shorter side at least image_size + 24,
+so the default JPEGs are camera-sized rather than ImageNet-sized
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torchvision
+from PIL import Image
+
+from aimet_zoo_torch.common.utils.image_net_data_loader import compare_draft_decode
+
+
+def write_images(images_dir, num_images, image_size, num_classes=10, seed=0):
+    """
+    Writes num_images JPEG images of image_size (height, width) to num_classes class folders. The images are
+    upscaled random thumbnails plus a little noise, smoother than plain noise and so closer to photos
+    """
+    rng = np.random.default_rng(seed)
+    height, width = image_size
+    for index in range(num_images):
+        class_dir = os.path.join(images_dir, f'class_{index % num_classes:02d}')
+        os.makedirs(class_dir, exist_ok=True)
+        thumbnail = Image.fromarray(rng.integers(0, 256, size=(height // 32, width // 32, 3), dtype=np.uint8))
+        pixels = np.asarray(thumbnail.resize((width, height), Image.BICUBIC), dtype=np.int16)
+        pixels = np.clip(pixels + rng.integers(-8, 9, size=pixels.shape), 0, 255).astype(np.uint8)
+        Image.fromarray(pixels).save(os.path.join(class_dir, f'{index:05d}.jpg'), quality=90)
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of draft against full JPEG decoding.')
+    parser.add_argument('--images-dir', help='JPEG folders or shards to use instead of synthetic images', default=None)
+    parser.add_argument('--num-images', help='number of synthetic JPEG images', type=int, default=100)
+    parser.add_argument('--image-size', help='size of the synthetic JPEG images, as HxW', type=str,
+                        default='768x1024')
+    parser.add_argument('--model', help='torchvision classifier of the parity check', type=str, default='resnet18')
+    parser.add_argument('--weights', help='state dict of the classifier, randomly initialized if not given',
+                        type=str, default=None)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    torch.manual_seed(0)
+    model = getattr(torchvision.models, args.model)()
+    if args.weights:
+        model.load_state_dict(torch.load(args.weights, map_location='cpu'))
+    model.eval()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        images_dir = args.images_dir
+        if images_dir is None:
+            images_dir = work_dir
+            write_images(images_dir, args.num_images, tuple(int(x) for x in args.image_size.split('x')))
+        results = compare_draft_decode(images_dir, num_samples=args.num_images, model=model)
+
+    source = images_dir if args.images_dir else f"{args.num_images} synthetic JPEGs of {args.image_size}"
+    print(f"{source}, {args.model} {'with ' + args.weights if args.weights else 'randomly initialized'}")
+    print(f"full decode: {results['full_images_per_second']:.1f} images/s, "
+          f"draft decode: {results['draft_images_per_second']:.1f} images/s, "
+          f"speedup: {results['draft_images_per_second'] / results['full_images_per_second']:.1f}x")
+    print(f"normalized input difference: mean {results['mean_abs_difference']:.4f}, "
+          f"max {results['max_abs_difference']:.4f}")
+    print(f"top-1 agreement: {100 * results['top1_agreement']:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
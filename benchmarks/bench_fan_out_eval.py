@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the fan-out evaluation: wall seconds and bytes read when N classifiers (standing in for the original and
+optimized, fp32 and int8 models of an evaluator) share one pass over an ImageFolder of JPEGs, against one pass per
+model as the evaluators used to do
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader
+from torchvision import datasets, transforms
+
+from aimet_zoo_torch.common.fan_out_eval import compare_with_sequential
+from aimet_zoo_torch.common.metrics import ClassificationAccumulator
+
+
+def write_images(images_dir, num_images, image_size, num_classes=10, seed=0):
+    """Writes num_images random JPEG images of image_size (height, width) to num_classes class folders"""
+    rng = np.random.default_rng(seed)
+    for index in range(num_images):
+        class_dir = os.path.join(images_dir, f'class_{index % num_classes:02d}')
+        os.makedirs(class_dir, exist_ok=True)
+        pixels = rng.integers(0, 256, size=tuple(image_size) + (3,), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(class_dir, f'{index:05d}.jpg'), quality=90)
+
+
+def make_model(num_classes=10):
+    """A small convolutional classifier, cheap next to decoding the image so the data loading cost shows"""
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, 16, 3, stride=4), torch.nn.ReLU(),
+        torch.nn.Conv2d(16, 32, 3, stride=4), torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(32, num_classes)).eval()
+
+
+def eval_step(model, batch, accumulator):
+    """adds the logits of a batch to accumulator"""
+    images, labels = batch
+    accumulator.update(model(images), labels)
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the fan-out evaluation against one pass per model.')
+    parser.add_argument('--num-images', help='number of random JPEG images', type=int, default=256)
+    parser.add_argument('--image-size', help='size of the JPEG images, as HxW', type=str, default='375x500')
+    parser.add_argument('--num-models', help='number of models evaluated', type=int, default=4)
+    parser.add_argument('--batch-size', help='batch size', type=int, default=32)
+    parser.add_argument('--num-workers', help='data loader workers', type=int, default=2)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    torch.manual_seed(0)
+    val_transforms = transforms.Compose([
+        transforms.Resize(256),
+        transforms.CenterCrop(224),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])])
+    models = {f'model_{index}': make_model() for index in range(args.num_models)}
+
+    with tempfile.TemporaryDirectory() as images_dir:
+        write_images(images_dir, args.num_images, tuple(int(x) for x in args.image_size.split('x')))
+        data_loader = DataLoader(datasets.ImageFolder(images_dir, val_transforms), batch_size=args.batch_size,
+                                 num_workers=args.num_workers)
+        results = compare_with_sequential(data_loader, models, eval_step, ClassificationAccumulator)
+
+    print(f"{args.num_models} models on {args.num_images} JPEGs of {args.image_size}, "
+          f"batch size {args.batch_size}, {args.num_workers} workers")
+    for flow in ('sequential', 'fan_out'):
+        bytes_read = results[flow]['bytes_read']
+        print(f"{flow}: {results[flow]['wall_seconds']:.2f}s, "
+              f"{'n/a' if bytes_read is None else f'{bytes_read / 2 ** 20:.1f} MB'} read")
+    print(f"speedup: {results['sequential']['wall_seconds'] / results['fan_out']['wall_seconds']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
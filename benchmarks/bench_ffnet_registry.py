@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the lazy FFNet model registry: time and peak RSS of looking up one constructor through the name-to-module
+index, against importing every variant module first as the package used to. Every run is a fresh process, so the
+module cache and the RSS high-water mark start from the same state
+"""
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def run_mode(args):
+    """Looks up args.model in this process and prints the seconds, RSS growth and variant modules imported as JSON"""
+    # pylint: disable=import-outside-toplevel
+    from aimet_zoo_torch.common.utils.lazy_loading import peak_rss_mb
+    from aimet_zoo_torch.ffnet.model import model_registry
+
+    package = model_registry.__package__
+    before = set(sys.modules)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if args.run == 'eager':
+        for module in model_registry._module_models:  # pylint: disable=protected-access
+            importlib.import_module(f'{package}.{module}')
+    model_registry.model_entrypoint(args.model)
+    seconds = time.perf_counter() - start
+    modules = sorted(name for name in set(sys.modules) - before if name.startswith(package + '.'))
+    print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak_rss_mb() - baseline, 'modules': modules}))
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the lazy FFNet model registry.')
+    parser.add_argument('--model', help='constructor to look up', type=str, default='segmentation_ffnet78S_dBBB_mobile')
+    parser.add_argument('--repeats', help='fresh processes per mode, the median is reported', type=int, default=5)
+    parser.add_argument('--run', help=argparse.SUPPRESS, choices=['lazy', 'eager'])
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    if args.run:
+        run_mode(args)
+        return
+
+    # the child inherits the warning filters, e.g. -W ignore
+    warn_options = [f'-W{option}' for option in sys.warnoptions]
+    results = {}
+    for _ in range(args.repeats):
+        for mode in ('eager', 'lazy'):
+            child = subprocess.run([sys.executable, *warn_options, __file__, '--run', mode, '--model', args.model],
+                                   check=True, stdout=subprocess.PIPE, text=True)
+            results.setdefault(mode, []).append(json.loads(child.stdout.strip().splitlines()[-1]))
+
+    seconds = {mode: statistics.median(run['seconds'] for run in runs) for mode, runs in results.items()}
+    print(f"Looking up {args.model}, median of {args.repeats} fresh processes, after importing the package")
+    for mode in ('eager', 'lazy'):
+        runs = results[mode]
+        print(f"{mode}: {1e3 * seconds[mode]:.1f} ms, "
+              f"peak RSS +{statistics.median(run['peak_rss_mb'] for run in runs):.1f} MB, "
+              f"{len(runs[0]['modules'])} modules imported")
+    print(f"speedup: {seconds['eager'] / seconds['lazy']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the imresize engines shared by QuickSRNet and SuperRes: speed of each mode against 'vec', how many
+uint8 LR pixels of the SR pair pipeline change when 'sparse' replaces 'vec', and the contribution-weight cache
+"""
+import argparse
+
+import numpy as np
+
+from aimet_zoo_torch.superres.evaluators.utils.imresize import imresize, compare_modes, benchmark_contribution_cache
+
+
+def uint8_parity(num_images, image_size, scaling_factor, seed=0):
+    """
+    Makes LR images the way create_hr_lr_uint8_pair does (float64 HR, imresize, clip and truncate to uint8) with
+    'vec' and 'sparse', and counts the LR pixels that differ
+    :param num_images: number of random HR images
+    :param image_size: (height, width) of the HR images
+    :param scaling_factor: SR scaling factor
+    :param seed: seed of the random images
+    :return: pixels compared, pixels differing and the largest difference
+    """
+    rng = np.random.default_rng(seed)
+    compared = differing = largest = 0
+    for _ in range(num_images):
+        hr_img = rng.integers(0, 256, size=tuple(image_size) + (3,)).astype(np.float64)
+        lr_imgs = [np.uint8(np.clip(imresize(hr_img, 1. / scaling_factor, mode=mode), 0., 255.))
+                   for mode in ('vec', 'sparse')]
+        diff = np.abs(lr_imgs[0].astype(np.int16) - lr_imgs[1].astype(np.int16))
+        compared += diff.size
+        differing += int(np.count_nonzero(diff))
+        largest = max(largest, int(diff.max()))
+    return {'pixels': compared, 'differing': differing, 'max_diff': largest}
+
+
+def contribution_cache(num_images, scalar_scale, seed=0):
+    """
+    Times a pass over a dataset of landscape and portrait images with and without the contribution cache, per mode,
+    and checks that the cached outputs are bit-identical
+    :param num_images: number of random images, half 320x480 and half 480x320
+    :param scalar_scale: resize factor
+    :param seed: seed of the random images
+    :return: per mode, the result of benchmark_contribution_cache plus whether the outputs are identical
+    """
+    rng = np.random.default_rng(seed)
+    images = [rng.uniform(0, 255, size=(320, 480, 3) if index % 2 else (480, 320, 3)) for index in range(num_images)]
+    results = {}
+    for mode in ('vec', 'sparse'):
+        results[mode] = benchmark_contribution_cache(images, scalar_scale, mode=mode)
+        results[mode]['identical'] = all(
+            np.array_equal(imresize(img, scalar_scale, mode=mode), imresize(img, scalar_scale, mode=mode, use_cache=False))
+            for img in images)
+    return results
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the imresize engines.')
+    parser.add_argument('--sizes', help='HR image sizes to time, as HxW', nargs='+', default=['256x256', '512x512'])
+    parser.add_argument('--scale', help='resize factor of the timing runs', type=float, default=0.25)
+    parser.add_argument('--repeats', help='timed runs per mode, the fastest is kept', type=int, default=3)
+    parser.add_argument('--parity-images', help='random HR images of the uint8 parity check', type=int, default=20)
+    parser.add_argument('--scaling-factor', help='SR scaling factor of the uint8 parity check', type=int, default=4)
+    parser.add_argument('--cache-images', help='random images of the contribution cache pass', type=int, default=100)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    sizes = [tuple(int(x) for x in size.split('x')) for size in args.sizes]
+    for size, modes in compare_modes(sizes, args.scale, repeats=args.repeats).items():
+        for mode, result in modes.items():
+            print(f"{size[0]}x{size[1]} {mode:>6}: {1e3 * result['seconds']:8.2f} ms  "
+                  f"speedup {result['speedup']:5.2f}x  max abs diff {result['max_abs_diff']:.2e}")
+    parity = uint8_parity(args.parity_images, (256, 256), args.scaling_factor)
+    print(f"uint8 LR pixels differing between vec and sparse: {parity['differing']} of {parity['pixels']} "
+          f"(max diff {parity['max_diff']})")
+    for mode, result in contribution_cache(args.cache_images, 0.5).items():
+        print(f"contribution cache, {mode:>6}: {result['uncached_seconds']:.2f}s uncached, "
+              f"{result['cached_seconds']:.2f}s cached, {result['speedup']:.2f}x, "
+              f"hit rate {result['cache']['hit_rate']:.0%}, bit-identical {result['identical']}")
+
+
+if __name__ == '__main__':
+    main()
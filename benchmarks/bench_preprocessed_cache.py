@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the memory-mapped cache of preprocessed eval images: the one-off cost of building it, then the images per
+second of a warm cached loader against decoding and transforming the JPEGs with PIL, and how far the cached
+batches are from the PIL ones (the cache stores the cropped images as uint8)
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader
+from torchvision import datasets, transforms
+
+from aimet_zoo_torch.common.utils.preprocessed_cache import IMAGENET_MEAN, IMAGENET_STD, PreprocessedCache, \
+    compare_with_pil
+
+
+def write_images(images_dir, num_images, image_size, num_classes=10, seed=0):
+    """Writes num_images random JPEG images of image_size (height, width) to num_classes class folders"""
+    rng = np.random.default_rng(seed)
+    for index in range(num_images):
+        class_dir = os.path.join(images_dir, f'class_{index % num_classes:02d}')
+        os.makedirs(class_dir, exist_ok=True)
+        pixels = rng.integers(0, 256, size=tuple(image_size) + (3,), dtype=np.uint8)
+        Image.fromarray(pixels).save(os.path.join(class_dir, f'{index:05d}.jpg'), quality=90)
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the preprocessed image cache against PIL decoding.')
+    parser.add_argument('--num-images', help='number of random JPEG images', type=int, default=512)
+    parser.add_argument('--image-size', help='size of the JPEG images, as HxW', type=str, default='375x500')
+    parser.add_argument('--batch-size', help='batch size', type=int, default=32)
+    parser.add_argument('--num-workers', help='data loader workers of the PIL loader and of the cache build',
+                        type=int, default=2)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    with tempfile.TemporaryDirectory() as work_dir:
+        images_dir = os.path.join(work_dir, 'images')
+        write_images(images_dir, args.num_images, tuple(int(x) for x in args.image_size.split('x')))
+        val_transforms = transforms.Compose([
+            transforms.Resize(256),
+            transforms.CenterCrop(224),
+            transforms.ToTensor(),
+            transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD)])
+        pil_loader = DataLoader(datasets.ImageFolder(images_dir, val_transforms), batch_size=args.batch_size,
+                                num_workers=args.num_workers)
+
+        cache = PreprocessedCache(os.path.join(work_dir, 'cache'))
+        start = time.perf_counter()
+        cache.loader(datasets.ImageFolder(images_dir), 256, 224, args.batch_size, num_workers=args.num_workers)
+        build_seconds = time.perf_counter() - start
+        cached_loader = cache.loader(datasets.ImageFolder(images_dir), 256, 224, args.batch_size)
+
+        throughput = compare_with_pil(pil_loader, cached_loader, num_batches=len(pil_loader))
+        max_diff = max(float((pil_images - cached_images).abs().max())
+                       for (pil_images, _), (cached_images, _) in zip(pil_loader, cached_loader))
+
+    print(f"{args.num_images} JPEGs of {args.image_size}, batch size {args.batch_size}, "
+          f"{args.num_workers} PIL workers")
+    print(f"cache build: {build_seconds:.2f}s")
+    print(f"PIL decoding: {throughput['pil']:.1f} images/s, cached: {throughput['cached']:.1f} images/s, "
+          f"speedup: {throughput['cached'] / throughput['pil']:.1f}x")
+    # one uint8 step of a normalized image is 1 / (255 * std)
+    print(f"largest difference to the PIL batches: {max_diff:.4f} "
+          f"({max_diff * 255 * min(IMAGENET_STD):.2f} uint8 steps)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the quantsim snapshot cache: seconds get_quantsim takes with an empty snapshot directory (cold, the sim is
+built and its encodings computed) against a second fresh process restoring the snapshot the first one saved (warm).
+The artifacts are downloaded once beforehand, so neither mode includes the transfer
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# model name: (module, class, default model config)
+MODELS = {
+    'mobilenetv2': ('aimet_zoo_torch.mobilenetv2', 'MobileNetV2', 'mobilenetv2_w8a8'),
+    'efficientnetlite0': ('aimet_zoo_torch.efficientnetlite0', 'EfficientNetLite0', 'efficientnetlite0_w8a8'),
+    'deeplabv3': ('aimet_zoo_torch.deeplabv3', 'DeepLabV3_Plus', 'dlv3_w8a8'),
+    'ffnet': ('aimet_zoo_torch.ffnet', 'FFNet', 'segmentation_ffnet40S_dBBB_mobile'),
+    'inverseform': ('aimet_zoo_torch.inverseform', 'HRNetInverseForm', 'hrnet_16_slim_if'),
+    'quicksrnet': ('aimet_zoo_torch.quicksrnet', 'QuickSRNet', 'quicksrnet_small_2x_w8a8'),
+    'ssd_mobilenetv2': ('aimet_zoo_torch.ssd_mobilenetv2', 'SSDMobileNetV2', 'ssd_mobilenetv2_w8a8'),
+}
+
+
+def run_mode(args):
+    """Builds or restores the quantized sim in this process and prints the seconds and snapshot cache stats as JSON"""
+    # pylint: disable=import-outside-toplevel
+    from aimet_zoo_torch.common.quantsim_cache import get_quantsim_cache
+
+    module, class_name, _ = MODELS[args.model]
+    model = getattr(importlib.import_module(module), class_name)(model_config=args.model_config)
+    start = time.perf_counter()
+    model.get_quantsim(quantized=True)
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, **get_quantsim_cache().stats}))
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of cold against warm get_quantsim.')
+    parser.add_argument('--model', help='model to prepare', choices=sorted(MODELS), default='mobilenetv2')
+    parser.add_argument('--model-config', help='model card, defaults to one of the model', type=str, default=None)
+    parser.add_argument('--repeats', help='cold/warm process pairs, the median is reported', type=int, default=3)
+    parser.add_argument('--cache-dir', help='cache directory, defaults to a temporary one', type=str, default=None)
+    parser.add_argument('--run', help=argparse.SUPPRESS, choices=['prime', 'cold', 'warm'])
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    args.model_config = args.model_config or MODELS[args.model][2]
+    if args.run:
+        run_mode(args)
+        return
+
+    cache_dir = args.cache_dir or tempfile.mkdtemp(prefix='bench_quantsim_cache_')
+    env = dict(os.environ, AIMET_ZOO_CACHE_DIR=cache_dir)
+    # the child inherits the warning filters, e.g. -W ignore
+    warn_options = [f'-W{option}' for option in sys.warnoptions]
+
+    def child(mode):
+        result = subprocess.run([sys.executable, *warn_options, __file__, '--run', mode,
+                                 '--model', args.model, '--model-config', args.model_config],
+                                check=True, stdout=subprocess.PIPE, text=True,
+                                env=dict(env, AIMET_ZOO_QUANTSIM_CACHE='0') if mode == 'prime' else env)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    try:
+        # fills the artifact cache without writing a snapshot
+        child('prime')
+        results = {}
+        for _ in range(args.repeats):
+            shutil.rmtree(os.path.join(cache_dir, 'quantsim'), ignore_errors=True)
+            for mode in ('cold', 'warm'):
+                results.setdefault(mode, []).append(child(mode))
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    assert all(run['hits'] == 1 for run in results['warm']), 'the warm runs did not restore the snapshot'
+    seconds = {mode: statistics.median(run['seconds'] for run in runs) for mode, runs in results.items()}
+    print(f"get_quantsim(quantized=True) of {args.model_config}, median of {args.repeats} fresh processes")
+    for mode in ('cold', 'warm'):
+        print(f"{mode}: {seconds[mode]:.2f} s")
+    print(f"speedup: {seconds['cold'] / seconds['warm']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
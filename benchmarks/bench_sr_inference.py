@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks of the SR inference modes:
+- tiled against whole-image inference: peak RSS, runtime and PSNR of the tiled output against the whole-image one.
+  Each mode runs in its own process, as the peak RSS of a process never goes down
+- shape-bucketed batches against one image at a time, on the SuperRes models: throughput and output difference
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import torch
+
+from aimet_zoo_torch.common.utils.lazy_loading import peak_rss_mb
+from aimet_zoo_torch.superres.evaluators.utils.helpers import MAX_BATCH_PIXELS, evaluate_psnr, run_batched, run_tiled
+from aimet_zoo_torch.superres.evaluators.utils.models import ABPNRelease, SESRRelease_M5, XLSRRelease
+
+# LR shapes of the batched benchmark at 2x, BSD100-like: most images share one of two orientations, a few are unique
+MIXED_LR_SHAPES = [(160, 240)] * 56 + [(240, 160)] * 24 + [(128, 128), (256, 256), (144, 176), (183, 250),
+                                                          (126, 172), (90, 125)]
+
+
+def conv_x4_model(channels=64, scale=4):
+    """4-layer conv network ending in a depth-to-space upscale, with seeded random weights"""
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, channels, 3, padding=1), torch.nn.ReLU(),
+        torch.nn.Conv2d(channels, channels, 3, padding=1), torch.nn.ReLU(),
+        torch.nn.Conv2d(channels, channels, 3, padding=1), torch.nn.ReLU(),
+        torch.nn.Conv2d(channels, 3 * scale ** 2, 3, padding=1),
+        torch.nn.PixelShuffle(scale), torch.nn.Hardtanh(0, 1)).eval()
+
+
+def run_mode(args):
+    """Runs one mode in this process, saves the SR image and prints the peak RSS above the baseline as JSON"""
+    torch.set_grad_enabled(False)
+    model = conv_x4_model()
+    torch.manual_seed(1)
+    img_lr = torch.rand(1, 3, *args.image_size)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if args.run == 'tiled':
+        img_sr = run_tiled(model, img_lr, args.tile_size, args.tile_overlap)
+    else:
+        img_sr = model(img_lr)
+    seconds = time.perf_counter() - start
+    rss = peak_rss_mb() - baseline
+    torch.save(img_sr.squeeze(0), args.output)
+    print(json.dumps({'seconds': seconds, 'peak_rss_mb': rss}))
+
+
+def tiled(args):
+    """Runs both modes in child processes and prints their runtime, peak RSS and PSNR"""
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mode in ('tiled', 'whole'):
+            output = os.path.join(work_dir, f'{mode}.pt')
+            # the child inherits the warning filters, e.g. -W ignore
+            warn_options = [f'-W{option}' for option in sys.warnoptions]
+            child = subprocess.run([sys.executable, *warn_options, __file__, '--run', mode, '--output', output,
+                                    '--image-size', 'x'.join(map(str, args.image_size)),
+                                    '--tile-size', str(args.tile_size), '--tile-overlap', str(args.tile_overlap)],
+                                   check=True, stdout=subprocess.PIPE, text=True)
+            results[mode] = json.loads(child.stdout.strip().splitlines()[-1])
+            results[mode]['image'] = torch.load(output)
+    psnr = evaluate_psnr(results['tiled']['image'], results['whole']['image'])
+
+    height, width = args.image_size
+    print(f"4-layer conv x4 network, {height}x{width} LR input, {args.tile_size}-pixel tiles overlapping by "
+          f"{args.tile_overlap}")
+    for mode in ('whole', 'tiled'):
+        print(f"{mode}: {results[mode]['seconds']:.2f}s, peak RSS above baseline {results[mode]['peak_rss_mb']:.0f} MB")
+    print(f"tiled vs whole PSNR: {psnr:.1f} dB")
+
+
+def batched(args):
+    """Times the SuperRes models on MIXED_LR_SHAPES one image at a time and in shape-bucketed batches"""
+    torch.set_grad_enabled(False)
+    torch.manual_seed(1)
+    images = [torch.rand(3, height, width) for height, width in MIXED_LR_SHAPES]
+    models = {'ABPN': ABPNRelease(scaling_factor=2), 'XLSR': XLSRRelease(scaling_factor=2),
+              'SESR-M5': SESRRelease_M5(scaling_factor=2)}
+    print(f"{len(images)} mixed-size LR images at x2, batch size {args.batch_size}, "
+          f"max. {args.max_batch_pixels} LR pixels per batch, best of {args.repeats}")
+    for name, model in models.items():
+        model.eval()
+        model(images[0].unsqueeze(0))
+        seconds = {'batch_1': float('inf'), 'bucketed': float('inf')}
+        outputs = {}
+        # the modes alternate and the best of the repeats is kept, so neither pays for warm-up or a noisy neighbour
+        for _ in range(args.repeats):
+            for mode, batch_size in (('batch_1', 1), ('bucketed', args.batch_size)):
+                start = time.perf_counter()
+                outputs[mode] = run_batched(model, images, torch.device('cpu'), batch_size,
+                                            max_pixels=args.max_batch_pixels)
+                seconds[mode] = min(seconds[mode], time.perf_counter() - start)
+        max_abs_diff = max((single - batch).abs().max().item()
+                           for single, batch in zip(outputs['batch_1'], outputs['bucketed']))
+        print(f"{name}: batch 1 {len(images) / seconds['batch_1']:.1f} images/s, bucketed "
+              f"{len(images) / seconds['bucketed']:.1f} images/s ({seconds['batch_1'] / seconds['bucketed']:.2f}x), "
+              f"max. abs. diff {max_abs_diff:.1e}")
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmarks of tiled and batched SR inference.')
+    parser.add_argument('benchmark', help='benchmark to run', nargs='?', choices=['tiled', 'batched', 'all'],
+                        default='all')
+    parser.add_argument('--image-size', help='LR image size, as HxW', type=lambda s: tuple(map(int, s.split('x'))),
+                        default=(1020, 1400))
+    parser.add_argument('--tile-size', help='side of the LR tiles', type=int, default=128)
+    parser.add_argument('--tile-overlap', help='LR pixels shared by neighbouring tiles', type=int, default=16)
+    parser.add_argument('--batch-size', help='maximum number of images per batch', type=int, default=16)
+    parser.add_argument('--max-batch-pixels', help='LR pixel budget of a batch', type=int, default=MAX_BATCH_PIXELS)
+    parser.add_argument('--repeats', help='runs of each batched mode, the fastest is reported', type=int, default=3)
+    parser.add_argument('--run', help=argparse.SUPPRESS, choices=['tiled', 'whole'])
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    if args.run:
+        run_mode(args)
+        return
+    if args.benchmark in ('tiled', 'all'):
+        tiled(args)
+    if args.benchmark in ('batched', 'all'):
+        batched(args)
+
+
+if __name__ == '__main__':
+    main()
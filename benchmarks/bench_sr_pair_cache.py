@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- mode: python -*-
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""
+Benchmarks the on-disk LR/HR pair cache of the SR evaluators: a cold build, a warm load, and a byte comparison of
+the cached pairs against freshly made ones
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+
+def write_images(images_dir, num_images, image_size, seed=0):
+    """Writes num_images random PNG images of image_size (height, width) to images_dir"""
+    rng = np.random.default_rng(seed)
+    for index in range(num_images):
+        cv2.imwrite(os.path.join(images_dir, f'{index:04d}.png'),
+                    rng.integers(0, 256, size=tuple(image_size) + (3,), dtype=np.uint8))
+
+
+def arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the SR pair cache.')
+    parser.add_argument('--num-images', help='number of random HR images', type=int, default=20)
+    parser.add_argument('--image-size', help='HR image size, as HxW', type=str, default='320x480')
+    parser.add_argument('--scaling-factor', help='SR scaling factor', type=int, default=2)
+    return parser.parse_args()
+
+
+def main():
+    args = arguments()
+    with tempfile.TemporaryDirectory() as work_dir:
+        # the cache root is read when the process-wide cache is created, set it before the first use
+        os.environ['AIMET_ZOO_CACHE_DIR'] = os.path.join(work_dir, 'cache')
+        from aimet_zoo_torch.superres.evaluators.utils import helpers  # pylint: disable=import-outside-toplevel
+
+        images_dir = os.path.join(work_dir, 'images')
+        os.makedirs(images_dir)
+        write_images(images_dir, args.num_images, tuple(int(x) for x in args.image_size.split('x')))
+
+        timings = {}
+        for name, use_cache in (('uncached', False), ('cold', True), ('warm', True)):
+            start = time.perf_counter()
+            images_lr, images_hr = helpers.load_dataset(images_dir, args.scaling_factor, use_cache=use_cache)
+            timings[name] = time.perf_counter() - start
+            if name == 'uncached':
+                reference = (images_lr, images_hr)
+        identical = all(np.array_equal(a.numpy(), b.numpy())
+                        for fresh, cached in zip(reference, (images_lr, images_hr)) for a, b in zip(fresh, cached))
+        stats = helpers.get_sr_pair_cache().stats
+
+    print(f"{args.num_images} images of {args.image_size} at x{args.scaling_factor}")
+    print(f"load_dataset without cache: {timings['uncached']:.3f}s, cold: {timings['cold']:.3f}s, "
+          f"warm: {1e3 * timings['warm']:.1f}ms")
+    print(f"pair cache: build {stats['build_seconds']:.3f}s, load {1e3 * stats['load_seconds']:.1f}ms")
+    print(f"warm pairs identical to freshly made ones: {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Shared fixtures: a local HTTP file server standing in for the artifact hosts"""
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FileServer(ThreadingHTTPServer):
+    """
+    Serves in-memory files, with optional Range/If-Range support, ETags and injected connection drops. Every
+    request is recorded with the number of body bytes sent, so tests can count transfers.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.files = {}
+        self.ranges = True
+        self.drop_after = None
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def url(self, name: str) -> str:
+        return f'http://127.0.0.1:{self.server_port}/{name}'
+
+    def put(self, name: str, content: bytes):
+        """Publishes (or replaces) a file, its ETag changes with its content"""
+        self.files['/' + name] = content
+
+    def body_bytes(self, name: str) -> int:
+        """Body bytes sent for a file over all requests"""
+        return sum(sent for path, _, sent in self.requests if path == '/' + name)
+
+    def record(self, path: str, range_header: str, sent: int):
+        with self._lock:
+            self.requests.append((path, range_header, sent))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        server = self.server
+        content = server.files.get(self.path)
+        if content is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header or '')
+        if server.ranges and match and (if_range is None or if_range == etag):
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(content) - 1
+            body = content[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(content)}')
+        else:
+            body = content
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        sent = len(body)
+        if server.drop_after is not None and len(body) > 1:
+            # send part of the body, then drop the connection
+            sent = min(sent, server.drop_after)
+            self.wfile.write(body[:sent])
+            self.wfile.flush()
+            self.close_connection = True
+            server.record(self.path, range_header, sent)
+            return
+        self.wfile.write(body)
+        server.record(self.path, range_header, sent)
+
+
+@pytest.fixture
+def file_server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Points every cache of the zoo at an empty directory and resets the process-wide singletons"""
+    root = tmp_path / 'cache'
+    monkeypatch.setenv('AIMET_ZOO_CACHE_DIR', str(root))
+    import aimet_zoo_torch.common.artifact_cache as artifact_cache
+    monkeypatch.setattr(artifact_cache, '_default_cache', None)
+    return root
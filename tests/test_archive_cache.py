@@ -0,0 +1,53 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Extracted-archive cache"""
+import io
+import os
+import stat
+import tarfile
+
+from aimet_zoo_torch.common.archive_cache import ArchiveCache
+
+
+def make_archive(path, files):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(content))
+
+
+def test_warm_extract_links_read_only_files(tmp_path):
+    archive_path = tmp_path / 'model.tar.gz'
+    make_archive(archive_path, {'model/weights.pth': b'weights', 'model/arch_cfg.yaml': b'arch'})
+    cache = ArchiveCache(str(tmp_path / 'cache'))
+
+    assert sorted(cache.extract(str(archive_path), str(tmp_path / 'cold'))) == \
+        ['model/arch_cfg.yaml', 'model/weights.pth']
+    cache.extract(str(archive_path), str(tmp_path / 'warm'))
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+    cold, warm = tmp_path / 'cold' / 'model' / 'weights.pth', tmp_path / 'warm' / 'model' / 'weights.pth'
+    assert warm.read_bytes() == b'weights'
+    assert os.path.samefile(cold, warm)
+    # the cached inode is shared, nobody may write through a destination
+    assert not os.stat(warm).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def test_read_only_destinations_can_be_relinked(tmp_path):
+    archive_path = tmp_path / 'model.tar.gz'
+    make_archive(archive_path, {'weights.pth': b'weights'})
+    cache = ArchiveCache(str(tmp_path / 'cache'))
+    cache.extract(str(archive_path), str(tmp_path / 'dst'))
+    # destinations can be replaced even though their files are read-only
+    cache.extract(str(archive_path), str(tmp_path / 'dst'))
+    os.remove(tmp_path / 'dst' / 'weights.pth')
+    cache.extract(str(archive_path), str(tmp_path / 'dst'))
+    assert (tmp_path / 'dst' / 'weights.pth').read_bytes() == b'weights'
@@ -0,0 +1,58 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Sharding of evaluation loaders across ranks, and the --use-cuda flag"""
+import argparse
+
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+pytest.importorskip('torchvision')
+
+# pylint: disable=wrong-import-position
+from torch.utils.data import DataLoader
+
+from aimet_zoo_torch.common import distributed_eval
+from aimet_zoo_torch.common.distributed_eval import shard_indices, shard_loader
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedDataLoader
+from aimet_zoo_torch.common.utils.utils import str2bool
+
+
+def labels_of(data_loader):
+    return [label for _, labels in data_loader for label in labels.tolist()]
+
+
+@pytest.mark.parametrize('world_size', [1, 2, 3, 4])
+def test_shards_cover_every_sample_once(world_size):
+    shards = [shard_indices(10, rank, world_size) for rank in range(world_size)]
+    assert sorted(index for shard in shards for index in shard) == list(range(10))
+
+
+@pytest.mark.parametrize('world_size', [2, 3])
+def test_preprocessed_loader_is_sharded_like_a_data_loader(world_size, monkeypatch):
+    images = np.random.default_rng(0).integers(0, 256, (11, 3, 4, 4), dtype=np.uint8)
+    preprocessed = PreprocessedDataLoader(images, np.arange(11), batch_size=4)
+    plain = DataLoader(preprocessed.dataset, batch_size=4)
+    monkeypatch.setattr(distributed_eval, 'is_distributed', lambda: True)
+    monkeypatch.setattr(distributed_eval.dist, 'get_world_size', lambda: world_size)
+    shards = []
+    for rank in range(world_size):
+        monkeypatch.setattr(distributed_eval.dist, 'get_rank', lambda rank=rank: rank)
+        shard = labels_of(shard_loader(preprocessed))
+        assert shard == labels_of(shard_loader(plain))
+        shards.extend(shard)
+    assert sorted(shards) == list(range(11))
+
+
+def test_use_cuda_false_is_parsed():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--use-cuda', type=str2bool, default=True)
+    assert parser.parse_args(['--use-cuda', 'False']).use_cuda is False
+    assert parser.parse_args(['--use-cuda', 'true']).use_cuda is True
+    assert parser.parse_args([]).use_cuda is True
@@ -0,0 +1,181 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Downloader and prefetch against a local HTTP server"""
+import copy
+import functools
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('gdown')
+
+# pylint: disable=wrong-import-position
+from aimet_zoo_torch.common import artifact_cache, downloader as downloader_module, range_download
+from aimet_zoo_torch.common.downloader import Downloader, prefetch
+
+
+def write_model_card(model_dir, model_config, artifacts):
+    os.makedirs(model_dir / 'model_cards', exist_ok=True)
+    card = {'artifacts': {'url_pre_opt_weights': None, 'url_post_opt_weights': None,
+                          'url_adaround_encodings': None, 'url_aimet_encodings': None,
+                          'url_aimet_config': None, **artifacts}}
+    path = model_dir / 'model_cards' / (model_config + '.json')
+    path.write_text(json.dumps(card))
+    return str(path)
+
+
+def test_prefetch_transfers_shared_artifacts_once(file_server, cache_dir, tmp_path):
+    file_server.put('config', os.urandom(1024))
+    file_server.put('weights_a', os.urandom(4096))
+    file_server.put('weights_b', os.urandom(4096))
+    cards = [write_model_card(tmp_path / 'model', name, {'url_post_opt_weights': file_server.url('weights_' + name),
+                                                         'url_aimet_config': file_server.url('config')})
+             for name in ('a', 'b')]
+
+    stats = prefetch(cards, max_workers=4)
+
+    assert set(stats) == {'a', 'b'}
+    assert set(stats['a']) == {'post_opt_weights', 'aimet_config'}
+    for name in ('a', 'b'):
+        weights_dir = tmp_path / 'model' / 'weights' / name
+        assert (weights_dir / 'aimet_config').read_bytes() == file_server.files['/config']
+        assert (weights_dir / 'post_opt_weights').read_bytes() == file_server.files['/weights_' + name]
+    # one one-byte probe plus one body per distinct URL
+    assert file_server.body_bytes('config') == 1024 + 1
+
+
+def test_one_limiter_caps_every_download_of_a_job(file_server, cache_dir, tmp_path, monkeypatch):
+    for name in ('config', 'weights_a', 'weights_b'):
+        file_server.put(name, os.urandom(1024))
+    limiters = []
+    download_file = downloader_module.download_file
+
+    def recording_download_file(src, dst, **kwargs):
+        limiters.append(kwargs['limiter'])
+        download_file(src, dst, **kwargs)
+
+    monkeypatch.setattr(downloader_module, 'download_file', recording_download_file)
+    cards = [write_model_card(tmp_path / 'model', name, {'url_post_opt_weights': file_server.url('weights_' + name),
+                                                         'url_aimet_config': file_server.url('config')})
+             for name in ('a', 'b')]
+    prefetch(cards, max_bytes_per_sec=1 << 20)
+    assert len(limiters) == 3 and len(set(map(id, limiters))) == 1
+    assert limiters[0].max_bytes_per_sec == 1 << 20
+
+
+def test_bandwidth_cap_bounds_the_whole_job(file_server, cache_dir, tmp_path):
+    # 2 x 16 KB at 16 KB/s take 2s under a shared cap, 1s if each download were capped on its own
+    for name in ('weights', 'config'):
+        file_server.put(name, os.urandom(16 * 1024))
+    downloader = Downloader(url_post_opt_weights=file_server.url('weights'), url_aimet_config=file_server.url('config'),
+                            model_dir=str(tmp_path / 'model'), max_bytes_per_sec=16 * 1024)
+    stats = downloader._download_artifacts()
+    assert stats['total'] > 1.6
+
+
+def _download_config(url, model_dir, barrier):
+    barrier.wait()
+    Downloader(url_aimet_config=url, model_dir=model_dir)._download_aimet_config()
+
+
+def test_concurrent_processes_share_one_transfer(file_server, cache_dir, tmp_path):
+    content = os.urandom(256 * 1024)
+    file_server.put('config', content)
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    processes = [context.Process(target=_download_config,
+                                 args=(file_server.url('config'), str(tmp_path / f'model_{index}'), barrier))
+                 for index in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    for index in range(4):
+        assert (tmp_path / f'model_{index}' / 'weights' / 'aimet_config').read_bytes() == content
+    # a single probe and a single transfer, the other processes link the cached object
+    assert file_server.body_bytes('config') == len(content) + 1
+
+
+def _download_weights(url, model_dir):
+    Downloader(url_post_opt_weights=url, model_dir=model_dir)._download_post_opt_weights()
+
+
+def test_interrupted_transfer_resumes_on_next_run(file_server, cache_dir, tmp_path, monkeypatch):
+    content = os.urandom(64 * 1024)
+    file_server.put('weights', content)
+    monkeypatch.setattr(range_download, 'MIN_CHUNK_SIZE', 1024)
+    monkeypatch.setattr(downloader_module, 'download_file', functools.partial(range_download.download_file, retries=0))
+    file_server.drop_after = 1000
+    # the interrupted run is another process, as when an evaluator is killed and restarted
+    process = multiprocessing.get_context('fork').Process(target=_download_weights,
+                                                          args=(file_server.url('weights'), str(tmp_path / 'model')))
+    process.start()
+    process.join(60)
+    assert process.exitcode != 0
+
+    file_server.drop_after = None
+    Downloader(url_post_opt_weights=file_server.url('weights'),
+               model_dir=str(tmp_path / 'model'))._download_post_opt_weights()
+    weights_dir = tmp_path / 'model' / 'weights'
+    assert (weights_dir / 'post_opt_weights').read_bytes() == content
+    assert not list(weights_dir.glob('*.partial'))
+    # two probes, and the bytes received before the drop are not transferred again
+    assert file_server.body_bytes('weights') == len(content) + 2
+
+
+def test_downloader_does_not_import_torch():
+    code = 'import sys, aimet_zoo_torch.common.downloader; print("torch" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert result.stdout.strip() == 'False'
+
+
+def test_downloader_can_be_deep_copied(file_server, cache_dir, tmp_path):
+    # AIMET deep-copies the zoo models, which are Downloaders, when building a QuantizationSimModel
+    file_server.put('config', os.urandom(1024))
+    downloader = Downloader(url_aimet_config=file_server.url('config'), model_dir=str(tmp_path / 'model'))
+    downloader._download_aimet_config()
+    clone = copy.deepcopy(downloader)
+    assert clone.path_aimet_config == downloader.path_aimet_config
+    assert clone.cache_stats == downloader.cache_stats
+
+
+def test_cache_hit_does_not_rehash(file_server, cache_dir, tmp_path, monkeypatch):
+    content = os.urandom(4096)
+    file_server.put('weights', content)
+    Downloader(url_post_opt_weights=file_server.url('weights'),
+               model_dir=str(tmp_path / 'a'))._download_post_opt_weights()
+
+    def fail(path):
+        raise AssertionError(f'{path} hashed on a cache hit')
+
+    monkeypatch.setattr(artifact_cache, 'sha256sum', fail)
+    Downloader(url_post_opt_weights=file_server.url('weights'),
+               model_dir=str(tmp_path / 'b'))._download_post_opt_weights()
+    assert (tmp_path / 'b' / 'weights' / 'post_opt_weights').read_bytes() == content
+    assert file_server.body_bytes('weights') == len(content) + 1
+
+
+def test_truncated_cache_object_is_fetched_again(file_server, cache_dir, tmp_path):
+    content = os.urandom(4096)
+    file_server.put('weights', content)
+    Downloader(url_post_opt_weights=file_server.url('weights'),
+               model_dir=str(tmp_path / 'a'))._download_post_opt_weights()
+    (object_path,) = [path for path in (cache_dir / 'objects').rglob('*') if path.is_file()]
+    with open(object_path, 'r+b') as f_out:
+        f_out.truncate(100)
+
+    Downloader(url_post_opt_weights=file_server.url('weights'),
+               model_dir=str(tmp_path / 'b'))._download_post_opt_weights()
+    assert (tmp_path / 'b' / 'weights' / 'post_opt_weights').read_bytes() == content
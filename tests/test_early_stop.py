@@ -0,0 +1,32 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Seeded permutation of the early-stopping regression check"""
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+pytest.importorskip('torchvision')
+
+# pylint: disable=wrong-import-position
+from torch.utils.data import DataLoader
+
+from aimet_zoo_torch.common.early_stop import permuted_loader
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedDataLoader
+
+
+def test_preprocessed_loader_is_permuted_like_a_data_loader():
+    images = np.random.default_rng(0).integers(0, 256, (37, 3, 4, 4), dtype=np.uint8)
+    preprocessed = PreprocessedDataLoader(images, np.arange(37), batch_size=8)
+    plain = DataLoader(preprocessed.dataset, batch_size=8)
+
+    permuted_labels = torch.cat([labels for _, labels in permuted_loader(preprocessed, seed=3)])
+    expected_labels = torch.cat([labels for _, labels in permuted_loader(plain, seed=3)])
+    assert torch.equal(permuted_labels, expected_labels)
+    assert sorted(permuted_labels.tolist()) == list(range(37))
+    assert not torch.equal(permuted_labels, torch.arange(37))
@@ -0,0 +1,47 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Fingerprints keying the evaluation checkpoints"""
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+# pylint: disable=wrong-import-position
+from aimet_zoo_torch.common.eval_checkpoint import model_fingerprint
+
+
+class Wrapper(torch.nn.Module):
+    """Layout of a quantsim wrapper: the encodings live on the quantizers, outside the state_dict"""
+
+    def __init__(self, max_value: float):
+        super().__init__()
+        torch.manual_seed(0)
+        self._module_to_wrap = torch.nn.Linear(2, 2)
+        encoding = SimpleNamespace(bw=8, min=-max_value, max=max_value, delta=2 * max_value / 255, offset=-128)
+        self.param_quantizers = {'weight': SimpleNamespace(enabled=True, bitwidth=8, encoding=encoding)}
+        self.output_quantizers = [SimpleNamespace(enabled=True, bitwidth=8, encoding=None)]
+
+
+def test_fingerprint_covers_quantizer_encodings():
+    reference = model_fingerprint(Wrapper(1.))
+    assert model_fingerprint(Wrapper(1.)) == reference
+    assert model_fingerprint(Wrapper(2.)) != reference
+
+    disabled = Wrapper(1.)
+    disabled.output_quantizers[0].enabled = False
+    assert model_fingerprint(disabled) != reference
+
+
+def test_fingerprint_covers_weights():
+    model = Wrapper(1.)
+    reference = model_fingerprint(model)
+    with torch.no_grad():
+        model._module_to_wrap.weight.add_(1)  # pylint: disable=protected-access
+    assert model_fingerprint(model) != reference
@@ -0,0 +1,44 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""ImageNet folder and shard layouts"""
+import os
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('torchvision')
+
+# pylint: disable=wrong-import-position
+from aimet_zoo_torch.common.utils.image_net_data_loader import ImageFolder, ShardedImageNetDataset, build_shards
+
+
+@pytest.fixture
+def image_folder(tmp_path):
+    root = tmp_path / 'images'
+    for class_idx, num_images in enumerate((5, 1, 0, 7)):
+        class_dir = root / f'n{class_idx:08d}'
+        class_dir.mkdir(parents=True)
+        for index in range(num_images):
+            (class_dir / f'img_{(index * 7919) % 101:03d}.JPEG').write_bytes(os.urandom(16))
+        (class_dir / 'notes.txt').write_text('not an image')
+    return root
+
+
+def relative_paths(data_set):
+    return [os.path.relpath(path, data_set.root) for path, _ in data_set.imgs]
+
+
+@pytest.mark.parametrize('seed', [None, 0, 1, 7])
+@pytest.mark.parametrize('num_samples_per_class', [None, 1, 3])
+def test_shards_select_the_same_images(image_folder, tmp_path, seed, num_samples_per_class):
+    build_shards(str(image_folder), str(tmp_path / 'shards'))
+    folder = ImageFolder(str(image_folder), num_samples_per_class=num_samples_per_class, seed=seed)
+    shards = ShardedImageNetDataset(str(tmp_path / 'shards'), num_samples_per_class=num_samples_per_class, seed=seed)
+    assert relative_paths(shards) == relative_paths(folder)
+    assert shards.targets == [label for _, label in folder.samples]
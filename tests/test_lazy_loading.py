@@ -0,0 +1,54 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Memory-mapped checkpoints and the files derived from them"""
+import os
+
+import pytest
+
+torch = pytest.importorskip('torch')
+
+# pylint: disable=wrong-import-position
+from aimet_zoo_torch.common.utils import lazy_loading
+from aimet_zoo_torch.common.utils.lazy_loading import load_or_build_model, load_pickled_model
+
+
+def save_model(path, value):
+    model = torch.nn.Sequential(torch.nn.Linear(4, 4))
+    torch.nn.init.constant_(model[0].weight, value)
+    torch.save(model, path)
+
+
+def test_replaced_checkpoint_with_same_mtime_is_converted_again(cache_dir, tmp_path):
+    path = str(tmp_path / 'model.pth')
+    save_model(path, 1.)
+    assert load_pickled_model(path)[0].weight[0, 0].item() == 1.
+    mtime = os.stat(path).st_mtime_ns
+
+    # e.g. cp -p or a restore from the artifact cache keep the mtime of the source
+    save_model(path, 2.)
+    os.utime(path, ns=(mtime, mtime))
+    assert load_pickled_model(path)[0].weight[0, 0].item() == 2.
+
+
+def test_derived_model_is_rebuilt_when_aimet_changes(cache_dir, tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.pth')
+    save_model(path, 1.)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return torch.load(path, weights_only=False)
+
+    monkeypatch.setattr(lazy_loading, 'aimet_version', lambda: '1.0')
+    load_or_build_model(path, path + '.cle', build)
+    load_or_build_model(path, path + '.cle', build)
+    assert len(builds) == 1
+    monkeypatch.setattr(lazy_loading, 'aimet_version', lambda: '2.0')
+    load_or_build_model(path, path + '.cle', build)
+    assert len(builds) == 2
@@ -0,0 +1,50 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Loader pool reuse and release of persistent workers"""
+import pytest
+
+torch = pytest.importorskip('torch')
+
+# pylint: disable=wrong-import-position
+from torch.utils.data import TensorDataset
+
+from aimet_zoo_torch.common.loader_pool import LoaderPool
+
+
+def make_dataset():
+    return TensorDataset(torch.arange(8.))
+
+
+def workers(pooled):
+    # pylint: disable=protected-access
+    return list(pooled.data_loader._iterator._workers)
+
+
+def test_loaders_are_reused():
+    pool = LoaderPool()
+    first = pool.loader('numbers', make_dataset, batch_size=4, num_workers=1)
+    assert [batch[0].tolist() for batch in first] == [[0., 1., 2., 3.], [4., 5., 6., 7.]]
+    assert pool.loader('numbers', make_dataset, batch_size=4, num_workers=1) is first
+    assert pool.stats['numbers']['reuses'] == 1
+    pool.clear()
+
+
+def test_least_recently_used_loader_is_closed():
+    pool = LoaderPool(max_loaders=1)
+    first = pool.loader('numbers', make_dataset, batch_size=4, num_workers=1)
+    list(first)
+    first_workers = workers(first)
+    assert all(worker.is_alive() for worker in first_workers)
+
+    second = pool.loader('numbers', make_dataset, batch_size=2, num_workers=1)
+    assert not any(worker.is_alive() for worker in first_workers)
+    list(second)
+    second_workers = workers(second)
+    pool.clear()
+    assert not any(worker.is_alive() for worker in second_workers)
@@ -0,0 +1,73 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Preprocessed-image cache and its loader"""
+import pytest
+
+np = pytest.importorskip('numpy')
+torch = pytest.importorskip('torch')
+pytest.importorskip('torchvision')
+
+# pylint: disable=wrong-import-position
+from PIL import Image
+from torch.utils.data import DataLoader
+from torchvision import datasets
+
+from aimet_zoo_torch.common.utils.preprocessed_cache import PreprocessedCache
+
+
+@pytest.fixture
+def image_folder(tmp_path):
+    rng = np.random.default_rng(0)
+    for class_idx in range(3):
+        class_dir = tmp_path / 'images' / f'class_{class_idx}'
+        class_dir.mkdir(parents=True)
+        for index in range(5):
+            pixels = rng.integers(0, 256, (40 + index, 36, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(class_dir / f'{index}.png')
+    return tmp_path / 'images'
+
+
+@pytest.fixture
+def loader(image_folder, tmp_path):
+    return PreprocessedCache(str(tmp_path / 'cache')).loader(datasets.ImageFolder(str(image_folder)), 32, 28,
+                                                             batch_size=4, num_workers=0)
+
+
+def concat(data_loader):
+    images, labels = zip(*data_loader)
+    return torch.cat(images), torch.cat(labels)
+
+
+def test_caller_transform_is_kept(image_folder, tmp_path):
+    data_set = datasets.ImageFolder(str(image_folder), transform=str)
+    PreprocessedCache(str(tmp_path / 'cache')).loader(data_set, 32, 28, batch_size=4, num_workers=0)
+    assert data_set.transform is str
+
+
+def test_loader_exposes_data_loader_attributes(loader):
+    assert len(loader.dataset) == 15
+    assert (loader.batch_size, loader.num_workers, loader.drop_last, loader.pin_memory) == (4, 0, False, False)
+    images, labels = concat(loader)
+    image, label = loader.dataset[6]
+    assert torch.allclose(image, images[6]) and label == labels[6]
+    # a plain DataLoader over the dataset yields the same batches
+    plain_images, plain_labels = concat(DataLoader(loader.dataset, batch_size=loader.batch_size))
+    assert torch.allclose(plain_images, images) and torch.equal(plain_labels, labels)
+
+
+def test_subset_visits_the_given_indices_in_order(loader):
+    images, labels = concat(loader)
+    indices = [9, 2, 3, 4, 14, 0]
+    subset = loader.subset(indices)
+    assert len(subset.dataset) == len(indices) and len(subset) == 2
+    subset_images, subset_labels = concat(subset)
+    assert torch.allclose(subset_images, images[indices]) and torch.equal(subset_labels, labels[indices])
+    # subsets compose, positions are relative to the loader they are taken from
+    nested_images, _ = concat(subset.subset([1, 0]))
+    assert torch.allclose(nested_images, images[[2, 9]])
@@ -0,0 +1,83 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Quantsim snapshot cache round trip"""
+import copy
+
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('gdown')
+
+# pylint: disable=wrong-import-position
+from aimet_zoo_torch.common import quantsim_cache
+from aimet_zoo_torch.common.downloader import Downloader
+
+
+class FakeSim(torch.nn.Module):
+    """Stands in for a QuantizationSimModel: a copy of the model plus encodings"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = copy.deepcopy(model)
+        self.encodings = {'conv': {'scale': 0.1}}
+
+
+class FakeModel(Downloader):
+    """Model definition following the zoo pattern: get_quantsim loads the weights into self.model"""
+
+    def __init__(self, model_dir):
+        torch.manual_seed(0)
+        torch.save({'state_dict': torch.nn.Conv2d(3, 3, 1).state_dict()}, model_dir / 'weights.pth')
+        Downloader.__init__(self, url_post_opt_weights=str(model_dir / 'weights.pth'), model_dir=str(model_dir))
+        self.cfg = {'name': 'fake'}
+        self.model = torch.nn.Conv2d(3, 3, 1)
+        self.builds = 0
+
+    def from_pretrained(self, quantized=False):
+        self._download_artifacts()
+        self.model.load_state_dict(torch.load(self.path_post_opt_weights)['state_dict'])
+
+    def get_quantsim(self, quantized=False):
+        kwargs = {'default_param_bw': 8, 'dummy_input': torch.rand(1, 3, 4, 4)}
+
+        def build_sim():
+            self.builds += 1
+            self.from_pretrained(quantized=quantized)
+            return FakeSim(self.model)
+        return self._cached_quantsim(build_sim, quantized, kwargs)
+
+
+@pytest.fixture
+def quantsim_cache_dir(cache_dir, monkeypatch):
+    monkeypatch.setattr(quantsim_cache, '_default_cache', None)
+    return cache_dir
+
+
+def test_hit_leaves_the_model_as_a_miss_does(quantsim_cache_dir, tmp_path):
+    (tmp_path / 'cold').mkdir()
+    (tmp_path / 'warm').mkdir()
+    cold = FakeModel(tmp_path / 'cold')
+    cold_sim = cold.get_quantsim(quantized=True)
+    warm = FakeModel(tmp_path / 'warm')
+    warm_sim = warm.get_quantsim(quantized=True)
+
+    assert (cold.builds, warm.builds) == (1, 0)
+    assert quantsim_cache.get_quantsim_cache().stats['hits'] == 1
+    assert warm_sim.encodings == cold_sim.encodings
+    for name, value in cold.model.state_dict().items():
+        assert torch.equal(warm.model.state_dict()[name], value)
+        assert torch.equal(warm_sim.model.state_dict()[name], value)
+
+
+def test_key_changes_with_library_versions(quantsim_cache_dir, monkeypatch):
+    cache = quantsim_cache.QuantSimCache()
+    key = cache.key({'name': 'fake'}, {}, {}, (1, 3, 4, 4))
+    assert quantsim_cache._library_versions()['torch'] == torch.__version__
+    monkeypatch.setattr(quantsim_cache, 'aimet_version', lambda: 'other')
+    assert cache.key({'name': 'fake'}, {}, {}, (1, 3, 4, 4)) != key
@@ -0,0 +1,142 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Range downloads against a local range-capable HTTP server"""
+import os
+import time
+
+import pytest
+
+from aimet_zoo_torch.common import range_download
+from aimet_zoo_torch.common.range_download import download_file, RemoteFileChanged
+
+SIZE = 64 * 1024
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # split test files into several chunks without serving megabytes
+    monkeypatch.setattr(range_download, 'MIN_CHUNK_SIZE', 1024)
+
+
+def test_parallel_chunks(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    download_file(file_server.url('weights'), str(tmp_path / 'weights'), num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == content
+    chunk_requests = [request for request in file_server.requests if request[2] > 1]
+    assert len(chunk_requests) == 4
+    assert file_server.body_bytes('weights') == SIZE + 1  # the probe fetches one byte
+    assert not list(tmp_path.glob('*.partial'))
+
+
+def test_server_without_ranges(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    file_server.ranges = False
+    download_file(file_server.url('weights'), str(tmp_path / 'weights'))
+    assert (tmp_path / 'weights').read_bytes() == content
+
+
+def test_resume_across_calls(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    dst = str(tmp_path / 'weights')
+    file_server.drop_after = 1000
+    with pytest.raises(Exception):
+        download_file(file_server.url('weights'), dst, num_chunks=4, retries=0)
+    kept = sum(os.path.getsize(path) for path in tmp_path.glob('weights.*.partial'))
+    assert kept > 0
+
+    file_server.drop_after = None
+    file_server.requests.clear()
+    download_file(file_server.url('weights'), dst, num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == content
+    # only the missing bytes are transferred again
+    assert file_server.body_bytes('weights') == SIZE - kept + 1
+
+
+def test_changed_remote_file_is_not_stitched(file_server, tmp_path):
+    file_server.put('weights', os.urandom(SIZE))
+    dst = str(tmp_path / 'weights')
+    file_server.drop_after = 1000
+    with pytest.raises(Exception):
+        download_file(file_server.url('weights'), dst, num_chunks=4, retries=0)
+    assert list(tmp_path.glob('weights.*.partial'))
+
+    # same size, new content and ETag
+    new_content = os.urandom(SIZE)
+    file_server.put('weights', new_content)
+    file_server.drop_after = None
+    download_file(file_server.url('weights'), dst, num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == new_content
+
+
+def test_change_during_download(file_server, tmp_path, monkeypatch):
+    file_server.put('weights', os.urandom(SIZE))
+    probe = range_download._probe
+
+    def probe_then_change(url, timeout):
+        result = probe(url, timeout)
+        file_server.put('weights', os.urandom(SIZE))
+        return result
+
+    monkeypatch.setattr(range_download, '_probe', probe_then_change)
+    with pytest.raises(RemoteFileChanged):
+        download_file(file_server.url('weights'), str(tmp_path / 'weights'), num_chunks=4)
+    assert not list(tmp_path.glob('weights*'))
+
+
+def test_bandwidth_cap(file_server, tmp_path, monkeypatch):
+    file_server.put('weights', os.urandom(SIZE))
+    monkeypatch.setenv('AIMET_ZOO_MAX_BYTES_PER_SEC', str(SIZE * 4))
+    start = time.perf_counter()
+    download_file(file_server.url('weights'), str(tmp_path / 'weights'))
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_interrupted_stream_download_then_ranges(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    dst = str(tmp_path / 'weights')
+    file_server.ranges = False
+    file_server.drop_after = 1000
+    with pytest.raises(Exception):
+        download_file(file_server.url('weights'), dst, retries=0)
+
+    # the server now serves ranges, the leftover stream body must not be read as a manifest
+    file_server.ranges = True
+    file_server.drop_after = None
+    download_file(file_server.url('weights'), dst, num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == content
+    assert not list(tmp_path.glob('weights.*'))
+
+
+def test_unreadable_manifest_discards_partials(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    dst = str(tmp_path / 'weights')
+    (tmp_path / 'weights.manifest.json').write_bytes(b'\x00{truncated')
+    (tmp_path / 'weights.0.partial').write_bytes(os.urandom(100))
+    download_file(file_server.url('weights'), dst, num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == content
+
+
+def test_oversized_part_file_is_refetched(file_server, tmp_path):
+    content = os.urandom(SIZE)
+    file_server.put('weights', content)
+    dst = str(tmp_path / 'weights')
+    file_server.drop_after = 1000
+    with pytest.raises(Exception):
+        download_file(file_server.url('weights'), dst, num_chunks=4, retries=0)
+    with open(tmp_path / 'weights.0.partial', 'ab') as f_out:
+        f_out.write(os.urandom(SIZE))
+
+    file_server.drop_after = None
+    download_file(file_server.url('weights'), dst, num_chunks=4)
+    assert (tmp_path / 'weights').read_bytes() == content
@@ -0,0 +1,71 @@
+# =============================================================================
+#  @@-COPYRIGHT-START-@@
+#
+#  Copyright (c) 2023 of Qualcomm Innovation Center, Inc. All rights reserved.
+#
+#  @@-COPYRIGHT-END-@@
+# =============================================================================
+
+"""Tiled and batched super-resolution inference"""
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('cv2')
+pytest.importorskip('matplotlib')
+
+# pylint: disable=wrong-import-position
+import torch.nn.functional as F
+
+from aimet_zoo_torch.superres.evaluators.utils.helpers import run_batched, run_tiled, shape_buckets
+
+
+class Upscale(torch.nn.Module):
+    """A 3x3 conv followed by a bilinear upscale, standing in for an SR model of any scale"""
+
+    def __init__(self, scale):
+        super().__init__()
+        torch.manual_seed(0)
+        self.conv = torch.nn.Conv2d(3, 3, 3, padding=1)
+        self.scale = scale
+
+    def forward(self, x):
+        return F.interpolate(self.conv(x), scale_factor=self.scale, mode='bilinear', align_corners=False)
+
+
+def psnr(img, ref):
+    return (10 * torch.log10(1 / (img - ref).pow(2).mean())).item()
+
+
+@pytest.mark.parametrize('scale, height, width', [(2, 100, 150), (3, 100, 150), (1.5, 100, 150), (1.5, 101, 147)])
+def test_tiled_matches_whole_image(scale, height, width):
+    model = Upscale(scale).eval()
+    img_lr = torch.rand(1, 3, height, width)
+    with torch.no_grad():
+        whole = model(img_lr)
+        tiled = run_tiled(model, img_lr, tile_size=32, tile_overlap=8)
+    assert tiled.shape == whole.shape
+    assert torch.isfinite(tiled).all()
+    assert psnr(tiled, whole) > 40
+
+
+def test_tile_overlap_must_be_smaller_than_tile():
+    with pytest.raises(ValueError):
+        run_tiled(Upscale(2), torch.rand(1, 3, 40, 40), tile_size=16, tile_overlap=16)
+
+
+def test_test_set_sized_images_are_batched():
+    images = [torch.rand(3, 160, 240) for _ in range(8)] + [torch.rand(3, 240, 160), torch.rand(3, 90, 125)]
+    batch_sizes = sorted(len(indices) for indices, _, _ in shape_buckets(images, batch_size=16))
+    assert batch_sizes == [1, 1, 2, 6]
+
+
+@pytest.mark.parametrize('scale', [2, 1.5])
+def test_batched_matches_single_images(scale):
+    model = Upscale(scale).eval()
+    images = [torch.rand(3, 40, 60) for _ in range(3)] + [torch.rand(3, 60, 40)]
+    with torch.no_grad():
+        batched = run_batched(model, images, torch.device('cpu'), batch_size=4)
+        single = [model(img.unsqueeze(0)).squeeze(0) for img in images]
+    for batch_out, single_out in zip(batched, single):
+        assert batch_out.shape == single_out.shape
+        assert torch.allclose(batch_out, single_out, atol=1e-6)